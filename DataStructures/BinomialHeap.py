@@ -1,154 +1,201 @@
-from functools import total_ordering
-from typing import Sequence
+class BinomialHandle:
+    """A reference to an item in a binomial heap. push() returns one.
+        It holds the item, its cached key, and the tree node currently holding it.
+    """
+
+    def __init__(self, content, key):
+        self.content = content
+        self.key = key
+        self.node = None
 
 
-@total_ordering
 class BinomialNode:
-    """A node in a binomial tree. It holds a value and a key."""
+    """A node in a binomial tree. It holds a handle, and its children
+        in increasing order of degree: children[k] roots a tree of degree k.
+    """
 
-    def __init__(self, content, key=lambda x: x):
-        self.content = content
+    def __init__(self, handle:BinomialHandle):
+        self.handle = handle
+        handle.node = self
         self.parent = None
         self.children = []
-        self.key = key
 
     @property
-    def nrnodes(self):
-        return  2**len(self.children)
+    def key(self):
+        return self.handle.key
 
     @property
-    def degree(self):
-        return len(self.children)
-
-    def __eq__(self, other):
-        return self.key(self.content) == self.key(other.content)
-
-    def __le__(self, other):
-        return self.key(self.content) <= self.key(other.content)
-
-    def __lt__(self, other):
-        return self.key(self.content) < self.key(other.content)
-
-
-class BinomialTree:
-    """ A binomial tree, an element of a binomial heap.
-        It holds a root, to which a number of 2^degree nodes are
-        attached as ancestors.
-    """
-    def __init__(self, root:BinomialNode):
-        self.root = root
+    def nrnodes(self):
+        return 2**len(self.children)
 
     @property
     def degree(self):
-        return self.root.degree
+        return len(self.children)
 
     @staticmethod
-    def merge(t1, t2):
+    def link(t1, t2):
+        """Merge two binomial trees of equal degree. Returns the root of the result."""
         if t1.degree != t2.degree:
             raise ValueError('Binomial trees of different degrees cannot be merged!')
-        if t1.root <= t2.root:
-            t2.root.parent = t1.root
-            t1.root.children.append(t2.root)
-            return t1
-        else:
-            t1.root.parent = t2.root
-            t2.root.children.append(t1.root)
-            return t2
-
-    @property
-    def children(self):
-        return self.root.children
-
-    # @staticmethod
-    # def _local_add(*args):
-    #     if len(args) > 3:
-    #         raise ValueError('WTF addition?')
-    #
-    #     if len(args) == 2:
-    #         result = BinomialTree.merge(args[0], args[1])
-    #         args
+        if t2.key < t1.key:
+            t1, t2 = t2, t1
+        t2.parent = t1
+        t1.children.append(t2)
+        return t1
 
 
 class BinomialHeap:
+    """A mergeable priority queue: a list of binomial trees of distinct degrees.
+        The minimum root is cached, so get_min is O(1); push, pop, decrease_key
+        and merging two heaps are O(log n). Melding k heaps at once costs
+        O(k log n) instead of k separate merges.
+        Besides the handle interface, it has the same interface as PriorityQueue.
+        As in every queue of DataStructures.Queues, the items must be hashable, and
+        pushing an item already in the heap raises a ValueError; distinct items
+        may have equal keys.
+    """
 
-    def __init__(self, iterable, key=lambda x: x):
+    def __init__(self, iterable=(), key=lambda x: x):
         self.trees = []
         self.key = key
+        self.__min = None
+        self.__size = 0
+        self.__handles = dict()
         for item in iterable:
             self.push(item)
 
-    def push(self, item:BinomialNode):
-        temptree = BinomialTree(item)
-        self.__add_heap([temptree])
+    def push(self, item):
+        """
+        Add an item to the heap.
+        :param item: The item.
+        :return: A BinomialHandle to be used with decrease_key and delete.
+        """
+        if item in self.__handles:
+            raise ValueError(str(item) + ' is already in the queue.')
+        handle = BinomialHandle(item, self.key(item))
+        self.__add_heap([BinomialNode(handle)])
+        self.__size += 1
+        self.__handles[item] = handle
+        return handle
+
+    def push_all(self, items):
+        for item in items:
+            self.push(item)
 
     def pop(self):
-        imin, mintree = 0, self.trees[0]
-        for (i, tree) in enumerate(self.trees[1:]):
-            if tree.root < mintree.root:
-                imin, mintree = i, tree
-        minval = mintree.root.content
-
-        self.trees[imin] = None
+        if self.__min is None:
+            raise IndexError('pop from an empty heap')
+        mintree = self.__min
+        self.trees.remove(mintree)
+        for child in mintree.children:
+            child.parent = None
         self.__add_heap(mintree.children)
 
-        return minval
+        self.__size -= 1
+        del self.__handles[mintree.handle.content]
+        return mintree.handle.content
 
     def get_min(self):
-        imin, mintree = 0, self.trees[0]
-        for (i, tree) in enumerate(self.trees[1:]):
-            if tree.root < mintree.root:
-                imin, mintree = i, tree
-        return mintree.root.content
+        return self.__min.handle.content
 
     def merge(self, other):
-        self.__add_heap(other.trees)
-
-    def updated_key(self, node:BinomialNode):
-        while node.parent is not None and node < node.parent:
-            p = node.parent
-            g = p.parent
-            if g is not None:
-                g.children.remove(p)
-                g.children.append(node)
-            p.children.remove(node)
-            p.children, node.children = node.children, p.children
-            node.children.append(p)
-        raise NotImplementedError('Updating keys not supported yet')
+        """Move all the items of other into this heap, leaving other empty."""
+        return self.meld(other)
+
+    def meld(self, *heaps):
+        """
+        Move all the items of several heaps into this one in a single pass,
+        leaving the others empty. All heaps should use the same key function.
+        :return: Itself.
+        """
+        heaps = [h for h in heaps if h is not self]
+        seen = set(self.__handles)
+        for h in heaps:
+            if not seen.isdisjoint(h.__handles):
+                raise ValueError('The heaps to meld share some items.')
+            seen.update(h.__handles)
+        trees = []
+        for h in heaps:
+            trees.extend(h.trees)
+            self.__size += h.__size
+            self.__handles.update(h.__handles)
+            h.trees, h.__min, h.__size, h.__handles = [], None, 0, dict()
+        self.__add_heap(trees)
+        return self
+
+    def decrease_key(self, handle:BinomialHandle):
+        """
+        Signal that the key of the item behind handle has decreased.
+        :param handle: The handle returned by push.
+        """
+        newkey = self.key(handle.content)
+        if handle.key < newkey:
+            raise ValueError('The new key is greater than the old one.')
+        handle.key = newkey
+        node = self.__bubble_up(handle.node)
+        if node.parent is None and node.key < self.__min.key:
+            self.__min = node
+
+    def delete(self, handle:BinomialHandle):
+        """
+        Remove the item behind handle from the heap.
+        :return: The item.
+        """
+        self.__min = self.__bubble_up(handle.node, force=True)
+        return self.pop()
+
+    def updated_key(self, item):
+        """Move an item whose key changed, as in PriorityQueue."""
+        handle = self.__handles[item]
+        if self.key(item) <= handle.key:
+            self.decrease_key(handle)
+        else:
+            self.delete(handle)
+            self.push(item)
+
+    def handle(self, item):
+        return self.__handles[item]
+
+    def __contains__(self, item):
+        return item in self.__handles
+
+    def __len__(self):
+        return self.__size
+
+    def __bool__(self):
+        return self.__min is not None
+
+    @staticmethod
+    def __bubble_up(node, force=False):
+        """Swap the handle of node with its ancestors' while it is smaller (or always, if force).
+            Returns the node finally holding the handle.
+        """
+        while node.parent is not None and (force or node.key < node.parent.key):
+            parent = node.parent
+            node.handle, parent.handle = parent.handle, node.handle
+            node.handle.node = node
+            parent.handle.node = parent
+            node = parent
+        return node
 
     def __add_heap(self, l):
-        """ Binary addition motherfucker
-            ...Here be dragons
+        """ Binary addition of the trees in l to the trees of this heap.
+            Trees are linked in increasing order of degree, carrying
+            into the next degree like the bits of a sum.
         """
-        i = 0
-        carry = None
-        while i <= max(len(l), len(self.trees)):
-            tba = []
-            if i < len(self.trees) and self.trees[i] is not None:
-                tba.append(self.trees[i])
-            if i < len(l) and l[i] is not None:
-                tba.append(l[i])
-            if carry is not None:
-                tba.append(carry)
-
-            if len(tba) == 0:
-                pass
-            elif len(tba) == 1:
-                if i >= len(self.trees):
-                    self.trees.append(tba[0])
-                else:
-                    self.trees[i] = tba[0]
-            elif len(tba) == 2:
-                carry = BinomialTree.merge(tba[0], tba[1])
-                if i >= len(self.trees):
-                    self.trees.append(None)
-                else:
-                    self.trees[i] = None
-            elif len(tba) == 3:
-                aux = BinomialTree.merge(tba[0], tba[1])
-                if i >= len(self.trees):
-                    self.trees.append(tba[2])
-                else:
-                    self.trees[i] = tba[2]
-                carry = aux
-
-            i += 1
+        table = []
+        for tree in sorted(self.trees + list(l), key=lambda t: t.degree):
+            d = tree.degree
+            while d < len(table) and table[d] is not None:
+                tree = BinomialNode.link(table[d], tree)
+                table[d] = None
+                d += 1
+            if d >= len(table):
+                table.extend([None] * (d + 1 - len(table)))
+            table[d] = tree
+
+        self.trees = [tree for tree in table if tree is not None]
+        self.__min = None
+        for tree in self.trees:
+            if self.__min is None or tree.key < self.__min.key:
+                self.__min = tree
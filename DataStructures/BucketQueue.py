@@ -0,0 +1,80 @@
+class BucketQueue:
+    """A monotone priority queue for non-negative integer keys (Dial's buckets).
+        Items live in one bucket per key value, and a cursor walks the keys upwards,
+        so every operation is O(1) apart from skipping over empty keys.
+        Monotone: no key may ever be smaller than the last one popped,
+        which holds e.g. for Dijkstra with non-negative integer weights.
+        It has the same interface as PriorityQueue.
+    """
+
+    monotone = True
+
+    def __init__(self, arr=(), key=lambda arg: arg):
+        self.key = key
+        self.__buckets = dict()
+        self.__keys = dict()
+        self.__cursor = 0
+        for x in arr:
+            self.push(x)
+
+    def get_min(self):
+        return next(iter(self.__buckets[self.__advance()]))
+
+    def pop(self):
+        k = self.__advance()
+        bucket = self.__buckets[k]
+        item = next(iter(bucket))
+        del bucket[item]
+        if not bucket:
+            del self.__buckets[k]
+        del self.__keys[item]
+        return item
+
+    def push(self, x):
+        if x in self.__keys:
+            raise ValueError(str(x) + ' is already in the queue.')
+        k = self.key(x)
+        if k < self.__cursor:
+            raise ValueError('Key ' + str(k) + ' is below the last extracted key ' + str(self.__cursor)
+                             + '; a bucket queue must be monotone.')
+        self.__keys[x] = k
+        bucket = self.__buckets.get(k)
+        if bucket is None:
+            self.__buckets[k] = bucket = dict()
+        bucket[x] = None
+
+    def push_all(self, xs):
+        for x in xs:
+            self.push(x)
+
+    def updated_key(self, item):
+        self.remove(item)
+        self.push(item)
+
+    def decrease_key(self, item):
+        self.updated_key(item)
+
+    def remove(self, item):
+        k = self.__keys.pop(item)
+        bucket = self.__buckets[k]
+        del bucket[item]
+        if not bucket:
+            del self.__buckets[k]
+
+    def __advance(self):
+        """Move the cursor to the smallest non-empty bucket and return its key."""
+        if not self.__keys:
+            raise IndexError('pop from an empty queue')
+        buckets = self.__buckets
+        while self.__cursor not in buckets:
+            self.__cursor += 1
+        return self.__cursor
+
+    def __contains__(self, item):
+        return item in self.__keys
+
+    def __len__(self):
+        return len(self.__keys)
+
+    def __bool__(self):
+        return bool(self.__keys)
@@ -1,45 +1,151 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class IntDisjointSet:
+    """ A collection of disjoint sets on the integers 0 .. n-1
+        Uses a forest representation, held in two arrays (parent and size),
+        with union by size and path halving.
+    """
+    def __init__(self, n=0):
+        self.parent = array('q', range(n))
+        self.size = array('q', [1]) * n
+        self.num_of_sets = n
+
+    def add(self):
+        """
+        Add a new singleton set.
+        :return: Its element.
+        """
+        x = len(self.parent)
+        self.parent.append(x)
+        self.size.append(1)
+        self.num_of_sets += 1
+        return x
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, x, y):
+        """
+        Merge the sets of x and y.
+        :return: Whether they were different sets.
+        """
+        x = self.find(x)
+        y = self.find(y)
+        if x == y:
+            return False
+        if self.size[x] < self.size[y]:
+            x, y = y, x
+        self.parent[y] = x
+        self.size[x] += self.size[y]
+        self.num_of_sets -= 1
+        return True
+
+    def same(self, x, y):
+        return self.find(x) == self.find(y)
+
+    def union_many(self, xs, ys):
+        """
+        Merge the sets of xs[i] and ys[i], for every i in turn.
+        :return: A list of bools: whether the i-th pair was in different sets before its merge.
+        """
+        parent, size = self.parent, self.size
+        merged = []
+        for (x, y) in zip(xs, ys):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            while parent[y] != y:
+                parent[y] = parent[parent[y]]
+                y = parent[y]
+            if x == y:
+                merged.append(False)
+                continue
+            if size[x] < size[y]:
+                x, y = y, x
+            parent[y] = x
+            size[x] += size[y]
+            merged.append(True)
+        self.num_of_sets -= merged.count(True)
+        return merged
+
+    def find_many(self, xs):
+        """
+        Find the representatives of many elements at once. With NumPy, all the queried
+        elements climb their trees together, one level per vectorized step, and are then
+        pointed straight at their roots; the rest of the forest is left as it is, so a call
+        costs O(len(xs)) per level of the deepest tree involved.
+        :return: The representatives, as a NumPy array if NumPy is available, a list otherwise.
+        """
+        if np is None:
+            return [self.find(x) for x in xs]
+        parent = np.frombuffer(self.parent, dtype=np.int64)
+        xs = np.asarray(xs, dtype=np.int64)
+        roots = parent[xs]
+        while True:
+            up = parent[roots]
+            if np.array_equal(up, roots):
+                break
+            roots = up
+        parent[xs] = roots
+        return roots
+
+    def labels(self):
+        """
+        Label the sets 0 .. num_of_sets-1, in the order of their smallest elements.
+        :return: The label of every element, as a NumPy array if NumPy is available, an array otherwise.
+        """
+        roots = self.find_many(range(len(self.parent)))
+        if np is not None:
+            uniq, first, inverse = np.unique(roots, return_index=True, return_inverse=True)
+            label = np.empty(len(uniq), dtype=np.int64)
+            label[np.argsort(first)] = np.arange(len(uniq))
+            return label[inverse.ravel()]
+        label = dict()
+        return array('q', (label.setdefault(r, len(label)) for r in roots))
+
+    def __len__(self):
+        return len(self.parent)
+
+
 class DisjointSet:
     """ A collection of disjoint sets on a universe of elements
-        Uses a forest representation.
+        Uses a forest representation: the elements are numbered in
+        the order they are added, and the sets of these numbers are
+        held in an IntDisjointSet.
     """
     def __init__(self, iterable):
-        self.roots = []
-        self.parent = dict()
-        self.rank = dict()
-        self.num_of_sets = 0
+        self.index = dict()
+        self.items = []
+        self.sets = IntDisjointSet()
         for x in iterable:
             self.add_singleton(x)
 
+    @property
+    def num_of_sets(self):
+        return self.sets.num_of_sets
+
     def add_singleton(self, item):
-        self.roots.append(item)
-        self.rank[item] = 0
-        self.parent[item] = None
-        self.num_of_sets += 1
+        self.index[item] = self.sets.add()
+        self.items.append(item)
 
     def merge(self, u, v):
-        u = self.find_set(u)
-        v = self.find_set(v)
-        if self.rank[u] > self.rank[v]:
-            self.parent[v] = u
-        elif self.rank[v] > self.rank[u]:
-            self.parent[u] = v
-        else:
-            self.parent[v] = u
-            self.rank[u] += 1
-        self.num_of_sets -= 1
+        return self.sets.union(self.index[u], self.index[v])
 
     def same_set(self, u, v):
-        return self.find_set(u) == self.find_set(v)
+        return self.sets.same(self.index[u], self.index[v])
 
     def find_set(self, item):
-        passed = []
-        while self.parent[item]:
-            passed.append(item)
-            item = self.parent[item]
-        root = item
-        for item in passed:
-            self.parent[item] = root
-        return root
+        return self.items[self.sets.find(self.index[item])]
 
     def __str__(self):
-        return str(['<'+str(item)+':'+str(self.parent[item])+'>' for item in self.parent])
+        return str(['<' + str(item) + ':' + str(self.find_set(item)) + '>' for item in self.items])
@@ -1,22 +1,16 @@
 class FibonacciHeapNode:
-    """An element of a fib-heap"""
+    """An element of a fib-heap. push() returns it as a handle to the item."""
 
-    def __init__(self, content):
+    def __init__(self, content, key):
         self.content = content
-        self.left = None
-        self.right = None
+        self.key = key
+        self.left = self
+        self.right = self
         self.parent = None
         self.child = None
-        self.degree = None
+        self.degree = 0
         self.flag = False
 
-    def reset(self):
-        self.left = None
-        self.right = None
-        self.parent = None
-        self.flag = False
-        return self
-
     def traverse(self):
         yield self
         current = self.right
@@ -26,94 +20,212 @@ class FibonacciHeapNode:
 
 
 class FibonacciHeap:
-    """A type of priority queue that is lazy"""
-
-    def __init__(self, iterable, key=lambda arg: arg):
+    """A type of priority queue that is lazy.
+        push and decrease_key take O(1) amortised time, pop takes O(log n) amortised.
+        Besides the handle interface, it has the same interface as PriorityQueue.
+        As in every queue of DataStructures.Queues, the items must be hashable, and
+        pushing an item already in the heap raises a ValueError.
+    """
+
+    def __init__(self, iterable=(), key=lambda arg: arg):
         self.min = None
         self.cont_key = key
+        self.__size = 0
+        self.__handles = dict()
         for item in iterable:
-            self.push(FibonacciHeapNode(item))
+            self.push(item)
 
     def key(self, node:FibonacciHeapNode):
-        return self.cont_key(node.content)
-
-    def push(self, node:FibonacciHeapNode):
-        if self.min is None:
-            self.min = node.reset()
-            self.min.right = self.min
-            self.min.left = self.min
-        else:
-            node.reset()
-            node.right = self.min.right
-            self.min.right.left = node
-            node.left = self.min
-            self.min.right = node
-            if self.key(node) < self.key(self.min):
-                self.min = node
+        return node.key
+
+    def push(self, item):
+        """
+        Add an item to the heap.
+        :param item: The item.
+        :return: The node holding the item, to be used as a handle for decrease_key and delete.
+        """
+        if item in self.__handles:
+            raise ValueError(str(item) + ' is already in the queue.')
+        node = FibonacciHeapNode(item, self.cont_key(item))
+        self.__add_root(node)
+        if node.key < self.min.key:
+            self.min = node
+        self.__size += 1
+        self.__handles[item] = node
+        return node
+
+    def push_all(self, items):
+        for item in items:
+            self.push(item)
 
     def merge(self, f):
-        """ UNTESTED AND POTENTIALLY DANGEROUS """
-        oldleft = self.min.left
-        self.min.left = f.min.left
-        self.min.left.right = self.min
-        f.min.left = oldleft
-        oldleft.right = f.min
-
-        if self.key(f.min) < self.key(self.min):
+        """
+        Move all the items of the fib-heap f into this one. f is left empty.
+        Both heaps should use the same key function, and hold distinct items.
+        :return: Itself.
+        """
+        if f is self or f.min is None:
+            return self
+        if not self.__handles.keys().isdisjoint(f.__handles):
+            raise ValueError('The heaps to merge share some items.')
+        if self.min is None:
             self.min = f.min
+        else:
+            self.__splice(self.min, f.min)
+            if f.min.key < self.min.key:
+                self.min = f.min
+        self.__size += f.__size
+        self.__handles.update(f.__handles)
+        f.min, f.__size, f.__handles = None, 0, dict()
         return self
 
     def get_min(self):
         return self.min.content
 
-    def __cut(self, node:FibonacciHeapNode):
-        continuing = True
-        while continuing:
-            if node.parent is None:
-                continuing = False
-            else:
-                if node.parent.child is node:
-                    if node.right is not node:
-                        node.parent.child = node.right
-                    else:
-                        node.parent.child = None
-
-                if not node.parent.flag:
-                    node.parent.flag = True
-                    continuing = False
-
-                node.left.right = node.right
-                node.right.left = node.left
-                node.parent.degree -= 1
-
-                parent = node.parent
-                self.push(node)
-                node = parent
-
-    def __link(self):
-        raise NotImplementedError('Linking step not implemented yet.')
-
     def pop(self):
-        # cut all the children of min
-        while self.min.child:
-            self.__cut(self.min.child)
+        z = self.min
+        if z is None:
+            raise IndexError('pop from an empty heap')
+
+        # move all the children of min to the root list
+        if z.child is not None:
+            for child in list(z.child.traverse()):
+                child.parent = None
+                child.flag = False
+            self.__splice(z, z.child)
+            z.child = None
 
         # cut min out
-        contmin = self.min.content
-        self.min.right.left = self.min.left
-        self.min.left.right = self.min.right
-        self.min = self.min.right
-
-        # perform the linking step
-        self.__link()
-
-        # find new minimum root
-        node = self.min.right
-        running_min = self.min
-        while node is not self.min:
-            if self.key(node) < self.key(running_min):
-                running_min = node
-            node = node.right
-        self.min = running_min
-
-        return contmin
+        if z.right is z:
+            self.min = None
+        else:
+            self.min = z.right
+            self.__unlink(z)
+            self.__consolidate()
+
+        self.__size -= 1
+        del self.__handles[z.content]
+        return z.content
+
+    def decrease_key(self, node:FibonacciHeapNode):
+        """
+        Signal that the key of the item held by node has decreased.
+        :param node: The handle returned by push.
+        """
+        newkey = self.cont_key(node.content)
+        if node.key < newkey:
+            raise ValueError('The new key is greater than the old one.')
+        node.key = newkey
+        parent = node.parent
+        if parent is not None and node.key < parent.key:
+            self.__cut(node)
+            self.__cascading_cut(parent)
+        if node.key < self.min.key:
+            self.min = node
+
+    def delete(self, node:FibonacciHeapNode):
+        """
+        Remove the item held by node from the heap.
+        :param node: The handle returned by push.
+        :return: The item.
+        """
+        parent = node.parent
+        if parent is not None:
+            self.__cut(node)
+            self.__cascading_cut(parent)
+        self.min = node
+        return self.pop()
+
+    def updated_key(self, item):
+        """Move an item whose key changed, as in PriorityQueue."""
+        node = self.__handles[item]
+        if self.cont_key(item) <= node.key:
+            self.decrease_key(node)
+        else:
+            self.delete(node)
+            self.push(item)
+
+    def handle(self, item):
+        return self.__handles[item]
+
+    def __contains__(self, item):
+        return item in self.__handles
+
+    def __len__(self):
+        return self.__size
+
+    def __bool__(self):
+        return self.min is not None
+
+    @staticmethod
+    def __splice(a:FibonacciHeapNode, b:FibonacciHeapNode):
+        """Join the circular list containing b into the one containing a."""
+        a_right, b_left = a.right, b.left
+        a.right, b.left = b, a
+        b_left.right, a_right.left = a_right, b_left
+
+    @staticmethod
+    def __unlink(node:FibonacciHeapNode):
+        """Remove node from its circular list, leaving it as a singleton."""
+        node.left.right = node.right
+        node.right.left = node.left
+        node.left = node.right = node
+
+    def __add_root(self, node:FibonacciHeapNode):
+        node.parent = None
+        node.flag = False
+        if self.min is None:
+            self.min = node
+        else:
+            self.__splice(self.min, node)
+
+    def __cut(self, node:FibonacciHeapNode):
+        """Cut node from its parent and make it a root."""
+        parent = node.parent
+        if parent.child is node:
+            parent.child = node.right if node.right is not node else None
+        self.__unlink(node)
+        parent.degree -= 1
+        self.__add_root(node)
+
+    def __cascading_cut(self, node:FibonacciHeapNode):
+        """Walk up from a node which lost a child, cutting every flagged ancestor."""
+        while node.parent is not None:
+            if not node.flag:
+                node.flag = True
+                return
+            parent = node.parent
+            self.__cut(node)
+            node = parent
+
+    def __link(self, child:FibonacciHeapNode, parent:FibonacciHeapNode):
+        """Make the root child a child of the root parent."""
+        self.__unlink(child)
+        child.parent = parent
+        child.flag = False
+        if parent.child is None:
+            parent.child = child
+        else:
+            self.__splice(parent.child, child)
+        parent.degree += 1
+
+    def __consolidate(self):
+        """Link roots of equal degree until all roots have distinct degrees, then find the new min."""
+        table = []
+        for node in list(self.min.traverse()):
+            d = node.degree
+            while d < len(table) and table[d] is not None:
+                other = table[d]
+                if other.key < node.key:
+                    node, other = other, node
+                self.__link(other, node)
+                table[d] = None
+                d += 1
+            if d >= len(table):
+                table.extend([None] * (d + 1 - len(table)))
+            table[d] = node
+
+        self.min = None
+        for node in table:
+            if node is not None and (self.min is None or node.key < self.min.key):
+                self.min = node
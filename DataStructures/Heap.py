@@ -21,7 +21,7 @@ class Heap:
 
         toreturn = self.__arr[0]
         self.__arr[0], self.__arr[-1] = self.__arr[-1], self.__arr[0]
-        self.__arr = self.__arr[:-1]
+        self.__arr.pop()
         Heap._sift(0, self.__arr, key=self.key)
         return toreturn
 
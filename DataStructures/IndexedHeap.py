@@ -0,0 +1,120 @@
+class IndexedHeap:
+    """A d-ary MIN heap which remembers the position of every item it holds.
+        The position map makes membership tests O(1) and lets an item whose key
+        changed be moved in O(log n), without searching for it.
+        Items must be hashable and distinct. The key of every item is cached when
+        it enters the heap, so updated() must be called whenever a key changes.
+    """
+
+    def __init__(self, arr=(), key=lambda arg: arg, arity=2):
+        if arity < 2:
+            raise ValueError('The arity of a heap must be at least 2, not ' + str(arity))
+        self.key = key
+        self.arity = arity
+        self.__items = list(arr)
+        self.__keys = [key(x) for x in self.__items]
+        self.__pos = {x: i for (i, x) in enumerate(self.__items)}
+        if len(self.__pos) != len(self.__items):
+            raise ValueError('The items of an indexed heap must be distinct.')
+        for n in range((len(self.__items) - 2) // arity, -1, -1):
+            self.__sift(n)
+
+    def get_min(self):
+        return self.__items[0]
+
+    def extract_min(self):
+        """Extract the root of the heap and return it"""
+        items, keys = self.__items, self.__keys
+        toreturn = items[0]
+        last, lastkey = items.pop(), keys.pop()
+        del self.__pos[toreturn]
+        if items:
+            items[0], keys[0] = last, lastkey
+            self.__pos[last] = 0
+            self.__sift(0)
+        return toreturn
+
+    def add(self, x):
+        """Add an element to the heap
+            Returns the final index of the element
+        """
+        if x in self.__pos:
+            raise ValueError(str(x) + ' is already in the heap.')
+        self.__items.append(x)
+        self.__keys.append(self.key(x))
+        self.__pos[x] = len(self.__items) - 1
+        return self.__move_up(len(self.__items) - 1)
+
+    def add_all(self, iterable):
+        for x in iterable:
+            self.add(x)
+
+    def updated(self, item):
+        """
+        Move an item whose key changed up or down the heap, as appropriate.
+        :param item: The updated object
+        :return: The new index of the element
+        """
+        i = self.__pos[item]
+        oldkey = self.__keys[i]
+        self.__keys[i] = newkey = self.key(item)
+        if newkey < oldkey:
+            return self.__move_up(i)
+        return self.__sift(i)
+
+    def remove(self, item):
+        """Remove an arbitrary item from the heap."""
+        i = self.__pos.pop(item)
+        items, keys = self.__items, self.__keys
+        last, lastkey = items.pop(), keys.pop()
+        if i < len(items):
+            items[i], keys[i] = last, lastkey
+            self.__pos[last] = i
+            self.__move_up(i)
+            self.__sift(self.__pos[last])
+
+    def __len__(self):
+        return len(self.__items)
+
+    def __bool__(self):
+        return bool(self.__items)
+
+    def __contains__(self, item):
+        return item in self.__pos
+
+    def __sift(self, n):
+        """Move the element at index n down until the heap property holds. Returns its final index."""
+        items, keys, pos, d = self.__items, self.__keys, self.__pos, self.arity
+        length = len(items)
+        item, k = items[n], keys[n]
+        while True:
+            first = d * n + 1
+            if first >= length:
+                break
+            c, ck = first, keys[first]
+            for j in range(first + 1, min(first + d, length)):
+                if keys[j] < ck:
+                    c, ck = j, keys[j]
+            if not ck < k:
+                break
+            items[n], keys[n] = items[c], ck
+            pos[items[n]] = n
+            n = c
+        items[n], keys[n] = item, k
+        pos[item] = n
+        return n
+
+    def __move_up(self, n):
+        """Move the element at index n up until the heap property holds. Returns its final index."""
+        items, keys, pos, d = self.__items, self.__keys, self.__pos, self.arity
+        item, k = items[n], keys[n]
+        while n > 0:
+            p = (n - 1) // d
+            if not k < keys[p]:
+                break
+            items[n], keys[n] = items[p], keys[p]
+            pos[items[n]] = n
+            n = p
+        items[n], keys[n] = item, k
+        pos[item] = n
+        return n
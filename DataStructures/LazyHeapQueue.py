@@ -0,0 +1,68 @@
+import heapq
+import itertools
+
+
+class LazyHeapQueue:
+    """A priority queue on top of the standard library heapq, with lazy deletion.
+        A key update pushes a fresh entry and marks the old one as stale;
+        stale entries are skipped when they reach the top. It has the same
+        interface as PriorityQueue, trading memory for very cheap operations.
+    """
+
+    _REMOVED = object()
+
+    def __init__(self, arr=(), key=lambda arg: arg):
+        self.key = key
+        self.__counter = itertools.count()
+        self.__entries = dict()
+        self.__heap = []
+        for x in arr:
+            if x in self.__entries:
+                raise ValueError(str(x) + ' is already in the queue.')
+            self.__entries[x] = entry = [key(x), next(self.__counter), x]
+            self.__heap.append(entry)
+        heapq.heapify(self.__heap)
+
+    def get_min(self):
+        self.__drop_stale()
+        return self.__heap[0][2]
+
+    def pop(self):
+        self.__drop_stale()
+        item = heapq.heappop(self.__heap)[2]
+        del self.__entries[item]
+        return item
+
+    def push(self, x):
+        if x in self.__entries:
+            raise ValueError(str(x) + ' is already in the queue.')
+        self.__entries[x] = entry = [self.key(x), next(self.__counter), x]
+        heapq.heappush(self.__heap, entry)
+
+    def push_all(self, xs):
+        for x in xs:
+            self.push(x)
+
+    def updated_key(self, item):
+        self.remove(item)
+        self.push(item)
+
+    def decrease_key(self, item):
+        self.updated_key(item)
+
+    def remove(self, item):
+        self.__entries.pop(item)[2] = LazyHeapQueue._REMOVED
+
+    def __drop_stale(self):
+        heap = self.__heap
+        while heap[0][2] is LazyHeapQueue._REMOVED:
+            heapq.heappop(heap)
+
+    def __contains__(self, item):
+        return item in self.__entries
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __bool__(self):
+        return bool(self.__entries)
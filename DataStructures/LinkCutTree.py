@@ -0,0 +1,165 @@
+import math
+
+
+class LinkCutTree:
+    """A forest of rooted trees under links and cuts (Sleator and Tarjan), in amortized O(log n).
+        Every vertex has a value, and path_max finds the vertex of largest value on the path
+        between two vertices. To weigh the edges of a forest instead, give each edge a vertex
+        of its own, linked between its two endpoints, and the endpoints the value -inf.
+        Each preferred path is kept in a splay tree ordered by depth; the trees are made
+        undirected by re-rooting (evert), with a lazy reversal flag.
+        The vertices are the integers returned by add, and the state is held in parallel lists.
+    """
+
+    def __init__(self):
+        self.left = []
+        self.right = []
+        self.parent = []
+        self.flip = []
+        self.value = []
+        self.best = []
+
+    def add(self, value=-math.inf):
+        """
+        Add a new vertex, on its own.
+        :return: Its id.
+        """
+        x = len(self.value)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.parent.append(-1)
+        self.flip.append(False)
+        self.value.append(value)
+        self.best.append(x)
+        return x
+
+    def set_value(self, x, value):
+        self.__access(x)
+        self.value[x] = value
+        self.__update(x)
+
+    def link(self, x, y):
+        """Join the trees of x and y with the edge (x, y). They must be in different trees."""
+        self.__evert(x)
+        self.parent[x] = y
+
+    def cut(self, x, y):
+        """Remove the edge (x, y), which must be in the forest."""
+        self.__evert(x)
+        self.__access(y)
+        # x is now the only vertex shallower than y on its path, so it is y's left subtree
+        self.parent[self.left[y]] = -1
+        self.left[y] = -1
+        self.__update(y)
+
+    def connected(self, x, y):
+        return x == y or self.find_root(x) == self.find_root(y)
+
+    def find_root(self, x):
+        """The root of the tree of x (which changes whenever a tree is re-rooted)."""
+        self.__access(x)
+        while True:
+            self.__push(x)
+            if self.left[x] == -1:
+                break
+            x = self.left[x]
+        self.__splay(x)
+        return x
+
+    def path_max(self, x, y):
+        """
+        :return: The vertex of largest value on the path from x to y, which must be connected.
+        """
+        self.__evert(x)
+        self.__access(y)
+        return self.best[y]
+
+    def __is_root(self, x):
+        """Whether x is the root of its splay tree."""
+        p = self.parent[x]
+        return p == -1 or (self.left[p] != x and self.right[p] != x)
+
+    def __update(self, x):
+        best, value = self.best, self.value
+        b = x
+        l, r = self.left[x], self.right[x]
+        if l != -1 and value[best[l]] > value[b]:
+            b = best[l]
+        if r != -1 and value[best[r]] > value[b]:
+            b = best[r]
+        best[x] = b
+
+    def __push(self, x):
+        if self.flip[x]:
+            self.flip[x] = False
+            l, r = self.left[x], self.right[x]
+            self.left[x], self.right[x] = r, l
+            if l != -1:
+                self.flip[l] = not self.flip[l]
+            if r != -1:
+                self.flip[r] = not self.flip[r]
+
+    def __rotate(self, x):
+        left, right, parent = self.left, self.right, self.parent
+        p = parent[x]
+        g = parent[p]
+        if not self.__is_root(p):
+            if left[g] == p:
+                left[g] = x
+            else:
+                right[g] = x
+        parent[x] = g
+        if left[p] == x:
+            left[p] = right[x]
+            if right[x] != -1:
+                parent[right[x]] = p
+            right[x] = p
+        else:
+            right[p] = left[x]
+            if left[x] != -1:
+                parent[left[x]] = p
+            left[x] = p
+        parent[p] = x
+        self.__update(p)
+        self.__update(x)
+
+    def __splay(self, x):
+        # push the pending flips down from the root of the splay tree first
+        path = [x]
+        y = x
+        while not self.__is_root(y):
+            y = self.parent[y]
+            path.append(y)
+        for y in reversed(path):
+            self.__push(y)
+
+        while not self.__is_root(x):
+            p = self.parent[x]
+            if not self.__is_root(p):
+                g = self.parent[p]
+                if (self.left[g] == p) == (self.left[p] == x):
+                    self.__rotate(p)
+                else:
+                    self.__rotate(x)
+            self.__rotate(x)
+
+    def __access(self, x):
+        """Make the path from the root of the tree to x preferred, with x at the root of its splay tree."""
+        last = -1
+        y = x
+        while y != -1:
+            self.__splay(y)
+            self.right[y] = last
+            self.__update(y)
+            last = y
+            y = self.parent[y]
+        self.__splay(x)
+
+    def __evert(self, x):
+        """Make x the root of its tree."""
+        self.__access(x)
+        self.flip[x] = not self.flip[x]
+        self.__push(x)
+
+    def __len__(self):
+        return len(self.value)
@@ -0,0 +1,165 @@
+class PairingHeapNode:
+    """An element of a pairing heap. push() returns it as a handle to the item.
+        The children of a node form a doubly linked list: child points at the
+        first one, and prev points at the left sibling (or the parent, for a first child).
+    """
+
+    def __init__(self, content, key):
+        self.content = content
+        self.key = key
+        self.child = None
+        self.sibling = None
+        self.prev = None
+
+
+class PairingHeap:
+    """A self-adjusting heap-ordered tree. push, merge and decrease_key are O(1),
+        pop is O(log n) amortised; in practice it is one of the fastest
+        heaps with decrease-key.
+        Besides the handle interface, it has the same interface as PriorityQueue.
+        As in every queue of DataStructures.Queues, the items must be hashable, and
+        pushing an item already in the heap raises a ValueError.
+    """
+
+    def __init__(self, iterable=(), key=lambda arg: arg):
+        self.root = None
+        self.key = key
+        self.__size = 0
+        self.__handles = dict()
+        for item in iterable:
+            self.push(item)
+
+    def push(self, item):
+        """
+        Add an item to the heap.
+        :return: The node holding the item, to be used with decrease_key and delete.
+        """
+        if item in self.__handles:
+            raise ValueError(str(item) + ' is already in the queue.')
+        node = PairingHeapNode(item, self.key(item))
+        self.root = self.__meld(self.root, node)
+        self.__size += 1
+        self.__handles[item] = node
+        return node
+
+    def push_all(self, items):
+        for item in items:
+            self.push(item)
+
+    def get_min(self):
+        return self.root.content
+
+    def pop(self):
+        root = self.root
+        if root is None:
+            raise IndexError('pop from an empty heap')
+        self.root = self.__merge_pairs(root.child)
+        if self.root is not None:
+            self.root.prev = None
+        self.__size -= 1
+        del self.__handles[root.content]
+        return root.content
+
+    def merge(self, other):
+        """Move all the items of other into this heap, leaving other empty."""
+        if other is self:
+            return self
+        if not self.__handles.keys().isdisjoint(other.__handles):
+            raise ValueError('The heaps to merge share some items.')
+        self.root = self.__meld(self.root, other.root)
+        self.__size += other.__size
+        self.__handles.update(other.__handles)
+        other.root, other.__size, other.__handles = None, 0, dict()
+        return self
+
+    def decrease_key(self, node:PairingHeapNode):
+        """Signal that the key of the item held by node has decreased."""
+        newkey = self.key(node.content)
+        if node.key < newkey:
+            raise ValueError('The new key is greater than the old one.')
+        node.key = newkey
+        if node is not self.root:
+            self.__detach(node)
+            self.root = self.__meld(self.root, node)
+
+    def delete(self, node:PairingHeapNode):
+        """Remove the item held by node from the heap. Returns the item."""
+        if node is self.root:
+            return self.pop()
+        self.__detach(node)
+        self.root = self.__meld(self.root, self.__merge_pairs(node.child))
+        node.child = None
+        self.__size -= 1
+        del self.__handles[node.content]
+        return node.content
+
+    def updated_key(self, item):
+        """Move an item whose key changed, as in PriorityQueue."""
+        node = self.__handles[item]
+        if self.key(item) <= node.key:
+            self.decrease_key(node)
+        else:
+            self.delete(node)
+            self.push(item)
+
+    def handle(self, item):
+        return self.__handles[item]
+
+    def __contains__(self, item):
+        return item in self.__handles
+
+    def __len__(self):
+        return self.__size
+
+    def __bool__(self):
+        return self.root is not None
+
+    @staticmethod
+    def __meld(a, b):
+        """Link two heap-ordered trees; the larger root becomes the first child of the smaller."""
+        if a is None:
+            return b
+        if b is None:
+            return a
+        if b.key < a.key:
+            a, b = b, a
+        b.prev = a
+        b.sibling = a.child
+        if a.child is not None:
+            a.child.prev = b
+        a.child = b
+        a.sibling = None
+        return a
+
+    @staticmethod
+    def __detach(node):
+        """Cut the subtree rooted at node out of its parent's child list."""
+        if node.prev.child is node:
+            node.prev.child = node.sibling
+        else:
+            node.prev.sibling = node.sibling
+        if node.sibling is not None:
+            node.sibling.prev = node.prev
+        node.prev = None
+        node.sibling = None
+
+    def __merge_pairs(self, first):
+        """The two-pass pairing of a list of siblings: meld them in pairs left to right,
+            then meld the pairs right to left. Returns the new root.
+        """
+        pairs = []
+        while first is not None:
+            a = first
+            b = a.sibling
+            if b is None:
+                a.prev = a.sibling = None
+                pairs.append(a)
+                break
+            first = b.sibling
+            a.prev = a.sibling = b.prev = b.sibling = None
+            pairs.append(self.__meld(a, b))
+
+        root = None
+        for tree in reversed(pairs):
+            root = self.__meld(tree, root)
+        return root
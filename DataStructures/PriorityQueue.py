@@ -1,13 +1,15 @@
-from DataStructures.Heap import Heap
+from DataStructures.IndexedHeap import IndexedHeap
 
 
 class PriorityQueue:
     """A queue in which items are sorted by priority.
-        Uses an underlying heap representation.
+        Uses an underlying indexed d-ary heap (binary by default), so push, pop
+        and key updates are O(log n) and membership tests are O(1).
+        Items must be hashable and may be in the queue at most once.
     """
 
-    def __init__(self, arr, key=lambda arg: arg):
-        self.__heap = Heap(arr, key=key)
+    def __init__(self, arr, key=lambda arg: arg, arity=2):
+        self.__heap = IndexedHeap(arr, key=key, arity=arity)
 
     def get_min(self):
         return self.__heap.get_min()
@@ -24,8 +26,18 @@ class PriorityQueue:
     def updated_key(self, item):
         self.__heap.updated(item)
 
+    def decrease_key(self, item):
+        """Signal that the key of item has decreased."""
+        self.__heap.updated(item)
+
+    def remove(self, item):
+        self.__heap.remove(item)
+
     def __contains__(self, item):
         return item in self.__heap
 
+    def __len__(self):
+        return len(self.__heap)
+
     def __bool__(self):
         return bool(self.__heap)
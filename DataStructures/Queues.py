@@ -0,0 +1,52 @@
+from functools import partial
+
+from DataStructures.PriorityQueue import PriorityQueue
+from DataStructures.FibonacciHeap import FibonacciHeap
+from DataStructures.BinomialHeap import BinomialHeap
+from DataStructures.PairingHeap import PairingHeap
+from DataStructures.LazyHeapQueue import LazyHeapQueue
+from DataStructures.BucketQueue import BucketQueue
+from DataStructures.RadixHeap import RadixHeap
+
+
+# The priority queue backends which the graph algorithms can be asked for by name.
+# Every entry is called as factory(iterable, key=...) and must support
+# push, pop, get_min, updated_key, __contains__, __len__ and __bool__.
+# The items must be hashable and distinct: building a queue with an item twice,
+# or pushing an item already in it, raises a ValueError.
+QUEUES = {
+    'binary': PriorityQueue,
+    '4-ary': partial(PriorityQueue, arity=4),
+    'fibonacci': FibonacciHeap,
+    'binomial': BinomialHeap,
+    'pairing': PairingHeap,
+    'heapq': LazyHeapQueue,
+    'bucket': BucketQueue,
+    'radix': RadixHeap,
+}
+
+
+def register_queue(name, factory):
+    """Make a priority queue backend available under name."""
+    QUEUES[name] = factory
+
+
+def queue_factory(queue):
+    """
+    Resolve a priority queue backend.
+    :param queue: A registered name, 'd-ary' for any integer d >= 2 (e.g. '8-ary'),
+                  or a class/callable to be used as is.
+    :return: A callable building the queue as factory(iterable, key=...).
+    """
+    if callable(queue):
+        return queue
+    if queue in QUEUES:
+        return QUEUES[queue]
+    if isinstance(queue, str) and queue.endswith('-ary') and queue[:-4].isdigit():
+        return partial(PriorityQueue, arity=int(queue[:-4]))
+    raise ValueError('Unknown priority queue ' + repr(queue) + '; choose one of ' + ', '.join(sorted(QUEUES)))
+
+
+def is_monotone(queue):
+    """Whether a backend only accepts keys no smaller than the last one popped."""
+    return getattr(queue_factory(queue), 'monotone', False)
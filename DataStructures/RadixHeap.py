@@ -0,0 +1,88 @@
+class RadixHeap:
+    """A monotone priority queue for non-negative integer keys.
+        An item with key k is kept in bucket (k XOR last).bit_length(), where last
+        is the last key extracted. When bucket 0 runs dry, the first non-empty
+        bucket is redistributed around its smallest key, and every item can only
+        move to lower buckets, so each is touched O(log C) times in total.
+        Unlike BucketQueue, the cost does not grow with the size of the keys.
+        Monotone: no key may ever be smaller than the last one popped.
+        It has the same interface as PriorityQueue.
+    """
+
+    monotone = True
+
+    def __init__(self, arr=(), key=lambda arg: arg):
+        self.key = key
+        self.__buckets = [dict()]
+        self.__where = dict()
+        self.__last = 0
+        for x in arr:
+            self.push(x)
+
+    def get_min(self):
+        self.__refill()
+        return next(iter(self.__buckets[0]))
+
+    def pop(self):
+        self.__refill()
+        bucket = self.__buckets[0]
+        item = next(iter(bucket))
+        del bucket[item]
+        del self.__where[item]
+        return item
+
+    def push(self, x):
+        if x in self.__where:
+            raise ValueError(str(x) + ' is already in the queue.')
+        k = self.key(x)
+        if k < self.__last:
+            raise ValueError('Key ' + str(k) + ' is below the last extracted key ' + str(self.__last)
+                             + '; a radix heap must be monotone.')
+        self.__insert(x, k)
+
+    def push_all(self, xs):
+        for x in xs:
+            self.push(x)
+
+    def updated_key(self, item):
+        self.remove(item)
+        self.push(item)
+
+    def decrease_key(self, item):
+        self.updated_key(item)
+
+    def remove(self, item):
+        del self.__buckets[self.__where.pop(item)][item]
+
+    def __insert(self, x, k):
+        i = (k ^ self.__last).bit_length()
+        buckets = self.__buckets
+        while i >= len(buckets):
+            buckets.append(dict())
+        buckets[i][x] = k
+        self.__where[x] = i
+
+    def __refill(self):
+        """Make sure bucket 0 holds the items with the smallest key."""
+        if not self.__where:
+            raise IndexError('pop from an empty queue')
+        buckets = self.__buckets
+        if buckets[0]:
+            return
+        i = 1
+        while not buckets[i]:
+            i += 1
+        bucket = buckets[i]
+        buckets[i] = dict()
+        self.__last = min(bucket.values())
+        for (x, k) in bucket.items():
+            self.__insert(x, k)
+
+    def __contains__(self, item):
+        return item in self.__where
+
+    def __len__(self):
+        return len(self.__where)
+
+    def __bool__(self):
+        return bool(self.__where)
@@ -1,5 +1,13 @@
 from DataStructures.Heap import Heap, heapsort
+from DataStructures.IndexedHeap import IndexedHeap
 from DataStructures.PriorityQueue import PriorityQueue
 from DataStructures.FibonacciHeap import FibonacciHeap
-from DataStructures.DisjointSet import DisjointSet
+from DataStructures.BinomialHeap import BinomialHeap
+from DataStructures.PairingHeap import PairingHeap
+from DataStructures.LazyHeapQueue import LazyHeapQueue
+from DataStructures.BucketQueue import BucketQueue
+from DataStructures.RadixHeap import RadixHeap
+from DataStructures.Queues import QUEUES, register_queue, queue_factory, is_monotone
+from DataStructures.DisjointSet import DisjointSet, IntDisjointSet
+from DataStructures.LinkCutTree import LinkCutTree
 from DataStructures.DummyObject import DummyObject
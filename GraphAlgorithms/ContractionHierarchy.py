@@ -0,0 +1,347 @@
+import heapq
+import math
+import struct
+import sys
+from array import array
+
+import DataStructures
+from GraphAlgorithms.GraphAlgorithms import _as_csr
+from GraphRepresentation import CSRGraph, Graph
+from GraphRepresentation.GraphLoader import CorruptedInputException
+
+# The most nodes a witness search settles before giving up and keeping the shortcut
+WITNESS_SETTLE_LIMIT = 100
+
+_MAGIC = b'GRAPHCH\0'
+_VERSION = 1
+_HEADER = struct.Struct('<8sIIq')
+_FLOAT_WEIGHTS = 1
+
+
+class ContractionHierarchy:
+    """A preprocessed index answering shortest path queries on a static graph.
+        The vertices are contracted one at a time, cheapest first by edge difference
+        (the shortcuts the contraction needs, minus the edges it removes, plus the
+        number of neighbours already contracted). Contracting v adds a shortcut u -> w
+        for every path u -> v -> w that is the only shortest path between u and w, as
+        found by a bounded witness search. Every edge ends up stored at its lower ranked
+        endpoint: in up if it leads to a higher rank, in down (reversed) if it comes
+        from one. A query is a bidirectional Dijkstra that only ever climbs, forwards
+        in up from the source and backwards in down from the target, and the shortcuts
+        on the resulting path are unpacked through the vertex each one bypasses.
+        The hierarchy is kept in CSR arrays (see CSRGraph), the bypassed vertex of every
+        edge being in up_middle/down_middle (-1 for an original edge).
+        Edge costs must be non-negative.
+    """
+
+    def __init__(self, rank, up, up_middle, down, down_middle, nodes=None):
+        """
+        :param rank: The contraction order of every vertex.
+        :param up: A CSRGraph of the edges u -> w with rank[u] < rank[w].
+        :param up_middle: The bypassed vertex of every edge of up, or -1.
+        :param down: A CSRGraph of the edges u -> w with rank[u] > rank[w], stored as w -> u.
+        :param down_middle: The bypassed vertex of every edge of down, or -1.
+        :param nodes: The nodes of the original graph, if it was not a CSRGraph.
+        """
+        self.rank = rank
+        self.up = up
+        self.up_middle = up_middle
+        self.down = down
+        self.down_middle = down_middle
+        self.numOfNodes = len(rank)
+        self.nodes = nodes
+        self.__index = None if nodes is None else {node: i for (i, node) in enumerate(nodes)}
+        self.__middle = None
+
+    @staticmethod
+    def build(g:Graph, settle_limit=WITNESS_SETTLE_LIMIT):
+        """
+        Preprocess a graph.
+        :param g: The graph (a Graph or a CSRGraph), with non-negative edge costs.
+        :param settle_limit: The most nodes a witness search may settle.
+        :return: A new ContractionHierarchy.
+        """
+        csr = _as_csr(g)
+        n = csr.numOfNodes
+
+        # the remaining graph, with the cheapest of any parallel edges: {neighbour: (cost, middle)}
+        out = [dict() for v in range(n)]
+        inn = [dict() for v in range(n)]
+        for u in range(n):
+            for (v, c) in csr.neighbours(u):
+                if u != v and c < out[u].get(v, (math.inf,))[0]:
+                    out[u][v] = inn[v][u] = (c, -1)
+
+        deleted = [0] * n
+        priority = [0] * n
+        for v in range(n):
+            priority[v] = _edge_difference(v, _shortcuts(v, out, inn, settle_limit), out, inn, deleted)
+        q = DataStructures.queue_factory('heapq')(range(n), key=priority.__getitem__)
+
+        rank = array('q', [0]) * n
+        up_edges, down_edges = [], []
+        for r in range(n):
+            # lazy updates: re-evaluate the cheapest vertex until it stays the cheapest
+            v = q.pop()
+            shortcuts = _shortcuts(v, out, inn, settle_limit)
+            while q:
+                p = _edge_difference(v, shortcuts, out, inn, deleted)
+                if p <= priority[q.get_min()]:
+                    break
+                priority[v] = p
+                q.push(v)
+                v = q.pop()
+                shortcuts = _shortcuts(v, out, inn, settle_limit)
+
+            rank[v] = r
+            for (w, (c, m)) in out[v].items():
+                up_edges.append((v, w, c, m))
+                del inn[w][v]
+            for (u, (c, m)) in inn[v].items():
+                down_edges.append((v, u, c, m))
+                del out[u][v]
+            for u in set(out[v]) | set(inn[v]):
+                deleted[u] += 1
+            out[v] = inn[v] = None
+            for (u, w, c) in shortcuts:
+                if c < out[u].get(w, (math.inf,))[0]:
+                    out[u][w] = inn[w][u] = (c, v)
+
+        nodes = None if g is csr else list(g.nodes)
+        up, up_middle = _hierarchy_csr(n, up_edges, csr)
+        down, down_middle = _hierarchy_csr(n, down_edges, csr)
+        return ContractionHierarchy(rank, up, up_middle, down, down_middle, nodes=nodes)
+
+    def save(self, filename):
+        """
+        Write the hierarchy to a binary file, to be reopened with ContractionHierarchy.load.
+        """
+        typecode = getattr(self.up.weights, 'typecode', None) or self.up.weights.format
+        with open(filename, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, _FLOAT_WEIGHTS if typecode == 'd' else 0, self.numOfNodes))
+            _write_array(file, 'q', self.rank)
+            for (part, middle) in ((self.up, self.up_middle), (self.down, self.down_middle)):
+                file.write(struct.pack('<q', len(part.targets)))
+                _write_array(file, 'q', part.offsets)
+                _write_array(file, 'q', part.targets)
+                _write_array(file, typecode, part.weights)
+                _write_array(file, 'q', middle)
+
+    @staticmethod
+    def load(filename, g:Graph=None):
+        """
+        Read a hierarchy written by save.
+        :param filename: The file.
+        :param g: The graph it was built from, to answer queries in terms of its nodes.
+                  Without it, queries take and return vertex ids.
+        :return: A new ContractionHierarchy.
+        """
+        with open(filename, 'rb') as file:
+            head = file.read(_HEADER.size)
+            if len(head) < _HEADER.size or head[:len(_MAGIC)] != _MAGIC:
+                raise CorruptedInputException('Not a contraction hierarchy file: ' + filename)
+            magic, version, flags, n = _HEADER.unpack(head)
+            if version != _VERSION:
+                raise CorruptedInputException('Unsupported contraction hierarchy version ' + str(version))
+            typecode = 'd' if flags & _FLOAT_WEIGHTS else 'q'
+            rank = _read_array(file, 'q', n)
+            parts = []
+            for i in range(2):
+                m = struct.unpack('<q', file.read(8))[0]
+                offsets = _read_array(file, 'q', n + 1)
+                targets = _read_array(file, 'q', m)
+                weights = _read_array(file, typecode, m)
+                parts.append((CSRGraph(offsets, targets, weights), _read_array(file, 'q', m)))
+
+        if g is not None and g.numOfNodes != n:
+            raise CorruptedInputException('The hierarchy has ' + str(n) + ' nodes, the graph '
+                                          + str(g.numOfNodes))
+        nodes = None if g is None or isinstance(g, CSRGraph) else list(g.nodes)
+        return ContractionHierarchy(rank, parts[0][0], parts[0][1], parts[1][0], parts[1][1], nodes=nodes)
+
+    def distance(self, s, t):
+        """The length of a shortest path from s to t, math.inf if there is none."""
+        return self.__search(self.__id(s), self.__id(t))[0]
+
+    def shortest_path(self, s, t):
+        """
+        :return: A tuple (distance, path as a list of nodes), or (math.inf, None) if t cannot be reached.
+        """
+        best, meet, pred = self.__search(self.__id(s), self.__id(t))
+        if meet is None:
+            return math.inf, None
+
+        # the climb from s to meet, then the descent from meet to t, as (u, v, middle) edges
+        climb = []
+        v = meet
+        while pred[0][v] is not None:
+            u, middle = pred[0][v]
+            climb.append((u, v, middle))
+            v = u
+        climb.reverse()
+        v = meet
+        while pred[1][v] is not None:
+            u, middle = pred[1][v]
+            climb.append((v, u, middle))
+            v = u
+
+        path = [self.__id(s)]
+        for (u, v, middle) in climb:
+            self.__unpack(u, v, middle, path)
+        if self.nodes is not None:
+            path = [self.nodes[v] for v in path]
+        return best, path
+
+    def __id(self, node):
+        return node if self.__index is None else self.__index[node]
+
+    def __search(self, s, t):
+        """The bidirectional upward search: returns (distance, meeting vertex, (forward pred, backward pred))."""
+        factory = DataStructures.queue_factory('heapq')
+        dist = ({s: 0}, {t: 0})
+        pred = ({s: None}, {t: None})
+        graphs = ((self.up, self.up_middle), (self.down, self.down_middle))
+        queues = (factory([s], key=dist[0].__getitem__), factory([t], key=dist[1].__getitem__))
+        best, meet = (0, s) if s == t else (math.inf, None)
+
+        while queues[0] or queues[1]:
+            for side in (0, 1):
+                q = queues[side]
+                if not q:
+                    continue
+                d, p, other = dist[side], pred[side], dist[1 - side]
+                u = q.pop()
+                du = d[u]
+                if du >= best:
+                    # nothing further on this side can improve the best path
+                    while q:
+                        q.pop()
+                    continue
+                if u in other and du + other[u] < best:
+                    best, meet = du + other[u], u
+                part, middle = graphs[side]
+                offsets, targets, weights = part.offsets, part.targets, part.weights
+                for i in range(offsets[u], offsets[u + 1]):
+                    v = targets[i]
+                    newd = du + weights[i]
+                    if newd < d.get(v, math.inf):
+                        d[v] = newd
+                        p[v] = (u, middle[i])
+                        if v in q:
+                            q.updated_key(v)
+                        else:
+                            q.push(v)
+        return best, meet, pred
+
+    def __unpack(self, u, v, middle, path):
+        """Append the original vertices of the hierarchy edge u -> v after u to path."""
+        if self.__middle is None:
+            self.__middle = dict()
+            for (part, mids, upward) in ((self.up, self.up_middle, True), (self.down, self.down_middle, False)):
+                for a in range(self.numOfNodes):
+                    for i in range(part.offsets[a], part.offsets[a + 1]):
+                        b = part.targets[i]
+                        self.__middle[(a, b) if upward else (b, a)] = mids[i]
+        stack = [(u, v, middle)]
+        while stack:
+            a, b, m = stack.pop()
+            if m < 0:
+                path.append(b)
+            else:
+                stack.append((m, b, self.__middle[(m, b)]))
+                stack.append((a, m, self.__middle[(a, m)]))
+
+    def __str__(self):
+        return ('<ContractionHierarchy: ' + str(self.numOfNodes) + ' nodes, '
+                + str(len(self.up.targets) + len(self.down.targets)) + ' edges/>')
+
+
+def contraction_hierarchy(g:Graph, settle_limit=WITNESS_SETTLE_LIMIT):
+    """
+    Preprocess a graph into a ContractionHierarchy.
+    :param g: The graph (a Graph or a CSRGraph), with non-negative edge costs.
+    :return: A new ContractionHierarchy.
+    """
+    return ContractionHierarchy.build(g, settle_limit=settle_limit)
+
+
+def _witness_search(s, exclude, limit, targets, out, settle_limit):
+    """
+    A Dijkstra from s in the remaining graph, avoiding exclude, which stops once every target
+    is settled or the distance passes limit. It runs for every neighbour of every vertex
+    evaluated, so it works on a bare heapq, skipping stale entries.
+    """
+    d = {s: 0}
+    heap = [(0, s)]
+    done = set()
+    remaining = len(targets)
+    while heap and len(done) < settle_limit:
+        du, u = heapq.heappop(heap)
+        if u in done:
+            continue
+        if du > limit:
+            break
+        done.add(u)
+        if u in targets:
+            remaining -= 1
+            if not remaining:
+                break
+        for (v, (c, m)) in out[u].items():
+            if v == exclude:
+                continue
+            newd = du + c
+            if newd < d.get(v, math.inf):
+                d[v] = newd
+                heapq.heappush(heap, (newd, v))
+    return d
+
+
+def _shortcuts(v, out, inn, settle_limit):
+    """The shortcuts (u, w, cost) needed to contract v."""
+    res = []
+    if not out[v]:
+        return res
+    limit_out = max(c for (c, m) in out[v].values())
+    for (u, (cu, mu)) in inn[v].items():
+        targets = out[v].keys() - {u}
+        if not targets:
+            continue
+        d = _witness_search(u, v, cu + limit_out, targets, out, settle_limit)
+        for w in targets:
+            if d.get(w, math.inf) > cu + out[v][w][0]:
+                res.append((u, w, cu + out[v][w][0]))
+    return res
+
+
+def _edge_difference(v, shortcuts, out, inn, deleted):
+    return len(shortcuts) - len(out[v]) - len(inn[v]) + deleted[v]
+
+
+def _hierarchy_csr(n, edges, csr):
+    """Sort (source, target, cost, middle) edges into a CSRGraph and its array of middles."""
+    edges.sort(key=lambda e: e[0])
+    counts = [0] * (n + 1)
+    for e in edges:
+        counts[e[0] + 1] += 1
+    for i in range(n):
+        counts[i + 1] += counts[i]
+    typecode = getattr(csr.weights, 'typecode', None) or csr.weights.format
+    part = CSRGraph(array('q', counts), array('q', (e[1] for e in edges)),
+                    array(typecode, (e[2] for e in edges)), weighted=csr.weighted)
+    return part, array('q', (e[3] for e in edges))
+
+
+def _write_array(file, typecode, arr):
+    if not isinstance(arr, array) or arr.typecode != typecode or sys.byteorder != 'little':
+        arr = array(typecode, arr)
+        if sys.byteorder != 'little':
+            arr.byteswap()
+    arr.tofile(file)
+
+
+def _read_array(file, typecode, count):
+    arr = array(typecode)
+    arr.fromfile(file, count)
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
@@ -0,0 +1,130 @@
+import math
+
+import DataStructures
+from GraphAlgorithms.GraphAlgorithms import dijkstra
+from GraphRepresentation import Graph
+
+
+class DynamicSSSP:
+    """Shortest paths from one source, kept up to date while the graph changes.
+        When an edge is added or gets cheaper, only the nodes whose distance improves
+        are visited: the repair is a Dijkstra search started from the head of the edge,
+        which stops wherever the old distances already hold (as in Ramalingam and Reps).
+        An edge that gets dearer or is removed only matters if the shortest path tree
+        uses it; if it does, the distances are recomputed from scratch.
+        Subscribed to a Graph, it follows its changes by itself; otherwise (e.g. for a
+        graph modified by other means), report them with the insert/decrease/increase/remove
+        methods after changing the graph.
+        Edge costs must be non-negative.
+    """
+
+    def __init__(self, g:Graph, s, subscribe=True, queue='binary'):
+        """
+        :param g: The graph (a Graph or a CSRGraph).
+        :param s: The source node.
+        :param subscribe: Whether to follow the changes of g (a Graph) through Graph.subscribe.
+        :param queue: The priority queue backend of the repairs: a name from DataStructures.QUEUES or a class.
+        """
+        self.graph = g
+        self.source = s
+        self.queue = queue
+        self.recomputations = 0
+        self.repaired = 0
+        self.d = dict()
+        self.pred = dict()
+        self.recompute()
+        self.subscribed = subscribe and hasattr(g, 'subscribe')
+        if self.subscribed:
+            g.subscribe(self.on_change)
+
+    def close(self):
+        """Stop following the changes of the graph."""
+        if self.subscribed:
+            self.graph.unsubscribe(self.on_change)
+            self.subscribed = False
+
+    def recompute(self):
+        """Compute the distances from scratch."""
+        res = dijkstra(self.graph, self.source)
+        self.d = {v: res[v][0] for v in res}
+        self.pred = {v: res[v][1] for v in res}
+        self.recomputations += 1
+
+    def distance(self, v):
+        return self.d[v]
+
+    def path(self, v):
+        """The shortest path from the source to v as a list of nodes, None if v cannot be reached."""
+        if self.d[v] == math.inf:
+            return None
+        path = []
+        while v is not None:
+            path.append(v)
+            v = self.pred[v]
+        path.reverse()
+        return path
+
+    def results(self):
+        """
+        :return: A dict of type {node: (distance, predecessor)}, like dijkstra.
+        """
+        return {v: (self.d[v], self.pred[v]) for v in self.d}
+
+    def insert(self, u, v, cost):
+        """The edge (u, v) of the given cost was added."""
+        self.decrease(u, v, cost)
+
+    def decrease(self, u, v, cost):
+        """The edge (u, v) was added or made cheaper, now costing cost."""
+        starts = []
+        for (a, b) in ((u, v),) if self.graph.directed else ((u, v), (v, u)):
+            if self.d[a] + cost < self.d[b]:
+                self.d[b] = self.d[a] + cost
+                self.pred[b] = a
+                starts.append(b)
+        if starts:
+            self.__propagate(starts)
+
+    def increase(self, u, v, cost):
+        """The edge (u, v) was made dearer, now costing cost."""
+        self.remove(u, v)
+
+    def remove(self, u, v):
+        """The edge (u, v) was removed."""
+        if self.pred.get(v) is u or (not self.graph.directed and self.pred.get(u) is v):
+            self.recompute()
+
+    def on_change(self, event, *args):
+        """The Graph.subscribe callback."""
+        if event == 'add_node':
+            self.d[args[0]] = math.inf
+            self.pred[args[0]] = None
+        elif event == 'add_edge':
+            self.insert(*args)
+        elif event == 'update_edge':
+            u, v, old, new = args
+            if new < old:
+                self.decrease(u, v, new)
+            elif new > old:
+                self.increase(u, v, new)
+        elif event == 'remove_edge':
+            self.remove(args[0], args[1])
+        else:
+            self.recompute()
+
+    def __propagate(self, starts):
+        """Carry the improvements of the start nodes on to every node whose distance they improve."""
+        d, pred = self.d, self.pred
+        q = DataStructures.queue_factory(self.queue)(starts, key=d.__getitem__)
+        while q:
+            u = q.pop()
+            self.repaired += 1
+            du = d[u]
+            for (v, c) in self.graph.neighbours(u):
+                if du + c < d[v]:
+                    d[v] = du + c
+                    pred[v] = u
+                    if v in q:
+                        q.updated_key(v)
+                    else:
+                        q.push(v)
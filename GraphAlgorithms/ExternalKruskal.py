@@ -0,0 +1,151 @@
+import os
+import struct
+import tempfile
+from array import array
+
+import DataStructures
+from GraphRepresentation import EdgeReader, CorruptedInputException
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# How many edges are sorted in memory at once, into one run
+RUN_SIZE = 1 << 22
+
+# How many bytes of every run are read at once while merging
+RUN_BUFFER = 1 << 16
+
+# The records of a run: (cost, source, destination), by the typecode of the costs
+_RECORDS = {'q': struct.Struct('<qqq'), 'd': struct.Struct('<dqq')}
+
+
+def external_kruskal(filename, weighted=True, fmt=None, header=None, run_size=RUN_SIZE, tmpdir=None):
+    """
+    Find a minimum spanning tree (a forest, if the graph is not connected) of an undirected
+    graph stored as an edge file, without loading it into memory.
+    The file is read chunk by chunk (see EdgeReader); every run_size edges are sorted by cost
+    and written to a temporary binary run file. The runs are then merged with a Heap of their
+    smallest edges, and the merged stream is fed into an IntDisjointSet, so apart from one run
+    being sorted, only O(n) state is ever held in memory.
+    :param filename: The edge file (txt, csv or tsv, optionally gzipped).
+    :param weighted: Whether each line holds a cost. If not, every cost is 1.
+    :param fmt: 'txt', 'csv' or 'tsv'; detected from the extension by default.
+    :param header: Whether a csv/tsv file starts with a header line; detected by default.
+    :param run_size: The number of edges sorted in memory at once.
+    :param tmpdir: The directory for the run files; the system's temporary directory by default.
+    :return: A tuple: (the cost, A list of all the edges in the MST, as ((u, v), cost) tuples of node ids).
+    """
+    reader = EdgeReader(filename, weighted=weighted, fmt=fmt, header=header)
+    with tempfile.TemporaryDirectory(dir=tmpdir) as workdir:
+        n, runs = _write_runs(reader, run_size, workdir)
+        part = DataStructures.IntDisjointSet(n)
+        sol = []
+        cost = 0
+        merged = _merge_runs(runs)
+        try:
+            for (c, u, v) in merged:
+                if part.union(u, v):
+                    sol.append(((u, v), c))
+                    cost += c
+                    if part.num_of_sets == 1:
+                        break
+        finally:
+            merged.close()
+    return cost, sol
+
+
+def _write_runs(reader, run_size, workdir):
+    """
+    Split the edges of reader into runs sorted by cost.
+    :return: A tuple (the number of nodes, A list of (file name, typecode of the costs) for every run).
+    """
+    runs = []
+    src, dst, w = array('q'), array('q'), array('q')
+    count, hi = 0, -1
+    for (s, d, c) in reader.chunks():
+        count += len(s)
+        lo, top = _id_range(s, d)
+        hi = max(hi, top)
+        if reader.declared_nodes is not None and (lo < 0 or hi >= reader.declared_nodes):
+            raise CorruptedInputException('Node id out of range for a graph with '
+                                          + str(reader.declared_nodes) + ' nodes.')
+        src.extend(s)
+        dst.extend(d)
+        if c.typecode == 'd' and w.typecode == 'q':
+            w = array('d', w)
+        w.extend(c if c.typecode == w.typecode else array('d', c))
+        if len(w) >= run_size:
+            runs.append(_write_run(os.path.join(workdir, str(len(runs))), src, dst, w))
+            src, dst, w = array('q'), array('q'), array('q')
+    if w:
+        runs.append(_write_run(os.path.join(workdir, str(len(runs))), src, dst, w))
+
+    if reader.declared_edges is not None and count != reader.declared_edges:
+        raise CorruptedInputException("Declared and true number of edges differ: "
+                                      + str(reader.declared_edges)
+                                      + " "
+                                      + str(count))
+    n = reader.declared_nodes
+    return (hi + 1 if n is None else n), runs
+
+
+def _id_range(src, dst):
+    """The smallest and largest node id of a chunk."""
+    if np is None:
+        return min(min(src), min(dst)), max(max(src), max(dst))
+    src, dst = np.frombuffer(src, dtype=np.int64), np.frombuffer(dst, dtype=np.int64)
+    return int(min(src.min(), dst.min())), int(max(src.max(), dst.max()))
+
+
+def _write_run(filename, src, dst, w):
+    """Write the edges, sorted by cost, as a run file of records."""
+    if np is not None:
+        costs = np.frombuffer(w, dtype=np.int64 if w.typecode == 'q' else np.float64)
+        order = np.argsort(costs, kind='stable')
+        records = np.empty(len(w), dtype=[('w', costs.dtype.newbyteorder('<')), ('u', '<i8'), ('v', '<i8')])
+        records['w'] = costs[order]
+        records['u'] = np.frombuffer(src, dtype=np.int64)[order]
+        records['v'] = np.frombuffer(dst, dtype=np.int64)[order]
+        records.tofile(filename)
+    else:
+        pack = _RECORDS[w.typecode].pack
+        with open(filename, 'wb') as file:
+            file.write(b''.join(pack(w[i], src[i], dst[i]) for i in sorted(range(len(w)), key=w.__getitem__)))
+    return filename, w.typecode
+
+
+def _read_run(filename, typecode):
+    """Iterate through the (cost, source, destination) records of a run file."""
+    record = _RECORDS[typecode]
+    size = RUN_BUFFER - RUN_BUFFER % record.size
+    with open(filename, 'rb') as file:
+        while True:
+            data = file.read(size)
+            if not data:
+                return
+            for rec in record.iter_unpack(data):
+                yield rec
+
+
+def _merge_runs(runs):
+    """Merge the sorted runs into one stream of (cost, source, destination), in order of cost."""
+    readers = [_read_run(filename, typecode) for (filename, typecode) in runs]
+    heads = []
+    for (i, r) in enumerate(readers):
+        for rec in r:
+            heads.append(rec + (i,))
+            break
+    # the smallest remaining edge of every run, tagged with the run
+    h = DataStructures.Heap(heads)
+    try:
+        while h:
+            rec = h.extract_min()
+            yield rec[:3]
+            for nxt in readers[rec[3]]:
+                h.add(nxt + (rec[3],))
+                break
+    finally:
+        for r in readers:
+            r.close()
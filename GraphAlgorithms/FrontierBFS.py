@@ -0,0 +1,241 @@
+from array import array
+
+from GraphAlgorithms.GraphAlgorithms import _as_csr, _node_ids
+from GraphRepresentation import Graph
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Switch to bottom-up steps once the edges out of the frontier exceed 1/ALPHA of the unexplored ones
+ALPHA = 14
+
+# Switch back to top-down steps once the frontier shrinks below 1/BETA of the vertices
+BETA = 24
+
+# How many in-edges of every unvisited vertex a vectorized bottom-up step checks one at a time,
+# before checking all the rest at once
+BOTTOM_UP_ROUNDS = 8
+
+
+class FrontierBFS:
+    """A direction-optimizing breadth-first search (Beamer, Asanovic and Patterson).
+        The search goes level by level. A top-down step scans the out-edges of the frontier
+        for unvisited vertices; a bottom-up step has every unvisited vertex scan its in-edges
+        for a frontier vertex, stopping at the first one found. Once the frontier is large
+        (as it soon is on low-diameter graphs), bottom-up steps skip most of the edges,
+        since most vertices find a parent among their first few in-edges.
+        The distances and parents are compact arrays indexed by vertex position (the order
+        of g.nodes): NumPy arrays if NumPy is available, arrays of typecode 'q' otherwise,
+        with -1 for the vertices not reached. With NumPy, every step is vectorized.
+        The CSR form of the graph and its in-edges are built once, so a FrontierBFS is
+        best kept for many searches.
+    """
+
+    def __init__(self, g:Graph, alpha=ALPHA, beta=BETA):
+        """
+        :param g: The graph (a Graph or a CSRGraph).
+        :param alpha: The top-down to bottom-up switching parameter.
+        :param beta: The bottom-up to top-down switching parameter.
+        """
+        self.graph = g
+        self.csr = _as_csr(g).build_reverse()
+        self.index = _node_ids(g)
+        self.alpha = alpha
+        self.beta = beta
+        # the number of edges examined by the last search, and the direction of each of its steps
+        self.inspected = 0
+        self.steps = []
+
+    def search(self, sources, max_depth=None, bottom_up=True):
+        """
+        Search from one or several sources at once.
+        :param sources: A source node, or an iterable of them (the actual objects for a Graph).
+        :param max_depth: The largest distance to explore; no limit by default.
+        :param bottom_up: Whether bottom-up steps may be taken.
+        :return: A tuple (distances, parents). A source is its own parent.
+        """
+        if isinstance(sources, (str, bytes)) or not hasattr(sources, '__iter__'):
+            sources = [sources]
+        sources = [self.index(s) for s in sources]
+        self.inspected = 0
+        self.steps = []
+        if np is None:
+            return self.__search_lists(sources, max_depth, bottom_up)
+        return self.__search_numpy(sources, max_depth, bottom_up)
+
+    def __bottom_up_next(self, bottom_up, top_down, edges_frontier, edges_unexplored, size, last_size):
+        """Whether the next step should be bottom-up, given the state after the last one."""
+        if not bottom_up:
+            return False
+        if top_down:
+            return edges_frontier * self.alpha > edges_unexplored
+        return size * self.beta >= self.csr.numOfNodes or size > last_size
+
+    def __search_lists(self, sources, max_depth, bottom_up):
+        csr = self.csr
+        n = csr.numOfNodes
+        offsets, targets = csr.offsets, csr.targets
+        roffsets, rsources = csr.rev_offsets, csr.rev_sources
+        dist = [-1] * n
+        parent = [-1] * n
+
+        frontier = []
+        for s in sources:
+            if dist[s] < 0:
+                dist[s] = 0
+                parent[s] = s
+                frontier.append(s)
+        edges_frontier = sum(offsets[u + 1] - offsets[u] for u in frontier)
+        edges_unexplored = len(targets) - edges_frontier
+        up = False
+        last_size = 0
+        level = 0
+
+        while frontier and (max_depth is None or level < max_depth):
+            level += 1
+            up = self.__bottom_up_next(bottom_up, not up, edges_frontier, edges_unexplored,
+                                       len(frontier), last_size)
+            last_size = len(frontier)
+            nxt = []
+            if up:
+                self.steps.append('bottom-up')
+                infront = bytearray(n)
+                for u in frontier:
+                    infront[u] = 1
+                for v in range(n):
+                    if dist[v] < 0:
+                        a = roffsets[v]
+                        for i in range(a, roffsets[v + 1]):
+                            u = rsources[i]
+                            if infront[u]:
+                                dist[v] = level
+                                parent[v] = u
+                                nxt.append(v)
+                                self.inspected += i - a + 1
+                                break
+                        else:
+                            self.inspected += roffsets[v + 1] - a
+            else:
+                self.steps.append('top-down')
+                self.inspected += edges_frontier
+                for u in frontier:
+                    for v in targets[offsets[u]:offsets[u + 1]]:
+                        if dist[v] < 0:
+                            dist[v] = level
+                            parent[v] = u
+                            nxt.append(v)
+            frontier = nxt
+            edges_frontier = sum(offsets[u + 1] - offsets[u] for u in frontier)
+            edges_unexplored -= edges_frontier
+
+        return array('q', dist), array('q', parent)
+
+    def __search_numpy(self, sources, max_depth, bottom_up):
+        csr = self.csr
+        n = csr.numOfNodes
+        offsets = np.asarray(csr.offsets, dtype=np.int64)
+        targets = np.asarray(csr.targets, dtype=np.int64)
+        roffsets = np.asarray(csr.rev_offsets, dtype=np.int64)
+        rsources = np.asarray(csr.rev_sources, dtype=np.int64)
+        dist = np.full(n, -1, dtype=np.int64)
+        parent = np.full(n, -1, dtype=np.int64)
+
+        frontier = np.unique(np.array(sources, dtype=np.int64))
+        dist[frontier] = 0
+        parent[frontier] = frontier
+        edges_frontier = int((offsets[frontier + 1] - offsets[frontier]).sum())
+        edges_unexplored = len(targets) - edges_frontier
+        up = False
+        last_size = 0
+        level = 0
+
+        while len(frontier) and (max_depth is None or level < max_depth):
+            level += 1
+            up = self.__bottom_up_next(bottom_up, not up, edges_frontier, edges_unexplored,
+                                       len(frontier), last_size)
+            last_size = len(frontier)
+            if up:
+                self.steps.append('bottom-up')
+                infront = np.zeros(n, dtype=bool)
+                infront[frontier] = True
+                frontier = self.__bottom_up(roffsets, rsources, infront, dist, parent, level)
+            else:
+                self.steps.append('top-down')
+                self.inspected += edges_frontier
+                frontier = _top_down(offsets, targets, frontier, dist, parent, level)
+            edges_frontier = int((offsets[frontier + 1] - offsets[frontier]).sum())
+            edges_unexplored -= edges_frontier
+
+        return dist, parent
+
+    def __bottom_up(self, roffsets, rsources, infront, dist, parent, level):
+        """
+        A vectorized bottom-up step. For BOTTOM_UP_ROUNDS rounds, every unvisited vertex not
+        yet settled checks its next in-edge; the vertices left over then check all the rest
+        of their in-edges at once, which bounds the number of rounds on high-degree vertices.
+        :return: The vertices reached.
+        """
+        v = np.flatnonzero(dist < 0)
+        pos, end = roffsets[v], roffsets[v + 1]
+        keep = pos < end
+        v, pos, end = v[keep], pos[keep], end[keep]
+        found = []
+        for r in range(BOTTOM_UP_ROUNDS):
+            if not len(v):
+                break
+            u = rsources[pos]
+            self.inspected += len(v)
+            hit = infront[u]
+            found.append(v[hit])
+            dist[v[hit]] = level
+            parent[v[hit]] = u[hit]
+            pos += 1
+            keep = ~hit & (pos < end)
+            v, pos, end = v[keep], pos[keep], end[keep]
+
+        if len(v):
+            who, u = _gather(pos, end - pos, rsources)
+            self.inspected += len(u)
+            hit = infront[u]
+            # the first in-edge from the frontier of every vertex
+            first, at = np.unique(who[hit], return_index=True)
+            w = v[first]
+            found.append(w)
+            dist[w] = level
+            parent[w] = u[hit][at]
+        return np.concatenate(found) if found else v
+
+
+def _gather(starts, counts, values):
+    """
+    :return: A tuple (which, gathered): values[starts[k]:starts[k] + counts[k]] for every k,
+             concatenated, and the k each of them came from.
+    """
+    total = int(counts.sum())
+    which = np.repeat(np.arange(len(starts), dtype=np.int64), counts)
+    pos = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts) + starts[which]
+    return which, values[pos]
+
+
+def _top_down(offsets, targets, frontier, dist, parent, level):
+    """A vectorized top-down step. :return: The vertices reached."""
+    which, v = _gather(offsets[frontier], offsets[frontier + 1] - offsets[frontier], targets)
+    fresh = dist[v] < 0
+    v, u = v[fresh], frontier[which[fresh]]
+    reached, first = np.unique(v, return_index=True)
+    dist[reached] = level
+    parent[reached] = u[first]
+    return reached
+
+
+def frontier_bfs(g:Graph, sources, max_depth=None):
+    """
+    Run a direction-optimizing breadth-first search (see FrontierBFS).
+    :param g: The graph (a Graph or a CSRGraph).
+    :param sources: A source node, or an iterable of them (the actual objects for a Graph).
+    :param max_depth: The largest distance to explore; no limit by default.
+    :return: A tuple (distances, parents) of arrays indexed by vertex position, -1 where not reached.
+    """
+    return FrontierBFS(g).search(sources, max_depth)
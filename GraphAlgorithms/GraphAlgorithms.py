@@ -1,10 +1,21 @@
-import copy
+import collections
+import concurrent.futures
 import math
-import queue
+import multiprocessing
+import os
+import tempfile
+import threading
 import warnings
+import weakref
 
 import DataStructures
-from GraphRepresentation import Graph
+from GraphAlgorithms.SearchWorkspace import SearchWorkspace
+from GraphRepresentation import BinaryFormat, Graph, CSRGraph
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class IncompatibleInputException(Exception):
@@ -13,103 +24,300 @@ class IncompatibleInputException(Exception):
     """
 
 
-def bfs(g:Graph, s):
+# The largest edge cost for which dijkstra picks Dial's buckets rather than a radix heap
+BUCKET_QUEUE_MAX_WEIGHT = 1000
+
+# The number of intermediate nodes floyd_warshall applies to a tile of rows at a time
+FLOYD_WARSHALL_BLOCK = 64
+
+
+def _as_csr(g):
     """
-    Run breadth-first search on a graph, ignoring edge weights (i.e. cost=1)
-    :param g: the graph
-    :param s: the source node (the actual object, not the id)
-    :return: a list of 2-tuples: the first element is the number of edges to each node
-             and the second is the previous node in the shortest path found
+    :return: The graph itself if it is a CSRGraph, its CSR conversion otherwise.
+             Vertex k of the result is g.nodes[k].
     """
+    return g if isinstance(g, CSRGraph) else CSRGraph.from_graph(g)
 
-    q = queue.Queue()
-    for v in g.nodes:
-        v.d = math.inf
-        v.prev = None
 
-    s.d = 0
-    q.put(s)
+def _node_ids(g):
+    """
+    :return: A function giving the position of a node of g in g.nodes.
+    """
+    if isinstance(g.nodes, range):
+        return int
+    if hasattr(g, 'index'):
+        return g.index
+    return {v: i for (i, v) in enumerate(g.nodes)}.__getitem__
 
-    while not q.empty():
-        u = q.get()
-        for (v, c) in u.neighbours:
-            if v.d == math.inf:
-                v.d = u.d + 1
-                v.prev = u
-                q.put(v)
 
-    return {v: (v.d, v.prev) for v in g.nodes}
+def _integer_weight_bound(g):
+    """
+    :return: The largest edge cost of g if all of its costs are non-negative integers, None otherwise.
+    """
+    if isinstance(g, CSRGraph):
+        return g.integer_weight_bound()
+    bound = 0
+    for (e, c) in g.edges:
+        if not isinstance(c, int) or c < 0:
+            return None
+        if c > bound:
+            bound = c
+    return bound
+
 
+# The queue _auto_queue picked for every graph, with the version of the graph it was picked for
+_auto_queues = weakref.WeakKeyDictionary()
 
-def dijkstra(g:Graph, s):
+
+def _auto_queue(g):
+    """
+    Pick a monotone integer queue if the edge costs allow it, a binary heap otherwise.
+    Finding out means scanning every edge cost, so the choice is remembered until the graph changes.
+    """
+    known = _auto_queues.get(g)
+    if known is not None and known[0] == g.version:
+        return known[1]
+    bound = _integer_weight_bound(g)
+    if bound is None:
+        queue = 'binary'
+    else:
+        queue = 'bucket' if bound <= BUCKET_QUEUE_MAX_WEIGHT else 'radix'
+    _auto_queues[g] = (g.version, queue)
+    return queue
+
+
+def bfs(g:Graph, s, workspace=None):
+    """
+    Run breadth-first search on a graph, ignoring edge weights (i.e. cost=1)
+    :param g: the graph (a Graph or a CSRGraph)
+    :param s: the source node (the actual object, not the id; a vertex id for a CSRGraph)
+    :param workspace: a SearchWorkspace of g to keep the search state in, reused across calls
+    :return: a dict of 2-tuples: the first element is the number of edges to each node
+             and the second is the previous node in the shortest path found.
+             With a workspace, only the nodes reached are included.
+    """
+    ws = workspace if workspace is not None else SearchWorkspace(g)
+    ws.reset()
+    d, prev, stamp, reached = ws.dist, ws.pred, ws.stamp, ws.reached
+    gen = ws.generation
+    q = collections.deque()
+
+    d[s] = 0
+    prev[s] = None
+    stamp[s] = gen
+    reached.append(s)
+    q.append(s)
+
+    while q:
+        u = q.popleft()
+        for (v, c) in g.neighbours(u):
+            if stamp[v] != gen:
+                stamp[v] = gen
+                d[v] = d[u] + 1
+                prev[v] = u
+                reached.append(v)
+                q.append(v)
+
+    return ws.all_results() if workspace is None else ws.results()
+
+
+def dijkstra(g:Graph, s, queue=None, workspace=None):
     """
     Find the shortest paths from a given source on a graph
     The graph having negative-weight cycles will cause
     the algorithm to raise IncompatibleInputException
-    :param g: the graph
-    :param s: the source node (the actual object, not the id)
-    :return: a list of 2-tuples: the first is the distance to each node
-             and the second is the previous node in the shortest path found
+    :param g: the graph (a Graph or a CSRGraph)
+    :param s: the source node (the actual object, not the id; a vertex id for a CSRGraph)
+    :param queue: the priority queue backend: a name from DataStructures.QUEUES
+                  (e.g. 'fibonacci', 'pairing', 'bucket') or a queue class.
+                  By default, a bucket queue or a radix heap is used when all costs
+                  are non-negative integers, and a binary heap otherwise.
+    :param workspace: a SearchWorkspace of g to keep the search state in, reused across calls
+    :return: a dict of 2-tuples: the first is the distance to each node
+             and the second is the previous node in the shortest path found.
+             With a workspace, only the nodes reached are included.
     """
-    q = DataStructures.PriorityQueue([], key=lambda x: x.d)
-
-    for v in g.nodes:
-        v.d = math.inf
-        v.prev = None
-        v.popped = False
+    ws = workspace if workspace is not None else SearchWorkspace(g)
+    ws.reset()
+    d, prev, stamp, settled, reached = ws.dist, ws.pred, ws.stamp, ws.settled, ws.reached
+    gen = ws.generation
+    if queue is None:
+        queue = _auto_queue(g)
+    q = DataStructures.queue_factory(queue)([], key=lambda x: d[x])
 
-    s.d = 0
+    d[s] = 0
+    prev[s] = None
+    stamp[s] = gen
+    reached.append(s)
     q.push(s)
 
     while q:
         u = q.pop()
-        u.popped = True
-        for (v, c) in u.neighbours:
-            newd = u.d + c
-            if newd < v.d:
-                if v.popped:
+        settled[u] = gen
+        du = d[u]
+        for (v, c) in g.neighbours(u):
+            newd = du + c
+            if stamp[v] != gen:
+                stamp[v] = gen
+                d[v] = newd
+                prev[v] = u
+                reached.append(v)
+                q.push(v)
+            elif newd < d[v]:
+                if settled[v] == gen:
                     raise IncompatibleInputException('A negative weight cycle was found!')
                 else:
-                    v.d = newd
-                    v.prev = u
+                    d[v] = newd
+                    prev[v] = u
                     if v in q:
                         q.updated_key(v)
                     else:
                         q.push(v)
 
-    return {v: (v.d, v.prev) for v in g.nodes}
+    return ws.all_results() if workspace is None else ws.results()
+
+
+# The searches batch can run
+_BATCH_ALGORITHMS = {'bfs': bfs, 'dijkstra': dijkstra}
+
+
+def batch(g:Graph, sources, algorithm='dijkstra', pool='thread', workers=None):
+    """
+    Run many single-source queries against one read-only graph, in parallel.
+    With a thread pool, every thread reuses its own SearchWorkspace. With a process
+    pool, the graph is written once to a temporary binary graph file which every
+    worker memory-maps, instead of being copied into each of them.
+    The arguments are all checked before the generator is returned, so a bad one raises
+    at the call rather than at the first result.
+    :param g: The graph (a Graph or a CSRGraph).
+    :param sources: The source nodes.
+    :param algorithm: 'dijkstra' or 'bfs'.
+    :param pool: 'thread' or 'process'.
+    :param workers: The number of threads or processes; None for one per CPU.
+    :return: A generator of (source, {node: (distance, predecessor)}) tuples, in the order
+             of sources, each dict holding the nodes reached from its source.
+    """
+    if algorithm not in _BATCH_ALGORITHMS:
+        raise ValueError('Unknown algorithm ' + str(algorithm) + '; expected one of ' + str(sorted(_BATCH_ALGORITHMS)))
+    if pool not in ('thread', 'process'):
+        raise ValueError("pool must be 'thread' or 'process'")
+    if workers is not None and workers < 1:
+        raise ValueError('The number of workers must be at least 1, not ' + str(workers))
+    workers = workers or os.cpu_count() or 1
+    sources = list(sources)
+    index = _node_ids(g)
+    ids = []
+    for u in sources:
+        try:
+            i = index(u)
+        except (KeyError, TypeError, ValueError):
+            i = -1
+        if not 0 <= i < g.numOfNodes:
+            raise ValueError(str(u) + ' is not a node of the graph.')
+        ids.append(i)
+
+    if pool == 'thread':
+        return _batch_threads(g, _BATCH_ALGORITHMS[algorithm], sources, workers)
+    return _batch_processes(g, algorithm, sources, ids, workers)
+
+
+def _batch_threads(g, search, sources, workers):
+    local = threading.local()
+
+    def run(source):
+        if not hasattr(local, 'workspace'):
+            local.workspace = SearchWorkspace(g)
+        return source, search(g, source, workspace=local.workspace)
+
+    with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+        yield from executor.map(run, sources)
+
+
+def _batch_processes(g, algorithm, sources, ids, workers):
+    csr = _as_csr(g)
+    nodes = list(g.nodes)
+    for (source, (i, res)) in zip(sources, _map_shared(csr, _batch_worker_run, [(algorithm, i) for i in ids],
+                                                        workers, ordered=True)):
+        yield source, {nodes[v]: (dv, None if p is None else nodes[p]) for (v, (dv, p)) in res.items()}
 
 
 def kruskal(g:Graph):
     """
     Find a minimum spanning tree of an undirected graph g
-    :param g: an undirected graph
+    :param g: an undirected graph (a Graph or a CSRGraph)
     :return: A tuple: (the cost, A list of all the edges in the MST).
     """
 
     if g.directed:
         warnings.warn('The graph should be undirected!')
 
-    sol = []
-    cost = 0
     es = sorted(g.edges, key=lambda e: e[1])    # sort edges by cost
-    part = DataStructures.DisjointSet(g.nodes)
-
-    for ((u, v), c) in es:
-        if not part.same_set(u, v):
-            sol.append(((u, v), c))
-            cost += c
-            part.merge(u, v)
+    index = _node_ids(g)
+    part = DataStructures.IntDisjointSet(g.numOfNodes)
+    taken = part.union_many([index(u) for ((u, v), c) in es], [index(v) for ((u, v), c) in es])
 
+    sol = [e for (e, t) in zip(es, taken) if t]
+    cost = 0
+    for (e, c) in sol:
+        cost += c
     return cost, sol
 
 
+class NegativeCycleException(IncompatibleInputException):
+    """Raised when a graph has a negative weight cycle.
+        The cycle attribute lists its nodes in the order of its edges:
+        cycle[0] -> cycle[1] -> ... -> cycle[-1] -> cycle[0].
+    """
+
+    def __init__(self, message, cycle):
+        super().__init__(message)
+        self.cycle = cycle
+
+
+def _pred_cycle(pred, v):
+    """
+    Find a cycle in a predecessor graph, which Bellman-Ford guarantees to be of negative weight.
+    The predecessors of v are followed first; if they lead back to a root, the whole
+    predecessor graph is searched.
+    :return: The list of nodes of the cycle in edge order, or None if there is none.
+    """
+    starts = [v]
+    starts.extend(pred)
+    done = set()
+    for start in starts:
+        seen = dict()
+        u = start
+        while u is not None and u not in done and u not in seen:
+            seen[u] = len(seen)
+            u = pred[u]
+        done.update(seen)
+        if u is not None and u in seen:
+            cycle = [u]
+            w = pred[u]
+            while w is not u:
+                cycle.append(w)
+                w = pred[w]
+            cycle.reverse()
+            return cycle
+    return None
+
+
+def _arcs(g):
+    """Iterate through the edges of g as (source, destination, cost), both ways round if g is undirected."""
+    for ((u, v), c) in g.edges:
+        yield u, v, c
+        if not g.directed:
+            yield v, u, c
+
+
 def bellman_ford(g:Graph, s):
     """
     Find the shortest paths to all nodes from a source node s in a graph.
-    :param g: A graph
+    The passes over the edges stop as soon as one of them changes nothing.
+    :param g: A graph (a Graph or a CSRGraph)
     :param s: The source node
     :return: A dict of type {node: (distance, predecessor)}
+    :raises NegativeCycleException: if a negative weight cycle is reachable from s.
     """
 
     pred = {v: None for v in g.nodes}
@@ -117,57 +325,266 @@ def bellman_ford(g:Graph, s):
     d[s] = 0
 
     for i in range(g.numOfNodes):
-        for ((u, v), c) in g.edges:
+        changed = False
+        for (u, v, c) in _arcs(g):
             if d[v] > d[u] + c:
                 d[v] = d[u] + c
                 pred[v] = u
+                changed = True
+        if not changed:
+            return {v: (d[v], pred[v]) for v in g.nodes}
 
-    for ((u, v), c) in g.edges:
+    for (u, v, c) in _arcs(g):
         if d[v] > d[u] + c:
-            raise IncompatibleInputException('Negative weight cycle detected!')
-        else:
-            return {v: (d[v], pred[v]) for v in g.nodes}
+            pred[v] = u
+            raise NegativeCycleException('Negative weight cycle detected!', _pred_cycle(pred, v))
+    return {v: (d[v], pred[v]) for v in g.nodes}
+
+
+def _spfa(g, d, pred, start):
+    """
+    The queue-driven Bellman-Ford relaxation, from the given start nodes.
+    Along with its distance, every node keeps the number of edges of the path that
+    gave it; a path of numOfNodes edges must repeat a node, which can only happen
+    when there is a negative cycle, so the predecessor graph is then searched for it.
+    :param d: A dict of distances, updated in place.
+    :param pred: A dict of predecessors, updated in place.
+    :param start: The nodes to relax first.
+    :return: A negative cycle as a list of nodes, or None.
+    """
+    n = g.numOfNodes
+    length = {v: 0 for v in start}
+    q = collections.deque(start)
+    inq = set(start)
+    while q:
+        u = q.popleft()
+        inq.discard(u)
+        du = d[u]
+        for (v, c) in g.neighbours(u):
+            if du + c < d[v]:
+                d[v] = du + c
+                pred[v] = u
+                length[v] = length[u] + 1
+                if length[v] >= n:
+                    cycle = _pred_cycle(pred, v)
+                    if cycle is not None:
+                        return cycle
+                if v not in inq:
+                    q.append(v)
+                    inq.add(v)
+    return None
+
+
+def spfa(g:Graph, s):
+    """
+    Bellman-Ford driven by a FIFO queue (the Shortest Path Faster Algorithm):
+    only the out-edges of nodes whose distance has just improved are relaxed.
+    :param g: A graph (a Graph or a CSRGraph)
+    :param s: The source node
+    :return: A dict of type {node: (distance, predecessor)}
+    :raises NegativeCycleException: if a negative weight cycle is reachable from s.
+    """
+    pred = {v: None for v in g.nodes}
+    d = {v: math.inf for v in g.nodes}
+    d[s] = 0
+
+    cycle = _spfa(g, d, pred, [s])
+    if cycle is not None:
+        raise NegativeCycleException('Negative weight cycle detected!', cycle)
+    return {v: (d[v], pred[v]) for v in g.nodes}
 
 
-def johnson(g: Graph):
+def bellman_ford_vectorized(g:Graph, s):
+    """
+    Bellman-Ford over the edge arrays of the CSR form of the graph: each pass relaxes
+    every out-edge of the nodes improved by the previous pass at once, with np.minimum.at,
+    and the passes stop when nothing improves. Falls back to bellman_ford without NumPy.
+    :param g: A graph (a Graph or a CSRGraph)
+    :param s: The source node
+    :return: A dict of type {node: (distance, predecessor)}
+    :raises NegativeCycleException: if a negative weight cycle is reachable from s.
+    """
+    if np is None:
+        return bellman_ford(g, s)
+
+    csr = _as_csr(g)
+    nodes = list(g.nodes)
+    n = csr.numOfNodes
+    offsets = np.asarray(csr.offsets, dtype=np.int64)
+    tgt = np.asarray(csr.targets, dtype=np.int64)
+    integer = (getattr(csr.weights, 'typecode', None) or csr.weights.format) == 'q'
+    w = np.asarray(csr.weights, dtype=np.int64 if integer else np.float64)
+    src = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+
+    # integer distances stay exact; only finite (active) sources are ever relaxed
+    inf = np.iinfo(np.int64).max if integer else np.inf
+    dist = np.full(n, inf, dtype=w.dtype)
+    pred = np.full(n, -1, dtype=np.int64)
+    s = s if g is csr else g.index(s)
+    dist[s] = 0
+    active = np.zeros(n, dtype=bool)
+    active[s] = True
+
+    for i in range(n + 1):
+        edges = np.flatnonzero(active[src])
+        if not len(edges):
+            break
+        cand = dist[src[edges]] + w[edges]
+        old = dist.copy()
+        np.minimum.at(dist, tgt[edges], cand)
+        won = cand == dist[tgt[edges]]
+        won &= cand < old[tgt[edges]]
+        pred[tgt[edges[won]]] = src[edges[won]]
+        active = dist < old
+    else:
+        preds = {nodes[v]: (None if pred[v] < 0 else nodes[pred[v]]) for v in range(n)}
+        cycle = _pred_cycle(preds, nodes[int(np.flatnonzero(active)[0])])
+        if cycle is None:
+            return bellman_ford(g, s if g is csr else nodes[s])
+        raise NegativeCycleException('Negative weight cycle detected!', cycle)
+
+    return {nodes[v]: (math.inf if dist[v] == inf else dist[v].item(),
+                       None if pred[v] < 0 else nodes[pred[v]])
+            for v in range(n)}
+
+
+def negative_cycle(g:Graph):
+    """
+    Find a negative weight cycle anywhere in a graph.
+    :param g: A graph (a Graph or a CSRGraph)
+    :return: The nodes of a negative cycle in edge order, or None if there is none.
+    """
+    d = {v: 0 for v in g.nodes}
+    pred = {v: None for v in g.nodes}
+    return _spfa(g, d, pred, list(g.nodes))
+
+
+def _johnson_potentials(g):
+    """
+    Run Bellman-Ford (as SPFA) from an implicit supersource joined to every node by a 0-cost edge.
+    :param g: A graph.
+    :return: A dict of type {node: potential}.
+    """
+    h = {v: 0 for v in g.nodes}
+    pred = {v: None for v in g.nodes}
+    cycle = _spfa(g, h, pred, list(g.nodes))
+    if cycle is not None:
+        raise NegativeCycleException('Negative weight cycle detected!', cycle)
+    return h
+
+
+def johnson(g: Graph, processes=1):
     """
     Find the shortest paths between all pairs of nodes in a graph.
-    :param g: The given graph.
+    The graph is converted to a CSRGraph and reweighted there, so the
+    original is never copied node by node.
+    :param g: The given graph (a Graph or a CSRGraph).
+    :param processes: The number of worker processes (see iter_johnson).
     :return: A dict of dicts of type {source: {node: (distance, predecessor)}}.
     """
-    gg = copy.copy(g)
+    ans = dict(iter_johnson(g, processes=processes))
+    return {u: ans[u] for u in g.nodes}
 
-    # add a supersource to the graph
-    s = gg.add_node('S')
-    for node in gg.nodes:
-        if node is not s:
-            gg.add_edge(s, node, 0)
 
-    # run bellman-ford, tweak the graph
-    bf = bellman_ford(gg, s)
-    d = dict()
-    for node in gg.nodes:
-        d[node] = bf[node][0]
-    for (i, ((u, v), c)) in enumerate(gg.edges):
-        gg.edges[i] = ((u, v), d[u] + c - d[v])
+def iter_johnson(g: Graph, processes=1):
+    """
+    Johnson's algorithm, one source at a time. The potentials are computed once;
+    with more than one process, the reweighted graph is written to a temporary
+    binary graph file which every worker memory-maps, so it is shared rather than
+    copied, and the per-source Dijkstra runs are spread over a process pool.
+    :param g: The given graph (a Graph or a CSRGraph).
+    :param processes: The number of worker processes; None for one per CPU.
+                      With 1 everything runs in this process.
+    :return: A generator of (source, {node: (distance, predecessor)}) tuples. With a pool,
+             the sources come in the order their runs complete.
+    """
+    csr = _as_csr(g)
+    nodes = list(g.nodes)
+
+    # run bellman-ford from a virtual supersource, tweak the graph
+    h = _johnson_potentials(csr)
+    rw = csr.reweighted(h)
+
+    def row(u, dist, pred):
+        hu = h[u]
+        return nodes[u], {nodes[v]: (dist[v] - hu + h[v], None if pred[v] is None else nodes[pred[v]])
+                          for v in range(len(nodes))}
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes <= 1 or len(nodes) < 2:
+        workspace = SearchWorkspace(rw)
+        for u in rw.nodes:
+            yield row(u, *_johnson_dijkstra(rw, u, workspace))
+        return
+
+    for (u, dist, pred) in _map_shared(rw, _johnson_worker_run, rw.nodes, processes):
+        yield row(u, dist, pred)
+
+
+def _johnson_dijkstra(rw, u, workspace=None):
+    """Dijkstra from u on the reweighted CSR graph, as two lists indexed by vertex."""
+    temp = dijkstra(rw, u, workspace=workspace)
+    inf = math.inf
+    dist, pred = [inf] * rw.numOfNodes, [None] * rw.numOfNodes
+    for (v, (dv, p)) in temp.items():
+        dist[v] = dv
+        pred[v] = p
+    return dist, pred
+
+
+def _map_shared(csr, func, items, processes, ordered=False):
+    """
+    Apply func to every item on a process pool whose workers share one CSR graph.
+    The graph is written to a temporary binary graph file and memory-mapped by every
+    worker, where func finds it (with a SearchWorkspace for it) in _shared_graph.
+    :return: A generator of the results, in the order of items if ordered.
+    """
+    fd, filename = tempfile.mkstemp(suffix='.' + BinaryFormat.EXTENSION)
+    os.close(fd)
+    try:
+        csr.save(filename)
+        chunksize = max(1, len(items) // (8 * processes))
+        with multiprocessing.Pool(processes, initializer=_shared_graph_init, initargs=(filename,)) as pool:
+            imap = pool.imap if ordered else pool.imap_unordered
+            yield from imap(func, items, chunksize)
+    finally:
+        os.remove(filename)
+
+
+# The graph of the pool (and its workspace), memory-mapped once by each worker process of _map_shared
+_shared_graph = None
+_shared_workspace = None
+
+
+def _shared_graph_init(filename):
+    global _shared_graph, _shared_workspace
+    _shared_graph = CSRGraph.open(filename)
+    _shared_workspace = SearchWorkspace(_shared_graph)
 
-    # run Dijkstra from each vertex
-    ans = dict()
-    for u in gg.nodes:
-        if u is not s:
-            temp = dijkstra(gg, u)
-            ans[gg.isomorph(g, u)] = {gg.isomorph(g, v): (temp[v][0] - d[u] + d[v],
-                                                          gg.isomorph(g, temp[v][1]))
-                                      for v in temp if v is not s}
-    return ans
 
+def _johnson_worker_run(u):
+    dist, pred = _johnson_dijkstra(_shared_graph, u, _shared_workspace)
+    return u, dist, pred
 
-def prim(g:Graph):
+
+def _batch_worker_run(task):
+    algorithm, u = task
+    return u, _BATCH_ALGORITHMS[algorithm](_shared_graph, u, workspace=_shared_workspace)
+
+
+def prim(g:Graph, queue='binary'):
     """
     Find a minimum spanning tree of an undirected graph g.
-    :param g: An undirected graph.
+    :param g: An undirected graph (a Graph or a CSRGraph).
+    :param queue: The priority queue backend: a name from DataStructures.QUEUES
+                  (e.g. 'fibonacci', 'pairing') or a queue class. Monotone queues
+                  such as 'bucket' cannot be used, as Prim's keys are not monotone.
     :return: A tuple: (the cost, A list of all the edges in the MST).
     """
+    if DataStructures.is_monotone(queue):
+        raise ValueError('Prim\'s algorithm cannot use the monotone queue ' + str(queue)
+                         + ': its keys do not grow monotonically.')
     if g.directed:
         warnings.warn('The graph should be undirected!')
     d = dict()
@@ -180,13 +597,13 @@ def prim(g:Graph):
     s = g.nodes[0]
     d[s] = 0
 
-    q = DataStructures.PriorityQueue([], key=lambda x: d[x])
+    q = DataStructures.queue_factory(queue)([], key=lambda x: d[x])
     q.push(s)
     while q:
         u = q.pop()
         popped[u] = True
 
-        for (v, c) in u.neighbours:
+        for (v, c) in g.neighbours(u):
             if not popped[v] and c < d[v]:
                 d[v] = c
                 pred[v] = u
@@ -195,32 +612,164 @@ def prim(g:Graph):
                 else:
                     q.push(v)
 
+    # d[v] is the cost of the edge that attached v to the tree; keep the orientation of g.edges
     sol = []
-    costs = dict(g.edges)
+    oriented = {e for (e, c) in g.edges}
     cost = 0
     for v in pred:
         if pred[v] is not None:
-            if (pred[v], v) in costs:
-                sol.append(((pred[v], v), costs[(pred[v], v)]))
-                cost += costs[(pred[v], v)]
-            else:
-                sol.append(((v, pred[v]), costs[v, pred[v]]))
-                cost += costs[(v, pred[v])]
+            e = (pred[v], v) if (pred[v], v) in oriented else (v, pred[v])
+            sol.append((e, d[v]))
+            cost += d[v]
     return cost, sol
 
-def floyd_warshall(g:Graph):
+def floyd_warshall(g:Graph, block_size=FLOYD_WARSHALL_BLOCK):
     """
-    Create a transitive closure of the graph, i.e. whether each node is reachable from
-    any other node.
-    :param g: A graph.
-    :return: A n x n matrix where the [i][j] element says whether i is reachable from j
+    Find the shortest paths between all pairs of nodes, by Floyd-Warshall.
+    Nodes are numbered by their position in g.nodes (the vertex ids of a CSRGraph).
+    With NumPy, every step is a broadcast over a dense distance matrix, and the
+    matrix is processed in tiles of rows which stay in cache while block_size
+    intermediate nodes are applied to them.
+    A negative weight cycle raises NegativeCycleException, with a cycle rebuilt from the next hops.
+    :param g: A graph (a Graph or a CSRGraph).
+    :param block_size: The number of intermediate nodes per tile pass; 0 or None disables tiling.
+    :return: A tuple (dist, nxt) of n x n matrices: dist[i][j] is the distance from i to j
+             (0 on the diagonal, inf if j is unreachable) and nxt[i][j] is the node after i
+             on a shortest path to j (-1 if there is none); see floyd_warshall_path.
+             They are NumPy arrays when NumPy is installed, lists of lists otherwise.
     """
-    adj = g.adjacency
     n = g.numOfNodes
-    sol = adj
+    if isinstance(g, CSRGraph):
+        index = None
+    else:
+        index = {node: i for (i, node) in enumerate(g.nodes)}
+    edges = [(u, v, c) if index is None else (index[u], index[v], c) for ((u, v), c) in g.edges]
+    if not g.directed:
+        edges += [(v, u, c) for (u, v, c) in edges]
+
+    if np is None:
+        dist, nxt = _floyd_warshall_lists(n, edges)
+        _floyd_warshall_check(g, dist, nxt)
+        return dist, nxt
+
+    dist = np.full((n, n), math.inf)
+    nxt = np.full((n, n), -1, dtype=np.int64)
+    if edges:
+        src, dst, cost = (np.array(col) for col in zip(*edges))
+        np.minimum.at(dist, (src, dst), cost)
+        nxt[src, dst] = dst
+    diagonal = np.arange(n)
+    loops = dist[diagonal, diagonal]
+    nxt[diagonal, diagonal] = np.where(loops < 0, nxt[diagonal, diagonal], diagonal)
+    dist[diagonal, diagonal] = np.minimum(loops, 0)
+
+    # Step k of Floyd-Warshall updates every row i from dist[i][k] and row k alone, and leaves
+    # row k unchanged. So the rows can be processed in tiles, each tile taking a block of
+    # steps at a time, as long as it sees row k as it was at step k: a snapshot of it.
+    if not block_size:
+        block_size = max(n, 1)
+    cand = np.empty((min(block_size, n), n))
+    better = np.empty((min(block_size, n), n), dtype=bool)
+    for start in range(0, n, block_size):
+        block = slice(start, min(start + block_size, n))
+        size = block.stop - start
+        snapshot = np.empty((size, n))
+        for k in range(block.start, block.stop):
+            snapshot[k - start] = dist[k]
+            _floyd_warshall_relax(dist, nxt, block, k, snapshot[k - start], cand[:size], better[:size])
+        for top in range(0, n, block_size):
+            if top != start:
+                rows = slice(top, min(top + block_size, n))
+                size = rows.stop - top
+                for k in range(block.start, block.stop):
+                    _floyd_warshall_relax(dist, nxt, rows, k, snapshot[k - start], cand[:size], better[:size])
+
+    _floyd_warshall_check(g, dist, nxt)
+    return dist, nxt
+
+
+def _floyd_warshall_relax(dist, nxt, rows, k, rowk, cand, better):
+    """
+    Relax the rows dist[rows] (a slice) through the intermediate node k, whose row is rowk, in place.
+    cand and better are scratch buffers with the shape of dist[rows].
+    """
+    block = dist[rows]
+    np.add(block[:, k, None], rowk[None, :], out=cand)
+    np.less(cand, block, out=better)
+    if better.any():
+        np.minimum(block, cand, out=block)
+        np.copyto(nxt[rows], nxt[rows, k][:, None], where=better)
+
+
+def _floyd_warshall_lists(n, edges):
+    """The pure-Python Floyd-Warshall used without NumPy. Same result as floyd_warshall, as lists."""
+    dist = [[math.inf] * n for i in range(n)]
+    nxt = [[-1] * n for i in range(n)]
+    for (u, v, c) in edges:
+        if c < dist[u][v]:
+            dist[u][v] = c
+            nxt[u][v] = v
+    for i in range(n):
+        if dist[i][i] > 0:
+            dist[i][i] = 0
+            nxt[i][i] = i
 
     for k in range(n):
+        rowk = dist[k]
         for i in range(n):
+            dik = dist[i][k]
+            if dik == math.inf:
+                continue
+            rowi, nxi = dist[i], nxt[i]
+            nik = nxi[k]
             for j in range(n):
-                sol[i][j] = sol[i][j] or (sol[i][k] and sol[k][j])
-    return sol
+                c = dik + rowk[j]
+                if c < rowi[j]:
+                    rowi[j] = c
+                    nxi[j] = nik
+    return dist, nxt
+
+
+def _floyd_warshall_check(g, dist, nxt):
+    """
+    Raise NegativeCycleException if a node is on a negative weight cycle (dist[i][i] < 0).
+    Every next hop is an edge of the graph, so following the next hops towards such a node i,
+    from i, runs into a cycle. Once the distances have gone below those of any simple path,
+    that cycle may not be negative, so its cost is checked, the other such nodes are tried,
+    and as a last resort the cycle is looked for by Bellman-Ford.
+    """
+    negative = [i for i in range(len(dist)) if dist[i][i] < 0]
+    if not negative:
+        return
+    cost = dict()
+    for (u, v, c) in _arcs(g):
+        if c < cost.get((u, v), math.inf):
+            cost[(u, v)] = c
+    nodes = g.nodes
+    for i in negative:
+        seen = dict()
+        u = i
+        while u not in seen:
+            seen[u] = len(seen)
+            u = int(nxt[u][i])
+        cycle = [nodes[v] for v in list(seen)[seen[u]:]]
+        if sum(cost[(u, v)] for (u, v) in zip(cycle, cycle[1:] + cycle[:1])) < 0:
+            raise NegativeCycleException('Negative weight cycle detected!', cycle)
+    raise NegativeCycleException('Negative weight cycle detected!', negative_cycle(g))
+
+
+def floyd_warshall_path(nxt, i, j):
+    """
+    Rebuild a shortest path from the next-hop matrix of floyd_warshall.
+    :param nxt: The next-hop matrix.
+    :param i: The index of the source node.
+    :param j: The index of the destination node.
+    :return: The list of node indices on the path, from i to j; empty if j is unreachable.
+    """
+    if nxt[i][j] < 0:
+        return []
+    path = [i]
+    while i != j:
+        i = int(nxt[i][j])
+        path.append(i)
+    return path
@@ -0,0 +1,154 @@
+import warnings
+
+import DataStructures
+from GraphRepresentation import Graph
+
+
+class IncrementalMST:
+    """A minimum spanning forest of an undirected graph, kept up to date as edges are added.
+        The connected components are a DisjointSet, so connected(u, v) and the number of
+        components are answered in near-constant time. The forest itself is held in a
+        LinkCutTree, with a vertex of its own for every tree edge, weighed by its cost:
+        a new edge between two components joins them, and a new edge (u, v) within a
+        component replaces the dearest edge on the tree path from u to v, if it is dearer.
+        Subscribed to a Graph, it follows its changes by itself; only a forest edge made
+        dearer or removed makes it start over from the whole graph.
+    """
+
+    def __init__(self, g:Graph=None, subscribe=True):
+        """
+        :param g: An undirected graph (a Graph or a CSRGraph) to start from, if any.
+        :param subscribe: Whether to follow the changes of g (a Graph) through Graph.subscribe.
+        """
+        self.graph = g
+        self.__reset()
+        if g is not None:
+            if g.directed:
+                warnings.warn('The graph should be undirected!')
+            self.__load(g)
+        self.subscribed = subscribe and g is not None and hasattr(g, 'subscribe')
+        if self.subscribed:
+            g.subscribe(self.on_change)
+
+    def close(self):
+        """Stop following the changes of the graph."""
+        if self.subscribed:
+            self.graph.unsubscribe(self.on_change)
+            self.subscribed = False
+
+    def add_node(self, node):
+        self.__vertex[node] = self.__forest.add()
+        self.__components.add_singleton(node)
+
+    def add_edge(self, u, v, cost=1):
+        """
+        Take a new edge into account.
+        :return: Whether it is now part of the forest.
+        """
+        if u not in self.__vertex:
+            self.add_node(u)
+        if v not in self.__vertex:
+            self.add_node(v)
+        if u == v:
+            return False
+
+        if not self.__components.same_set(u, v):
+            self.__components.merge(u, v)
+        else:
+            dearest = self.__forest.path_max(self.__vertex[u], self.__vertex[v])
+            ((a, b), c) = self.__tree[dearest]
+            if c <= cost:
+                return False
+            self.__forest.cut(dearest, self.__vertex[a])
+            self.__forest.cut(dearest, self.__vertex[b])
+            del self.__tree[dearest]
+            del self.__pairs[(a, b)]
+            del self.__pairs[(b, a)]
+            self.__spare.append(dearest)
+            self.cost -= c
+
+        e = self.__spare.pop() if self.__spare else self.__forest.add()
+        self.__forest.set_value(e, cost)
+        self.__forest.link(self.__vertex[u], e)
+        self.__forest.link(e, self.__vertex[v])
+        self.__tree[e] = ((u, v), cost)
+        self.__pairs[(u, v)] = self.__pairs[(v, u)] = e
+        self.cost += cost
+        return True
+
+    def connected(self, u, v):
+        return self.__components.same_set(u, v)
+
+    @property
+    def components(self):
+        """The number of connected components."""
+        return self.__components.num_of_sets
+
+    @property
+    def edges(self):
+        """The edges of the forest, as ((u, v), cost) tuples."""
+        return list(self.__tree.values())
+
+    def mst(self):
+        """
+        :return: A tuple: (the cost, A list of all the edges in the forest), like kruskal.
+        """
+        return self.cost, self.edges
+
+    def rebuild(self):
+        """Start over from the current state of the graph."""
+        self.__reset()
+        self.__load(self.graph)
+
+    def on_change(self, event, *args):
+        """The Graph.subscribe callback."""
+        if event == 'add_node':
+            self.add_node(args[0])
+        elif event == 'add_edge':
+            self.add_edge(*args)
+        elif event == 'update_edge':
+            u, v, old, new = args
+            e = self.__tree_edge(u, v, old)
+            if e is None and new < old:
+                # a cheaper edge outside the forest is as good as a new one
+                self.add_edge(u, v, new)
+            elif e is not None and new <= old:
+                # a tree edge getting cheaper stays in the tree
+                self.__forest.set_value(e, new)
+                self.__tree[e] = ((u, v), new)
+                self.cost += new - old
+            elif e is not None:
+                self.rebuild()
+        elif event == 'remove_edge':
+            if self.__tree_edge(*args) is not None:
+                self.rebuild()
+        else:
+            self.rebuild()
+
+    def __tree_edge(self, u, v, cost):
+        """The forest vertex of the edge (u, v) of the given cost, None if it is not in the forest."""
+        e = self.__pairs.get((u, v))
+        if e is None or self.__tree[e][1] != cost:
+            return None
+        return e
+
+    def __reset(self):
+        self.cost = 0
+        self.__components = DataStructures.DisjointSet(())
+        self.__forest = DataStructures.LinkCutTree()
+        self.__vertex = dict()
+        self.__tree = dict()
+        # the forest vertex of the tree edge between two nodes, under both (u, v) and (v, u)
+        self.__pairs = dict()
+        self.__spare = []
+
+    def __load(self, g):
+        for node in g.nodes:
+            self.add_node(node)
+        # in order of cost, no edge ever needs replacing
+        for ((u, v), c) in sorted(g.edges, key=lambda e: e[1]):
+            self.add_edge(u, v, c)
+
+    def __str__(self):
+        return ('<IncrementalMST: ' + str(len(self.__tree)) + ' edges, cost ' + str(self.cost)
+                + ', ' + str(self.components) + ' components/>')
@@ -0,0 +1,340 @@
+import math
+import random
+import struct
+import sys
+from array import array
+
+from GraphAlgorithms.GraphAlgorithms import _as_csr, dijkstra
+from GraphAlgorithms.PointToPoint import astar
+from GraphAlgorithms.SearchWorkspace import SearchWorkspace
+from GraphRepresentation import CSRGraph, Graph
+from GraphRepresentation.GraphLoader import CorruptedInputException
+
+# How many of the landmarks a query uses: those giving the best bound between its endpoints
+ACTIVE_LANDMARKS = 4
+
+_MAGIC = b'GRAPHALT'
+_VERSION = 2
+_HEADER = struct.Struct('<8sIcxxxqq')
+_INT_MAX = 2 ** 31 - 1
+_LONG_MAX = 2 ** 63 - 1
+
+# The value of the vertices out of reach, by typecode
+_MISSING = {'i': _INT_MAX, 'q': _LONG_MAX, 'd': math.inf}
+
+# The rounding error of a float distance, relative to its size: the bounds are lowered by
+# this much of the distances they are worked out from, to stay below the true distances
+_FLOAT_SLACK = 2 ** -40
+
+
+class LandmarkIndex:
+    """An ALT (A*, landmarks and the triangle inequality) index of a graph.
+        For each of k landmarks L it keeps the distances from L to every vertex and from
+        every vertex to L, which bound the distance between any two vertices from below:
+            d(v, t) >= d(L, t) - d(L, v)    and    d(v, t) >= d(v, L) - d(t, L)
+        and the largest of these bounds is the potential of an A* search.
+        Every distance list is one compact array per landmark: 32-bit integers ('i') when
+        all costs are integers and small enough, 64-bit integers ('q') for larger ones, and
+        64-bit floats ('d') otherwise, whose bounds are lowered by a rounding error bound
+        proportional to the distances they come from.
+        The index is cheap to build and to keep up to date: every landmark records the
+        version of the graph it was computed at, and the queries first rebuild those
+        computed before the last change. They can also be recomputed ahead, one at a time,
+        with rebuild. Float costs appearing in an integer graph turn every array into floats.
+        Edge costs must be non-negative.
+    """
+
+    def __init__(self, g:Graph, k=8, strategy='avoid', seed=None, landmarks=None):
+        """
+        :param g: The graph (a Graph or a CSRGraph).
+        :param k: The number of landmarks.
+        :param strategy: How to pick the landmarks: 'avoid', 'farthest' or 'random'.
+        :param seed: The seed of the random choices made while picking them.
+        :param landmarks: The landmarks to use instead of picking them.
+        """
+        self.graph = g
+        self.forward = []
+        self.backward = []
+        self.landmarks = []
+        self.versions = []
+        self.typecode = None
+        if landmarks is not None and not landmarks:
+            return
+        if landmarks is None and strategy not in _STRATEGIES:
+            raise ValueError('Unknown strategy ' + str(strategy) + '; expected one of ' + str(sorted(_STRATEGIES)))
+        csr = _as_csr(g)
+        csr_reversed = csr.reversed()
+        if landmarks is None:
+            rand = random.Random(seed)
+            landmarks = (_STRATEGIES[strategy](self, csr, rand) for i in range(min(k, g.numOfNodes)))
+        for node in landmarks:
+            self.landmarks.append(node)
+            self.forward.append(None)
+            self.backward.append(None)
+            self.versions.append(None)
+            self.__rebuild(len(self.landmarks) - 1, csr, csr_reversed)
+
+    def add_landmark(self, node):
+        """Add a landmark and compute its distance arrays."""
+        self.landmarks.append(node)
+        self.forward.append(None)
+        self.backward.append(None)
+        self.versions.append(None)
+        self.rebuild(len(self.landmarks) - 1)
+
+    def rebuild(self, i, node=None):
+        """
+        Recompute the distance arrays of the i-th landmark, from the current state of the graph.
+        :param node: A new node to take the place of the landmark, if given.
+        """
+        if node is not None:
+            self.landmarks[i] = node
+        csr = _as_csr(self.graph)
+        self.__rebuild(i, csr, csr.reversed())
+
+    def refresh(self):
+        """Recompute every landmark."""
+        csr = _as_csr(self.graph)
+        csr_reversed = csr.reversed()
+        for i in range(len(self.landmarks)):
+            self.__rebuild(i, csr, csr_reversed)
+
+    def lower_bound(self, u, v, active=None):
+        """
+        A lower bound on the distance from u to v.
+        :param active: The indices of the landmarks to use; all of them by default.
+        :return: The bound; math.inf if v cannot be reached from u.
+        """
+        self.__refresh_stale()
+        return self.__bound(self.__id(u), self.__id(v), range(len(self.landmarks)) if active is None else active)
+
+    def potential(self, t, active=None):
+        """
+        :return: A callable heuristic(v, t), the lower bound on the distance from v to t.
+        """
+        self.__refresh_stale()
+        tid = self.__id(t)
+        if active is None:
+            active = range(len(self.landmarks))
+        bound, index = self.__bound, self.__id
+        return lambda v, target: bound(index(v), tid, active)
+
+    def shortest_path(self, s, t, active=ACTIVE_LANDMARKS):
+        """
+        Find a shortest path with A*, guided by the landmarks.
+        :param active: How many landmarks to use: those giving the best bound from s to t.
+        :return: A tuple (distance, path as a list of nodes), or (math.inf, None) if t cannot be reached.
+        """
+        self.__refresh_stale()
+        sid, tid = self.__id(s), self.__id(t)
+        best = sorted(range(len(self.landmarks)), key=lambda i: -self.__bound(sid, tid, (i,)))[:active]
+        return astar(self.graph, s, t, heuristic=self.potential(t, active=best))
+
+    def save(self, filename):
+        """
+        Write the index to a binary file, to be reopened with LandmarkIndex.load.
+        """
+        n = len(self.forward[0]) if self.forward else 0
+        with open(filename, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, (self.typecode or 'i').encode(), len(self.landmarks), n))
+            _write_array(file, array('q', (self.__id(node) for node in self.landmarks)))
+            for (fw, bw) in zip(self.forward, self.backward):
+                _write_array(file, fw)
+                _write_array(file, bw)
+
+    @staticmethod
+    def load(filename, g:Graph):
+        """
+        Read an index written by save.
+        :param filename: The file.
+        :param g: The graph it was built from, as it was then.
+        :return: A new LandmarkIndex.
+        """
+        with open(filename, 'rb') as file:
+            head = file.read(_HEADER.size)
+            if len(head) < _HEADER.size or head[:len(_MAGIC)] != _MAGIC:
+                raise CorruptedInputException('Not a landmark index file: ' + filename)
+            magic, version, typecode, k, n = _HEADER.unpack(head)
+            if version != _VERSION:
+                raise CorruptedInputException('Unsupported landmark index version ' + str(version))
+            typecode = typecode.decode()
+            ids = _read_array(file, 'q', k)
+            arrays = [_read_array(file, typecode, n) for i in range(2 * k)]
+
+        index = LandmarkIndex(g, landmarks=())
+        index.typecode = typecode
+        index.landmarks = [node if isinstance(g, CSRGraph) else g.nodes[node] for node in ids]
+        index.forward = arrays[0::2]
+        index.backward = arrays[1::2]
+        index.versions = [g.version] * k
+        return index
+
+    def __refresh_stale(self):
+        """Rebuild the landmarks computed before the last change to the graph."""
+        version = self.graph.version
+        stale = [i for (i, v) in enumerate(self.versions) if v != version]
+        if stale:
+            csr = _as_csr(self.graph)
+            csr_reversed = csr.reversed()
+            for i in stale:
+                self.__rebuild(i, csr, csr_reversed)
+
+    def __rebuild(self, i, csr, csr_reversed):
+        if csr.integer_weight_bound() is None:
+            if self.typecode != 'd':
+                # the graph has float costs now: switch every landmark to float distances
+                self.typecode = 'd'
+                self.forward = [None if a is None else _to_double(a) for a in self.forward]
+                self.backward = [None if a is None else _to_double(a) for a in self.backward]
+        elif self.typecode is None:
+            self.typecode = 'i'
+        lid = self.__id(self.landmarks[i])
+        self.forward[i] = self.__distances(csr, lid)
+        self.backward[i] = self.__distances(csr_reversed, lid)
+        self.versions[i] = self.graph.version
+
+    def __id(self, node):
+        return node if isinstance(self.graph, CSRGraph) else self.graph.index(node)
+
+    def __distances(self, csr, source):
+        """The distances from source to every vertex, as an array of the index's typecode."""
+        dist = dijkstra(csr, source, workspace=SearchWorkspace(csr))
+        if self.typecode == 'i':
+            if all(d < _INT_MAX for (d, p) in dist.values()):
+                res = array('i', [_INT_MAX]) * csr.numOfNodes
+                for (v, (d, p)) in dist.items():
+                    res[v] = d
+                return res
+            # the distances outgrew 32-bit integers: switch every landmark to 64-bit ones
+            self.typecode = 'q'
+            self.forward = [None if a is None else _to_long(a) for a in self.forward]
+            self.backward = [None if a is None else _to_long(a) for a in self.backward]
+        res = array(self.typecode, [_MISSING[self.typecode]]) * csr.numOfNodes
+        for (v, (d, p)) in dist.items():
+            res[v] = d
+        return res
+
+    def __bound(self, u, v, active):
+        best = 0
+        forward, backward = self.forward, self.backward
+        missing = _MISSING[self.typecode]
+        slack = _FLOAT_SLACK if self.typecode == 'd' else 0
+        for i in active:
+            fw, bw = forward[i], backward[i]
+            if u >= len(fw) or v >= len(fw):
+                continue
+            fu, fv = fw[u], fw[v]
+            if fu != missing:
+                if fv == missing:
+                    return math.inf
+                if fv - fu - slack * fv > best:
+                    best = fv - fu - slack * fv
+            bu, bv = bw[u], bw[v]
+            if bv != missing:
+                if bu == missing:
+                    return math.inf
+                if bu - bv - slack * bu > best:
+                    best = bu - bv - slack * bu
+        return best
+
+
+def landmark_index(g:Graph, k=8, strategy='avoid', seed=None):
+    """
+    Build an ALT index of a graph.
+    :param g: The graph (a Graph or a CSRGraph), with non-negative edge costs.
+    :param k: The number of landmarks.
+    :param strategy: How to pick the landmarks: 'avoid', 'farthest' or 'random'.
+    :return: A new LandmarkIndex.
+    """
+    return LandmarkIndex(g, k=k, strategy=strategy, seed=seed)
+
+
+def _random_landmark(index, csr, rand):
+    nodes = [v for v in index.graph.nodes if v not in index.landmarks]
+    return rand.choice(nodes)
+
+
+def _farthest_landmark(index, csr, rand):
+    """The node farthest, there and back, from the closest of the landmarks picked so far.
+        Nodes out of reach of every landmark come first."""
+    if not index.landmarks:
+        return _random_landmark(index, csr, rand)
+    best, farthest = -1, None
+    for (i, node) in enumerate(index.graph.nodes):
+        if node in index.landmarks:
+            continue
+        d = min(fw[i] + bw[i] for (fw, bw) in zip(index.forward, index.backward))
+        if d > best:
+            best, farthest = d, node
+    return farthest
+
+
+def _avoid_landmark(index, csr, rand):
+    """
+    The 'avoid' strategy of Goldberg and Werneck: grow a shortest path tree from a random
+    root, weigh each node by how much the current landmarks underestimate its distance
+    from the root, and descend from the root into the heaviest subtree holding no landmark.
+    """
+    if not index.landmarks:
+        return _farthest_landmark(index, csr, rand)
+    g = index.graph
+    nodes = list(g.nodes)
+    root = rand.randrange(len(nodes))
+    tree = dijkstra(csr, root, workspace=SearchWorkspace(csr))
+    landmarks = {node if g is csr else g.index(node) for node in index.landmarks}
+
+    children = {v: [] for v in tree}
+    for (v, (d, p)) in tree.items():
+        if p is not None:
+            children[p].append(v)
+    order = [root]
+    for v in order:
+        order.extend(children[v])
+
+    size = {v: tree[v][0] - index.lower_bound(nodes[root], nodes[v]) for v in order}
+    covered = set(landmarks)
+    for v in reversed(order):
+        p = tree[v][1]
+        if v in covered:
+            size[v] = 0
+            if p is not None:
+                covered.add(p)
+        elif p is not None:
+            size[p] += size[v]
+
+    v = root
+    while children[v]:
+        heaviest = max(children[v], key=size.__getitem__)
+        if size[heaviest] <= 0:
+            break
+        v = heaviest
+    if v == root or v in landmarks:
+        return _farthest_landmark(index, csr, rand)
+    return nodes[v]
+
+
+_STRATEGIES = {'random': _random_landmark, 'farthest': _farthest_landmark, 'avoid': _avoid_landmark}
+
+
+def _to_long(arr):
+    return array('q', (_LONG_MAX if x == _INT_MAX else x for x in arr))
+
+
+def _to_double(arr):
+    missing = _MISSING[arr.typecode]
+    return array('d', (math.inf if x == missing else x for x in arr))
+
+
+def _write_array(file, arr):
+    if sys.byteorder != 'little':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    arr.tofile(file)
+
+
+def _read_array(file, typecode, count):
+    arr = array(typecode)
+    arr.fromfile(file, count)
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
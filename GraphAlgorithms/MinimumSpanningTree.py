@@ -0,0 +1,198 @@
+import multiprocessing
+import os
+import warnings
+
+import DataStructures
+from GraphAlgorithms.GraphAlgorithms import _node_ids
+from GraphRepresentation import CSRGraph, Graph
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The number of edges below which filter_kruskal stops partitioning and sorts
+FILTER_KRUSKAL_THRESHOLD = 1 << 14
+
+
+def _edge_arrays(g):
+    """
+    The edges of an undirected graph as parallel arrays (NumPy arrays if available, lists otherwise).
+    :return: A tuple (sources, destinations, costs, edge) where edge(i) is the i-th edge as a
+             ((u, v), cost) tuple of nodes, like the ones in g.edges.
+    """
+    if isinstance(g, CSRGraph) and np is not None:
+        offsets = np.asarray(g.offsets, dtype=np.int64)
+        src = np.repeat(np.arange(g.numOfNodes, dtype=np.int64), np.diff(offsets))
+        dst = np.asarray(g.targets, dtype=np.int64)
+        w = np.asarray(g.weights)
+        if not g.directed:
+            once = src <= dst
+            src, dst, w = src[once], dst[once], w[once]
+        return src, dst, w, lambda i: ((int(src[i]), int(dst[i])), w[i].item())
+
+    edges = g.edges if isinstance(g.edges, list) else list(g.edges)
+    index = _node_ids(g)
+    src = [index(u) for ((u, v), c) in edges]
+    dst = [index(v) for ((u, v), c) in edges]
+    w = [c for (e, c) in edges]
+    if np is not None:
+        src, dst = np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64)
+        w = np.array(w)
+    return src, dst, w, edges.__getitem__
+
+
+def _result(picked, edge):
+    sol = [edge(i) for i in picked]
+    cost = 0
+    for (e, c) in sol:
+        cost += c
+    return cost, sol
+
+
+def filter_kruskal(g:Graph, threshold=FILTER_KRUSKAL_THRESHOLD):
+    """
+    Find a minimum spanning tree (a forest, if g is not connected) with Filter-Kruskal:
+    the edges are split around a pivot cost, the cheaper part is solved first, and the
+    dearer part is then filtered of every edge within a single component, so most of the
+    edges that would be discarded are never sorted.
+    :param g: An undirected graph (a Graph or a CSRGraph).
+    :param threshold: The number of edges below which a part is simply sorted.
+    :return: A tuple: (the cost, A list of all the edges in the MST).
+    """
+    if g.directed:
+        warnings.warn('The graph should be undirected!')
+    src, dst, w, edge = _edge_arrays(g)
+    part = DataStructures.IntDisjointSet(g.numOfNodes)
+    picked = []
+    # parts of the edges, to be solved last in first out, with whether to filter them first
+    pending = [(list(range(len(w))) if np is None else np.arange(len(w), dtype=np.int64), False)]
+
+    while pending:
+        ids, dirty = pending.pop()
+        if dirty:
+            ids = _filter(part, src, dst, ids)
+        if len(ids) > threshold:
+            pivot = _pivot(w, ids)
+            if np is None:
+                low = [i for i in ids if w[i] <= pivot]
+                high = [i for i in ids if w[i] > pivot]
+            else:
+                cheap = w[ids] <= pivot
+                low, high = ids[cheap], ids[~cheap]
+            if len(high):
+                pending.append((high, True))
+                pending.append((low, False))
+                continue
+
+        if np is None:
+            ids = sorted(ids, key=w.__getitem__)
+            taken = part.union_many([src[i] for i in ids], [dst[i] for i in ids])
+        else:
+            ids = ids[np.argsort(w[ids], kind='stable')]
+            taken = part.union_many(src[ids].tolist(), dst[ids].tolist())
+        picked.extend(int(i) for (i, t) in zip(ids, taken) if t)
+
+    return _result(picked, edge)
+
+
+def _pivot(w, ids):
+    """The median cost of a sample of the edges."""
+    step = max(1, len(ids) // 1024)
+    sample = sorted(w[i] for i in ids[::step])
+    return sample[len(sample) // 2]
+
+
+def _filter(part, src, dst, ids):
+    """The edges among ids whose endpoints are in different components."""
+    if np is None:
+        return [i for i in ids if part.find(src[i]) != part.find(dst[i])]
+    roots = part.find_many(np.concatenate((src[ids], dst[ids])))
+    return ids[roots[:len(ids)] != roots[len(ids):]]
+
+
+def boruvka(g:Graph, processes=1):
+    """
+    Find a minimum spanning tree (a forest, if g is not connected) with Boruvka's algorithm:
+    in every round, each component picks its cheapest outgoing edge (ties broken by edge
+    position, so no cycle can be formed) and all of them are added at once, which at least
+    halves the number of components. With NumPy, a round is a few passes over the edge
+    arrays; the cheapest edges can also be looked for on a process pool, each worker taking
+    a slice of the edges.
+    :param g: An undirected graph (a Graph or a CSRGraph).
+    :param processes: The number of worker processes; None for one per CPU.
+    :return: A tuple: (the cost, A list of all the edges in the MST).
+    """
+    if g.directed:
+        warnings.warn('The graph should be undirected!')
+    src, dst, w, edge = _edge_arrays(g)
+    n = g.numOfNodes
+    part = DataStructures.IntDisjointSet(n)
+    if np is None:
+        return _result(_boruvka_lists(part, src, dst, w), edge)
+
+    # the edges ranked by (cost, position): the cheapest edge of a component has the lowest rank
+    order = np.lexsort((np.arange(len(w)), w))
+    rank = np.empty(len(w), dtype=np.int64)
+    rank[order] = np.arange(len(w), dtype=np.int64)
+    alive = np.arange(len(w), dtype=np.int64)
+    picked = []
+    workers = processes or os.cpu_count() or 1
+    pool = multiprocessing.Pool(workers) if workers > 1 else None
+    try:
+        while len(alive):
+            roots = part.find_many(np.concatenate((src[alive], dst[alive])))
+            cu, cv = roots[:len(alive)], roots[len(alive):]
+            between = cu != cv
+            alive, cu, cv = alive[between], cu[between], cv[between]
+            if not len(alive):
+                break
+            best = _cheapest(n, cu, cv, rank[alive], pool, workers)
+            chosen = order[np.unique(best[best < len(w)])]
+            taken = part.union_many(src[chosen].tolist(), dst[chosen].tolist())
+            picked.extend(int(i) for (i, t) in zip(chosen, taken) if t)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return _result(picked, edge)
+
+
+def _cheapest(n, cu, cv, ranks, pool, workers):
+    """The lowest rank of an edge leaving every component, or the largest int64 if none does."""
+    if pool is None:
+        return _cheapest_slice((n, cu, cv, ranks))
+    bounds = [len(ranks) * i // workers for i in range(workers + 1)]
+    slices = [(n, cu[a:b], cv[a:b], ranks[a:b]) for (a, b) in zip(bounds, bounds[1:])]
+    return np.minimum.reduce(pool.map(_cheapest_slice, slices))
+
+
+def _cheapest_slice(task):
+    n, cu, cv, ranks = task
+    best = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(best, cu, ranks)
+    np.minimum.at(best, cv, ranks)
+    return best
+
+
+def _boruvka_lists(part, src, dst, w):
+    """Boruvka's rounds without NumPy."""
+    alive = list(range(len(w)))
+    picked = []
+    while alive:
+        best = dict()
+        still = []
+        for i in alive:
+            a, b = part.find(src[i]), part.find(dst[i])
+            if a == b:
+                continue
+            still.append(i)
+            key = (w[i], i)
+            for c in (a, b):
+                if c not in best or key < best[c]:
+                    best[c] = key
+        alive = still
+        for i in sorted({i for (c, i) in best.values()}):
+            if part.union(src[i], dst[i]):
+                picked.append(i)
+    return picked
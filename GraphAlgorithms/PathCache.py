@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+
+from GraphAlgorithms.GraphAlgorithms import bellman_ford, bfs, dijkstra, spfa
+from GraphRepresentation import Graph
+
+# The number of results a PathCache holds by default
+CACHE_SIZE = 128
+
+# The single-source algorithms a PathCache can be asked for by name
+ALGORITHMS = {
+    'bfs': bfs,
+    'dijkstra': dijkstra,
+    'bellman_ford': bellman_ford,
+    'spfa': spfa,
+}
+
+
+class PathCache:
+    """A bounded cache of single-source search results, evicting the least recently used.
+        Results are keyed by (graph, graph version, algorithm, source, options), and as every
+        change to a Graph bumps its version, a result computed before a change is never
+        served after it; such stale entries simply age out.
+        The cached dicts are shared between callers and must not be modified.
+        The cache can be used from several threads at once.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        """
+        :param maxsize: The most results held at once.
+        """
+        if maxsize < 1:
+            raise ValueError('The cache must hold at least one result.')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, g:Graph, algorithm, source, **kwargs):
+        """
+        Run a single-source algorithm, or fetch its result from an earlier run.
+        :param g: The graph (a Graph or a CSRGraph).
+        :param algorithm: A name from ALGORITHMS (e.g. 'dijkstra', 'bfs') or a function f(g, source, **kwargs).
+        :param source: The source node.
+        :param kwargs: Passed on to the algorithm (e.g. queue='pairing'); part of the key.
+        :return: The result of algorithm(g, source, **kwargs).
+        """
+        function = ALGORITHMS[algorithm] if isinstance(algorithm, str) else algorithm
+        key = (g, g.version, function, source, tuple(sorted(kwargs.items())))
+        with self.__lock:
+            if key in self.__entries:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return self.__entries[key]
+            self.misses += 1
+
+        result = function(g, source, **kwargs)
+
+        with self.__lock:
+            self.__entries[key] = result
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def invalidate(self, g:Graph=None):
+        """Drop every result computed on g, or all of them."""
+        with self.__lock:
+            if g is None:
+                self.__entries.clear()
+            else:
+                for key in [key for key in self.__entries if key[0] is g]:
+                    del self.__entries[key]
+
+    def stats(self):
+        """
+        :return: A dict with the number of hits, misses and evictions, the current size,
+                 the maximum size and the hit rate.
+        """
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'size': len(self.__entries), 'maxsize': self.maxsize,
+                    'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __str__(self):
+        return '<PathCache: ' + str(len(self)) + '/' + str(self.maxsize) + ' results/>'
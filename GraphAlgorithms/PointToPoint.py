@@ -0,0 +1,138 @@
+import math
+
+import DataStructures
+from GraphRepresentation import Graph
+
+
+def _path(prev, t):
+    path = []
+    while t is not None:
+        path.append(t)
+        t = prev[t]
+    path.reverse()
+    return path
+
+
+def astar(g:Graph, s, t, heuristic=None, queue='binary'):
+    """
+    Find a shortest path from s to t with A*: nodes are settled in the order of their
+    distance from s plus the heuristic's estimate of their distance to t, and the search
+    stops as soon as t is settled. Nodes are reopened if the heuristic turns out not to be
+    consistent, so any admissible heuristic (one that never overestimates) gives exact
+    distances. Edge costs must be non-negative.
+    :param g: The graph (a Graph or a CSRGraph).
+    :param s: The source node.
+    :param t: The target node.
+    :param heuristic: A callable heuristic(v, t) estimating the distance from v to t, e.g. the
+                      straight-line distance between coordinates held in the nodes' contents.
+                      Without one this is Dijkstra's algorithm with early termination.
+    :param queue: The priority queue backend: a name from DataStructures.QUEUES or a queue class.
+    :return: A tuple (distance, path as a list of nodes), or (math.inf, None) if t cannot be reached.
+    """
+    d = {s: 0}
+    prev = {s: None}
+    if heuristic is None:
+        key = d.__getitem__
+    else:
+        h = {s: heuristic(s, t)}
+        key = lambda x: d[x] + h[x]
+    q = DataStructures.queue_factory(queue)([], key=key)
+    q.push(s)
+
+    while q:
+        u = q.pop()
+        if u == t:
+            return d[u], _path(prev, t)
+        du = d[u]
+        for (v, c) in g.neighbours(u):
+            newd = du + c
+            if newd < d.get(v, math.inf):
+                d[v] = newd
+                prev[v] = u
+                if heuristic is not None and v not in h:
+                    h[v] = heuristic(v, t)
+                if v in q:
+                    q.updated_key(v)
+                else:
+                    # a settled node whose distance improves is reopened
+                    q.push(v)
+
+    return math.inf, None
+
+
+def bidirectional_dijkstra(g:Graph, s, t, queue='binary'):
+    """
+    Find a shortest path from s to t by searching forwards from s and backwards from t
+    (over the reverse adjacency, g.in_neighbours) at the same time, always advancing the
+    search with the smaller frontier. The searches stop once the smallest keys of the two
+    frontiers add up to at least the best s-t distance found. Edge costs must be non-negative.
+    :param g: The graph (a Graph or a CSRGraph).
+    :param s: The source node.
+    :param t: The target node.
+    :param queue: The priority queue backend: a name from DataStructures.QUEUES or a queue class.
+    :return: A tuple (distance, path as a list of nodes), or (math.inf, None) if t cannot be reached.
+    """
+    if s == t:
+        return 0, [s]
+    factory = DataStructures.queue_factory(queue)
+    dist = ({s: 0}, {t: 0})
+    prev = ({s: None}, {t: None})
+    queues = (factory([], key=dist[0].__getitem__), factory([], key=dist[1].__getitem__))
+    adjacency = (g.neighbours, g.in_neighbours)
+    queues[0].push(s)
+    queues[1].push(t)
+    best = math.inf
+    meet = None
+
+    while queues[0] and queues[1]:
+        if dist[0][queues[0].get_min()] + dist[1][queues[1].get_min()] >= best:
+            break
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        d, p, q, other = dist[side], prev[side], queues[side], dist[1 - side]
+        u = q.pop()
+        du = d[u]
+        for (v, c) in adjacency[side](u):
+            newd = du + c
+            if newd < d.get(v, math.inf):
+                d[v] = newd
+                p[v] = u
+                if v in q:
+                    q.updated_key(v)
+                else:
+                    q.push(v)
+            if v in other and newd + other[v] < best:
+                best = newd + other[v]
+                meet = (u, v) if side == 0 else (v, u)
+
+    if meet is None:
+        return math.inf, None
+    u, v = meet
+    path = _path(prev[0], u)
+    while v is not None:
+        path.append(v)
+        v = prev[1][v]
+    return best, path
+
+
+_METHODS = {'dijkstra': lambda g, s, t, heuristic, queue: astar(g, s, t, queue=queue),
+            'astar': astar,
+            'bidirectional': lambda g, s, t, heuristic, queue: bidirectional_dijkstra(g, s, t, queue=queue)}
+
+
+def shortest_path(g:Graph, s, t, method='dijkstra', heuristic=None, queue='binary'):
+    """
+    Find a shortest path between two nodes, exploring only as much of the graph as needed.
+    :param g: The graph (a Graph or a CSRGraph), with non-negative edge costs.
+    :param s: The source node (the actual object; a vertex id for a CSRGraph).
+    :param t: The target node.
+    :param method: 'dijkstra' (stops when t is settled), 'bidirectional' or 'astar'.
+    :param heuristic: For 'astar', a callable heuristic(v, t) that never overestimates
+                      the distance from v to t.
+    :param queue: The priority queue backend: a name from DataStructures.QUEUES or a queue class.
+    :return: A tuple (distance, path as a list of nodes), or (math.inf, None) if t cannot be reached.
+    """
+    if method not in _METHODS:
+        raise ValueError('Unknown method ' + str(method) + '; expected one of ' + str(sorted(_METHODS)))
+    if method == 'astar' and heuristic is None:
+        raise ValueError('A* needs a heuristic.')
+    return _METHODS[method](g, s, t, heuristic, queue)
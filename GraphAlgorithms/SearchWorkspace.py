@@ -0,0 +1,53 @@
+import math
+
+
+class SearchWorkspace:
+    """The per-query state of a single-source search on one graph: distances,
+        predecessors and settled marks, allocated once and reused across queries.
+        An entry only counts if its stamp matches the current generation, so
+        starting a new query (reset) takes O(1) instead of touching every node,
+        and the graph itself is never written to.
+        The state is held in lists indexed by vertex when the nodes are the integers
+        0 .. n-1 (a CSRGraph, or a view of one), and in dicts keyed by node otherwise.
+        A workspace serves one query at a time: give each thread its own.
+    """
+
+    def __init__(self, g):
+        self.graph = g
+        if isinstance(g.nodes, range):
+            n = g.numOfNodes
+            self.dist = [math.inf] * n
+            self.pred = [None] * n
+            self.stamp = [0] * n
+            self.settled = [0] * n
+        else:
+            self.dist = {v: math.inf for v in g.nodes}
+            self.pred = {v: None for v in g.nodes}
+            self.stamp = {v: 0 for v in g.nodes}
+            self.settled = {v: 0 for v in g.nodes}
+        self.generation = 0
+        self.reached = []
+
+    def reset(self):
+        """Forget the previous query."""
+        self.generation += 1
+        self.reached = []
+
+    def distance(self, v):
+        return self.dist[v] if self.stamp[v] == self.generation else math.inf
+
+    def predecessor(self, v):
+        return self.pred[v] if self.stamp[v] == self.generation else None
+
+    def results(self):
+        """
+        :return: A dict of type {node: (distance, predecessor)} holding the nodes reached by the last query.
+        """
+        dist, pred = self.dist, self.pred
+        return {v: (dist[v], pred[v]) for v in self.reached}
+
+    def all_results(self):
+        """
+        :return: A dict of type {node: (distance, predecessor)} holding every node of the graph.
+        """
+        return {v: (self.distance(v), self.predecessor(v)) for v in self.graph.nodes}
@@ -0,0 +1,145 @@
+from GraphAlgorithms.GraphAlgorithms import _as_csr
+from GraphRepresentation import Graph
+
+
+def _tarjan(csr):
+    """
+    Tarjan's strongly connected components algorithm, without recursion.
+    :param csr: A CSRGraph.
+    :return: A tuple (number of components, list of the component of every vertex).
+             Components are numbered in the order they are completed, which is a reverse
+             topological order of the condensation: every edge goes to a component with
+             a smaller or equal number.
+    """
+    n = csr.numOfNodes
+    offsets, targets = csr.offsets, csr.targets
+    index = [-1] * n
+    low = [0] * n
+    onstack = [False] * n
+    comp = [-1] * n
+    stack = []
+    counter = 0
+    ncomp = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        onstack[root] = True
+        work = [(root, iter(targets[offsets[root]:offsets[root + 1]]))]
+
+        while work:
+            v, it = work[-1]
+            for w in it:
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    onstack[w] = True
+                    work.append((w, iter(targets[offsets[w]:offsets[w + 1]])))
+                    break
+                elif onstack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+            else:
+                work.pop()
+                if work:
+                    u = work[-1][0]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+                if low[v] == index[v]:
+                    while True:
+                        w = stack.pop()
+                        onstack[w] = False
+                        comp[w] = ncomp
+                        if w == v:
+                            break
+                    ncomp += 1
+
+    return ncomp, comp
+
+
+def strongly_connected_components(g:Graph):
+    """
+    Find the strongly connected components of a graph.
+    :param g: A graph (a Graph or a CSRGraph).
+    :return: A list of components, each a list of nodes, in reverse topological order:
+             no edge leads from a component to a later one.
+    """
+    nodes = list(g.nodes)
+    ncomp, comp = _tarjan(_as_csr(g))
+    components = [[] for i in range(ncomp)]
+    for (i, c) in enumerate(comp):
+        components[c].append(nodes[i])
+    return components
+
+
+class TransitiveClosure:
+    """The reachability relation of a graph, without an n x n matrix.
+        The graph is condensed into its strongly connected components, and every
+        component stores the set of components it reaches as a bitset (a Python int).
+        The bitsets are filled in reverse topological order, each one being the union
+        of the bitsets of its successors, and as a component only reaches components
+        numbered below it, a bitset needs no more bits than the component's number.
+        Every node reaches itself.
+    """
+
+    def __init__(self, g:Graph):
+        csr = _as_csr(g)
+        self.nodes = list(g.nodes)
+        self.__index = None if g is csr else {node: i for (i, node) in enumerate(self.nodes)}
+        self.numOfComponents, self.component = _tarjan(csr)
+
+        members = [[] for i in range(self.numOfComponents)]
+        for (v, c) in enumerate(self.component):
+            members[c].append(v)
+        self.members = members
+
+        offsets, targets, comp = csr.offsets, csr.targets, self.component
+        reach = [0] * self.numOfComponents
+        for c in range(self.numOfComponents):
+            bits = 1 << c
+            for v in members[c]:
+                for w in targets[offsets[v]:offsets[v + 1]]:
+                    d = comp[w]
+                    if d != c and not (bits >> d) & 1:
+                        bits |= reach[d]
+            reach[c] = bits
+        self.reach = reach
+
+    def __id(self, node):
+        return node if self.__index is None else self.__index[node]
+
+    def reachable(self, u, v):
+        """Whether there is a path from u to v."""
+        return (self.reach[self.component[self.__id(u)]] >> self.component[self.__id(v)]) & 1 == 1
+
+    def reachable_from(self, u):
+        """Iterate through the nodes reachable from u."""
+        bits = self.reach[self.component[self.__id(u)]]
+        while bits:
+            low = bits & -bits
+            for v in self.members[low.bit_length() - 1]:
+                yield self.nodes[v]
+            bits ^= low
+
+    def count_reachable(self, u):
+        """The number of nodes reachable from u."""
+        bits = self.reach[self.component[self.__id(u)]]
+        count = 0
+        while bits:
+            low = bits & -bits
+            count += len(self.members[low.bit_length() - 1])
+            bits ^= low
+        return count
+
+
+def transitive_closure(g:Graph):
+    """
+    Compute the transitive closure of a graph, i.e. whether each node is reachable from
+    any other node.
+    :param g: A graph (a Graph or a CSRGraph).
+    :return: A TransitiveClosure, answering reachable(u, v) queries.
+    """
+    return TransitiveClosure(g)
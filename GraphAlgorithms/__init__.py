@@ -1 +1,12 @@
 from GraphAlgorithms.GraphAlgorithms import *
+from GraphAlgorithms.TransitiveClosure import TransitiveClosure, transitive_closure, strongly_connected_components
+from GraphAlgorithms.SearchWorkspace import SearchWorkspace
+from GraphAlgorithms.PointToPoint import shortest_path, astar, bidirectional_dijkstra
+from GraphAlgorithms.ContractionHierarchy import ContractionHierarchy, contraction_hierarchy
+from GraphAlgorithms.Landmarks import LandmarkIndex, landmark_index
+from GraphAlgorithms.PathCache import PathCache
+from GraphAlgorithms.DynamicShortestPaths import DynamicSSSP
+from GraphAlgorithms.IncrementalMST import IncrementalMST
+from GraphAlgorithms.MinimumSpanningTree import filter_kruskal, boruvka
+from GraphAlgorithms.ExternalKruskal import external_kruskal
+from GraphAlgorithms.FrontierBFS import FrontierBFS, frontier_bfs
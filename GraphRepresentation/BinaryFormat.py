@@ -0,0 +1,96 @@
+"""
+The binary, memory-mappable on-disk format of a graph in CSR layout (see CSRGraph).
+
+    header (64 bytes, little-endian):
+        magic       8 bytes     b'GRAPHCSR'
+        version     uint32
+        flags       uint32      WEIGHTED | DIRECTED | FLOAT_WEIGHTS
+        nodes       int64       number of nodes n
+        edges       int64       number of edges of the graph
+        entries     int64       number of adjacency entries m (2 per edge when undirected)
+        (padding up to 64 bytes)
+    offsets     (n + 1) int64
+    targets     m int64
+    weights     m int64, or m float64 if FLOAT_WEIGHTS
+
+Every array starts at a multiple of 8 bytes, so it can be used in place from a memory map.
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+from GraphRepresentation.GraphLoader import CorruptedInputException
+
+EXTENSION = 'gbin'
+MAGIC = b'GRAPHCSR'
+VERSION = 1
+
+WEIGHTED = 1
+DIRECTED = 2
+FLOAT_WEIGHTS = 4
+
+_HEADER = struct.Struct('<8sIIqqq')
+_HEADER_SIZE = 64
+
+
+def is_binary(filename):
+    return filename.split('.')[-1] == EXTENSION
+
+
+def write_csr(filename, offsets, targets, weights, numOfEdges, weighted=True, directed=True):
+    """
+    Write CSR arrays to a binary graph file.
+    :param offsets: The n+1 row offsets.
+    :param targets: The m adjacency targets.
+    :param weights: The m costs, of typecode 'q' or 'd'.
+    :param numOfEdges: The number of edges of the graph.
+    """
+    typecode = getattr(weights, 'typecode', None) or weights.format
+    flags = (WEIGHTED if weighted else 0) | (DIRECTED if directed else 0) | (FLOAT_WEIGHTS if typecode == 'd' else 0)
+    header = _HEADER.pack(MAGIC, VERSION, flags, len(offsets) - 1, numOfEdges, len(targets))
+    with open(filename, 'wb') as file:
+        file.write(header.ljust(_HEADER_SIZE, b'\0'))
+        for (arr, code) in ((offsets, 'q'), (targets, 'q'), (weights, typecode)):
+            if not isinstance(arr, array) or arr.typecode != code:
+                arr = array(code, arr)
+            if sys.byteorder != 'little':
+                arr = array(code, arr)
+                arr.byteswap()
+            file.write(memoryview(arr).cast('B'))
+
+
+def read_csr(filename):
+    """
+    Map a binary graph file into memory.
+    :return: A dict with the keys offsets, targets, weights (zero-copy memoryviews over the map,
+             or arrays on big-endian machines), numOfEdges, weighted and directed.
+    """
+    with open(filename, 'rb') as file:
+        head = file.read(_HEADER_SIZE)
+        if len(head) < _HEADER_SIZE or head[:len(MAGIC)] != MAGIC:
+            raise CorruptedInputException('Not a binary graph file: ' + filename)
+        magic, version, flags, n, numOfEdges, m = _HEADER.unpack_from(head)
+        if version != VERSION:
+            raise CorruptedInputException('Unsupported binary graph version ' + str(version))
+        size = _HEADER_SIZE + 8 * (n + 1 + 2 * m)
+        file.seek(0, 2)
+        if file.tell() < size:
+            raise CorruptedInputException('Truncated binary graph file: ' + filename)
+        mm = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ)
+
+    view = memoryview(mm)
+    bounds = (_HEADER_SIZE, _HEADER_SIZE + 8 * (n + 1), _HEADER_SIZE + 8 * (n + 1 + m), size)
+    codes = ('q', 'q', 'd' if flags & FLOAT_WEIGHTS else 'q')
+    arrays = []
+    for (i, code) in enumerate(codes):
+        part = view[bounds[i]:bounds[i + 1]]
+        if sys.byteorder != 'little':
+            part = array(code, part.tobytes())
+            part.byteswap()
+        else:
+            part = part.cast(code)
+        arrays.append(part)
+
+    return {'offsets': arrays[0], 'targets': arrays[1], 'weights': arrays[2], 'numOfEdges': numOfEdges,
+            'weighted': bool(flags & WEIGHTED), 'directed': bool(flags & DIRECTED)}
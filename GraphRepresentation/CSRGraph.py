@@ -0,0 +1,291 @@
+from array import array
+from itertools import accumulate
+
+from GraphRepresentation import BinaryFormat
+from GraphRepresentation.Graph import Graph
+from GraphRepresentation.GraphLoader import CorruptedInputException, EdgeReader
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _typecode(weights):
+    """Pick the array typecode for a sequence of costs: 'q' if they are all ints, 'd' otherwise."""
+    if isinstance(weights, array):
+        return weights.typecode if weights.typecode in ('q', 'd') else 'd'
+    if isinstance(weights, memoryview):
+        return weights.format if weights.format in ('q', 'd') else 'd'
+    return 'q' if all(isinstance(c, int) for c in weights) else 'd'
+
+
+def _from_numpy(typecode, arr):
+    """Copy a numpy array into an array.array of the given typecode."""
+    res = array(typecode)
+    res.frombytes(arr.astype('<i8' if typecode == 'q' else '<f8').tobytes())
+    return res
+
+
+class CSRGraph:
+    """A compact, array-backed graph in compressed sparse row (CSR) layout.
+        The vertices are the integers 0 .. numOfNodes-1. The out-neighbours of u are
+        targets[offsets[u]:offsets[u+1]], with the matching costs in weights.
+        An undirected graph stores every edge in the rows of both of its endpoints.
+        The reverse CSR (the in-neighbours of every vertex) is built on demand.
+        The graph is read-only once built, so its version is always 0;
+        use Graph for incremental construction.
+        The arrays are array.array objects, or memoryviews over a memory-mapped
+        binary graph file (see open and save).
+    """
+
+    def __init__(self, offsets, targets, weights, weighted=True, directed=True, numOfEdges=None, contents=None):
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.weighted = weighted
+        self.directed = directed
+        self.numOfNodes = len(offsets) - 1
+        if numOfEdges is None:
+            numOfEdges = len(targets)
+        self.numOfEdges = numOfEdges
+        self.contents = contents
+        self.version = 0
+        self.rev_offsets = None
+        self.rev_sources = None
+        self.rev_weights = None
+
+    @staticmethod
+    def from_edges(n, edges, weighted=True, directed=True, contents=None):
+        """
+        Build a CSR graph from an iterable of edges.
+        :param n: The number of vertices.
+        :param edges: An iterable of (source, destination, cost) tuples of vertex ids.
+        :return: A new CSRGraph.
+        """
+        edges = list(edges)
+        src = array('q', (e[0] for e in edges))
+        dst = array('q', (e[1] for e in edges))
+        if weighted:
+            costs = [e[2] for e in edges]
+            w = array(_typecode(costs), costs)
+        else:
+            w = array('q', [1]) * len(edges)
+        return CSRGraph.from_arrays(n, src, dst, w, weighted=weighted, directed=directed, contents=contents)
+
+    @staticmethod
+    def from_arrays(n, src, dst, w, weighted=True, directed=True, contents=None):
+        """
+        Build a CSR graph in one bulk step from three parallel edge arrays.
+        :param n: The number of vertices.
+        :param src: The source vertex of every edge.
+        :param dst: The destination vertex of every edge.
+        :param w: The cost of every edge.
+        :return: A new CSRGraph.
+        """
+        m = len(src)
+        if len(dst) != m or len(w) != m:
+            raise CorruptedInputException('Edge arrays must have the same length.')
+        typecode = _typecode(w)
+        out_of_range = CorruptedInputException('Vertex id out of range for a graph with ' + str(n) + ' nodes.')
+
+        if np is not None:
+            s = np.asarray(src, dtype=np.int64)
+            t = np.asarray(dst, dtype=np.int64)
+            c = np.asarray(w, dtype=np.int64 if typecode == 'q' else np.float64)
+            if m and (min(s.min(), t.min()) < 0 or max(s.max(), t.max()) >= n):
+                raise out_of_range
+            if not directed:
+                back = s != t
+                s, t, c = np.concatenate((s, t[back])), np.concatenate((t, s[back])), np.concatenate((c, c[back]))
+            order = np.argsort(s, kind='stable')
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(s, minlength=n), out=offsets[1:])
+            return CSRGraph(_from_numpy('q', offsets), _from_numpy('q', t[order]), _from_numpy(typecode, c[order]),
+                            weighted=weighted, directed=directed, numOfEdges=m, contents=contents)
+
+        if m and (min(src) < 0 or min(dst) < 0 or max(src) >= n or max(dst) >= n):
+            raise out_of_range
+
+        # counting sort on the source vertex
+        counts = [0] * (n + 1)
+        for u in src:
+            counts[u + 1] += 1
+        if not directed:
+            for (u, v) in zip(src, dst):
+                if u != v:
+                    counts[v + 1] += 1
+        offsets = array('q', accumulate(counts))
+        total = offsets[-1]
+
+        pos = list(offsets[:-1])
+        targets = array('q', [0]) * total
+        weights = array(typecode, [0]) * total
+        for (u, v, c) in zip(src, dst, w):
+            targets[pos[u]] = v
+            weights[pos[u]] = c
+            pos[u] += 1
+            if not directed and u != v:
+                targets[pos[v]] = u
+                weights[pos[v]] = c
+                pos[v] += 1
+        return CSRGraph(offsets, targets, weights, weighted=weighted, directed=directed,
+                        numOfEdges=m, contents=contents)
+
+    @staticmethod
+    def from_file(filename, weighted=True, directed=True, **kwargs):
+        """
+        Load a CSR graph straight from an edge file, without creating any per-node objects.
+        :param filename: A txt/in, csv or tsv file, optionally gzipped (see EdgeReader),
+                         or a binary graph file, which is opened with CSRGraph.open.
+        :param kwargs: Passed on to EdgeReader.
+        :return: A new CSRGraph.
+        """
+        if BinaryFormat.is_binary(filename):
+            return CSRGraph.open(filename)
+        n, src, dst, w = EdgeReader(filename, weighted=weighted, **kwargs).read()
+        return CSRGraph.from_arrays(n, src, dst, w, weighted=weighted, directed=directed)
+
+    @staticmethod
+    def open(filename):
+        """
+        Open a binary graph file written by save. The file is memory-mapped and the
+        arrays of the graph are views over the map, so nothing is parsed or copied,
+        and processes opening the same file share one copy of it in the page cache.
+        :param filename: The file, by convention with the extension .gbin.
+        :return: A new CSRGraph.
+        """
+        data = BinaryFormat.read_csr(filename)
+        return CSRGraph(data['offsets'], data['targets'], data['weights'], weighted=data['weighted'],
+                        directed=data['directed'], numOfEdges=data['numOfEdges'])
+
+    def save(self, filename):
+        """
+        Write the graph to a binary graph file, to be reopened with CSRGraph.open
+        or Graph(source=filename). Node contents are not saved.
+        :param filename: The file, by convention with the extension .gbin.
+        """
+        BinaryFormat.write_csr(filename, self.offsets, self.targets, self.weights, self.numOfEdges,
+                               weighted=self.weighted, directed=self.directed)
+
+    @staticmethod
+    def from_graph(g: Graph):
+        """
+        Convert an object-per-node Graph into a CSR graph.
+        The k-th node of g becomes vertex k.
+        :param g: The graph to convert (a Graph, or a view from GraphViews).
+        :return: A new CSRGraph.
+        """
+        index = g.index
+        contents = [getattr(node, 'content', None) for node in g.nodes]
+        if all(c is None for c in contents):
+            contents = None
+        return CSRGraph.from_edges(len(g.nodes),
+                                   ((index(u), index(v), c) for ((u, v), c) in g.edges),
+                                   weighted=g.weighted, directed=g.directed, contents=contents)
+
+    def to_graph(self):
+        """
+        Convert this graph back into an object-per-node Graph.
+        Vertex k becomes the k-th node of the new graph.
+        :return: A new Graph.
+        """
+        src, dst, w = array('q'), array('q'), array(_typecode(self.weights))
+        for ((u, v), c) in self.edges:
+            src.append(u)
+            dst.append(v)
+            w.append(c)
+        g = Graph.from_arrays(self.numOfNodes, src, dst, w, weighted=self.weighted, directed=self.directed)
+        if self.contents is not None:
+            for (node, content) in zip(g.nodes, self.contents):
+                node.content = content
+        return g
+
+    @property
+    def nodes(self):
+        return range(self.numOfNodes)
+
+    @property
+    def edges(self):
+        """
+        Iterate through the edges as ((source, destination), cost) tuples, like Graph.edges.
+        Each edge of an undirected graph is listed once.
+        """
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        for u in range(self.numOfNodes):
+            for i in range(offsets[u], offsets[u + 1]):
+                v = targets[i]
+                if self.directed or u <= v:
+                    yield ((u, v), weights[i])
+
+    def neighbours(self, u):
+        """Iterate through the (neighbour, cost) pairs of the out-edges of u."""
+        a, b = self.offsets[u], self.offsets[u + 1]
+        return zip(self.targets[a:b], self.weights[a:b])
+
+    def in_neighbours(self, v):
+        """Iterate through the (neighbour, cost) pairs of the in-edges of v."""
+        if not self.directed:
+            return self.neighbours(v)
+        if self.rev_offsets is None:
+            self.build_reverse()
+        a, b = self.rev_offsets[v], self.rev_offsets[v + 1]
+        return zip(self.rev_sources[a:b], self.rev_weights[a:b])
+
+    def integer_weight_bound(self):
+        """
+        :return: The largest edge cost if all costs are non-negative integers, None otherwise.
+        """
+        if _typecode(self.weights) != 'q':
+            return None
+        if not len(self.weights):
+            return 0
+        return max(self.weights) if min(self.weights) >= 0 else None
+
+    def degree(self, u):
+        return self.offsets[u + 1] - self.offsets[u]
+
+    def build_reverse(self):
+        """
+        Build the reverse CSR arrays (rev_offsets, rev_sources, rev_weights)
+        holding the in-edges of every vertex. Undirected graphs share the forward arrays.
+        :return: Itself.
+        """
+        if not self.directed:
+            self.rev_offsets, self.rev_sources, self.rev_weights = self.offsets, self.targets, self.weights
+            return self
+        rev = self.reversed()
+        self.rev_offsets, self.rev_sources, self.rev_weights = rev.offsets, rev.targets, rev.weights
+        return self
+
+    def reversed(self):
+        """
+        :return: A new CSRGraph with the direction of every edge flipped.
+        """
+        if not self.directed:
+            return self
+        src = array('q')
+        for u in range(self.numOfNodes):
+            src.extend([u] * (self.offsets[u + 1] - self.offsets[u]))
+        return CSRGraph.from_arrays(self.numOfNodes, self.targets, src, self.weights,
+                                    weighted=self.weighted, directed=True, contents=self.contents)
+
+    def reweighted(self, potential):
+        """
+        Create a graph with the same structure in which the cost of every edge (u, v)
+        becomes cost + potential[u] - potential[v], as in Johnson's algorithm.
+        :param potential: A sequence indexed by vertex id.
+        :return: A new CSRGraph.
+        """
+        costs = [0] * len(self.targets)
+        targets, weights = self.targets, self.weights
+        for u in range(self.numOfNodes):
+            pu = potential[u]
+            for i in range(self.offsets[u], self.offsets[u + 1]):
+                costs[i] = weights[i] + pu - potential[targets[i]]
+        return CSRGraph(self.offsets, self.targets, array(_typecode(costs), costs),
+                        weighted=self.weighted, directed=self.directed,
+                        numOfEdges=self.numOfEdges, contents=self.contents)
+
+    def __str__(self):
+        return '<CSRGraph: ' + str(self.numOfNodes) + ' nodes, ' + str(self.numOfEdges) + ' edges/>'
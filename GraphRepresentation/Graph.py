@@ -1,38 +1,59 @@
+import gc
+from array import array
+
+from GraphRepresentation import BinaryFormat
+from GraphRepresentation.GraphLoader import CorruptedInputException, EdgeReader, detect_format
 from GraphRepresentation.GraphNode import GraphNode
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-class CorruptedInputException(Exception):
-    """This exception is raised when the input for the graph is incorrect."""
+try:
+    import scipy.sparse as scipy_sparse
+except ImportError:
+    scipy_sparse = None
 
 
 class Graph:
     """The base class to hold a graph.
         The graph is represented by a list of GraphNode objects and a list of edges.
         The edges are tuples of type ((source, destination), cost)
+        The version counter goes up with every change, so that anything computed
+        from the graph can tell whether it is still current, and the callbacks
+        registered with subscribe are told about every change as it happens.
         Supported operations:
-            - reading from file
-            TODO: adding a node
-                  adding an edge
+            - reading from file (txt/in, csv and tsv, optionally gzipped, or binary .gbin)
+            - saving to a binary file
+            - adding a node
+            - adding an edge
+            - changing the cost of an edge, or removing it
+            - exporting the adjacency matrix: sparse (COO/CSR arrays, scipy.sparse),
+              dense (NumPy) or as text, cached until the graph changes
     """
 
     def __init__(self, weighted=True, directed=True, **kwargs):
         self.nodes = []
         self.edges = []
+        self.__index = dict()
+        self.__reverse = None
+        self.__matrices = dict()
+        self.__listeners = []
         self.numOfNodes = 0
         self.numOfEdges = 0
+        self.version = 0
         self.weighted = weighted
         self.directed = directed
 
         if 'source' in kwargs:
             source = kwargs['source']
-            extension = source.split('.')[-1]
-
-            if extension in ['txt', 'in']:
+            if BinaryFormat.is_binary(source):
+                self.__read_binary(source)
+            elif detect_format(source)[0] == 'txt':
                 self.__read_from_file(source)
-            elif extension == 'csv':
-                raise NotImplementedError('CSV reading not yet implemented.')
             else:
-                raise CorruptedInputException('Unrecognised file format!')
+                self.__read_csv(source)
 
     def __read_from_file(self, filename):
         """This function reads a graph from a file.
@@ -44,58 +65,83 @@ class Graph:
                 source, destination(, cost if weighted)
             This will generate a graph with n nodes, and add each edge both to the
             neighbours list of the source (and dest), as well as to the list of all edges.
+            The file is parsed in bulk by an EdgeReader; costs may be floats.
         """
+        n, src, dst, w = EdgeReader(filename, weighted=self.weighted, fmt='txt').read()
+        self.__build(n, src, dst, w)
 
-        file = open(filename)
-        line = file.readline()
-        self.numOfNodes = int(line.strip())
-
-        # create all the new nodes
-        for i in range(self.numOfNodes):
-            self.nodes.append(GraphNode())
-
-        line = file.readline()
-        self.numOfEdges = int(line.strip())
-
-        if self.weighted: linelength = 3
-        else: linelength = 2
-
-        for line in file:
-            att = line.split(',')
+    def __read_csv(self, filename):
+        """Read a graph from a csv or tsv file of 'source, destination(, cost)' lines,
+            with an optional header line. The number of nodes is the largest id plus one.
+        """
+        n, src, dst, w = EdgeReader(filename, weighted=self.weighted).read()
+        self.__build(n, src, dst, w)
 
-            if len(att) != linelength:
-                raise CorruptedInputException("Number of items on a line must be "
-                                              + str(linelength)
-                                              + " not "
-                                              + str(len(att)))
+    def __read_binary(self, filename):
+        """Read a graph from a binary graph file. Its weighted/directed flags override the arguments."""
+        from GraphRepresentation.CSRGraph import CSRGraph
+        csr = CSRGraph.open(filename)
+        self.weighted, self.directed = csr.weighted, csr.directed
+        src, dst, w = [], [], []
+        for ((u, v), c) in csr.edges:
+            src.append(u)
+            dst.append(v)
+            w.append(c)
+        self.__build(csr.numOfNodes, src, dst, w)
 
-            source_node = self.nodes[int(att[0].strip())]
-            dest_node = self.nodes[int(att[1].strip())]
-            if self.weighted:
-                cost = int(att[2].strip())
-            else:
-                cost = 1
+    def save(self, filename):
+        """
+        Write the graph to a binary graph file, to be reopened with Graph(source=filename)
+        or, without copying, with CSRGraph.open(filename). Node contents are not saved.
+        :param filename: The file, by convention with the extension .gbin.
+        """
+        from GraphRepresentation.CSRGraph import CSRGraph
+        CSRGraph.from_graph(self).save(filename)
 
-            self.edges.append(((source_node, dest_node), cost))
-            source_node.neighbours.append((dest_node, cost))
+    def __build(self, n, src, dst, w):
+        """Add n new nodes and the edges given as three parallel sequences of ids and costs, in one go."""
+        # the cyclic garbage collector would otherwise rescan the millions of new tuples repeatedly
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            base = len(self.nodes)
+            self.nodes.extend(GraphNode() for i in range(n))
+            nodes = self.nodes[base:]
+            self.__index.update(zip(nodes, range(base, base + n)))
+            edges = [((nodes[u], nodes[v]), c) for (u, v, c) in zip(src, dst, w)]
+            for ((u, v), c) in edges:
+                u.neighbours.append((v, c))
             if not self.directed:
-                dest_node.neighbours.append((source_node, cost))
-
-        file.close()
-        if len(self.edges) != self.numOfEdges:
-            raise CorruptedInputException("Declared and true number of edges differ: "
-                                          + str(self.numOfEdges)
-                                          + " "
-                                          + str(len(self.edges)))
+                for ((u, v), c) in edges:
+                    v.neighbours.append((u, c))
+            self.edges.extend(edges)
+            self.numOfNodes += n
+            self.numOfEdges += len(edges)
+            self.__changed('build', nodes, edges)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
 
-    def __read_csv(self):
-        raise NotImplementedError('Reading from CSV not yet available.')
-        # TODO: make this
+    @staticmethod
+    def from_arrays(n, src, dst, w, weighted=True, directed=True):
+        """
+        Build a graph in one bulk step from three parallel edge sequences.
+        :param n: The number of nodes.
+        :param src: The source id (0 .. n-1) of every edge.
+        :param dst: The destination id of every edge.
+        :param w: The cost of every edge.
+        :return: A new Graph.
+        """
+        g = Graph(weighted=weighted, directed=directed)
+        g.__build(n, src, dst, w)
+        return g
 
     def add_node(self, content=None):
         self.numOfNodes += 1
         node = GraphNode(content=content)
+        self.__index[node] = len(self.nodes)
         self.nodes.append(node)
+        self.__changed('add_node', node)
         return node
 
     def add_edge(self, u, v, *args):
@@ -109,16 +155,110 @@ class Graph:
         u.neighbours.append((v, cost))
         if not self.directed:
             v.neighbours.append((u, cost))
+        self.__changed('add_edge', u, v, cost)
+
+    def update_edge(self, u, v, cost):
+        """
+        Change the cost of the edge (u, v); of the first one, if there are parallel edges.
+        An undirected edge keeps the orientation it is stored with.
+        :return: The old cost.
+        """
+        i = self.__find_edge(u, v)
+        ends, old = self.edges[i]
+        self.edges[i] = (ends, cost)
+        self.__replace_neighbour(u, v, old, (v, cost))
+        if not self.directed:
+            self.__replace_neighbour(v, u, old, (u, cost))
+        self.__changed('update_edge', u, v, old, cost)
+        return old
+
+    def remove_edge(self, u, v):
+        """
+        Remove the edge (u, v); the first one, if there are parallel edges.
+        :return: Its cost.
+        """
+        i = self.__find_edge(u, v)
+        cost = self.edges.pop(i)[1]
+        self.numOfEdges -= 1
+        self.__replace_neighbour(u, v, cost)
+        if not self.directed:
+            self.__replace_neighbour(v, u, cost)
+        self.__changed('remove_edge', u, v, cost)
+        return cost
+
+    def __find_edge(self, u, v):
+        for (i, ((a, b), c)) in enumerate(self.edges):
+            if (a is u and b is v) or (not self.directed and a is v and b is u):
+                return i
+        raise KeyError('No edge from ' + str(u) + ' to ' + str(v))
+
+    @staticmethod
+    def __replace_neighbour(u, v, cost, new=None):
+        """Replace (v, cost) in the neighbours of u by new, or remove it."""
+        for (i, (w, c)) in enumerate(u.neighbours):
+            if w is v and c == cost:
+                if new is None:
+                    del u.neighbours[i]
+                else:
+                    u.neighbours[i] = new
+                return
+
+    def subscribe(self, callback):
+        """
+        Register a callback to be told about every change to the graph, as callback(event, *args):
+            - ('add_node', node)
+            - ('add_edge', u, v, cost)
+            - ('update_edge', u, v, old cost, new cost)
+            - ('remove_edge', u, v, cost)
+            - ('make_undirected',)
+            - ('build', new nodes, new edges) after a bulk load
+        """
+        self.__listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self.__listeners.remove(callback)
+
+    def __changed(self, event, *args):
+        self.version += 1
+        self.__reverse = None
+        self.__matrices.clear()
+        for callback in list(self.__listeners):
+            callback(event, *args)
+
+    def index(self, node):
+        """The position of a node in the nodes list, in O(1)."""
+        return self.__index[node]
+
+    def neighbours(self, u):
+        """The list of (neighbour, cost) pairs of the out-edges of u."""
+        return u.neighbours
+
+    def in_neighbours(self, v):
+        """The list of (neighbour, cost) pairs of the in-edges of v.
+            The reverse adjacency is built on the first call and dropped when the graph changes.
+        """
+        if not self.directed:
+            return v.neighbours
+        if self.__reverse is None:
+            reverse = {u: [] for u in self.nodes}
+            for ((u, w), c) in self.edges:
+                reverse[w].append((u, c))
+            self.__reverse = reverse
+        return self.__reverse[v]
 
     def make_undirected(self):
         """
         Make a directed graph into an undirected one by inversing
-        the one-directional edges.
+        the one-directional edges. An undirected graph is left as it is.
+        To traverse a graph as undirected without changing it, use GraphViews.UndirectedView.
         :return: Itself. The graph is modified in place.
         """
+        if not self.directed:
+            return self
         for ((u, v), c) in self.edges:
             v.neighbours.append((u, c))
         self.directed = False
+        self.__changed('make_undirected')
         return self
 
     def isomorph(self, g, node):
@@ -132,19 +272,184 @@ class Graph:
         """
         if node is None:
             return None
-        respective_number = self.nodes.index(node)
+        respective_number = self.index(node)
         return g.nodes[respective_number]
 
-    @property
-    def adjacency(self):
-        adj = [[0 for x in range(self.numOfNodes)] for y in range(self.numOfNodes)]
-        b = self.nodes[0].id
+    def __cached(self, key, make):
+        """The matrix export key, made by make() if the graph changed since it was last asked for."""
+        if key not in self.__matrices:
+            self.__matrices[key] = make()
+        return self.__matrices[key]
+
+    def coo(self):
+        """
+        The adjacency matrix in coordinate (COO) form: entry k is costs[k] at (rows[k], columns[k]),
+        rows and columns being node positions. An undirected edge gives both of its entries.
+        Parallel edges give one entry each; where a single value is needed, the last one counts.
+        The arrays are cached until the graph changes, and must not be modified.
+        :return: A tuple (rows, columns, costs) of arrays of typecode 'q' ('d' for float costs).
+        """
+        return self.__cached('coo', self.__make_coo)
+
+    def __make_coo(self):
+        rows, cols, edge_ids = self.__entries()
+        costs = [self.edges[k][1] for k in edge_ids]
+        typecode = 'q' if all(isinstance(c, int) for c in costs) else 'd'
+        return rows, cols, array(typecode, costs)
+
+    def __entries(self):
+        """The entries of the adjacency matrix, in edge order, as arrays (rows, columns, edge numbers)."""
+        return self.__cached('entries', self.__make_entries)
+
+    def __make_entries(self):
+        index = self.__index
+        rows, cols, edge_ids = array('q'), array('q'), array('q')
+        for (k, ((u, v), c)) in enumerate(self.edges):
+            i, j = index[u], index[v]
+            rows.append(i)
+            cols.append(j)
+            edge_ids.append(k)
+            if not self.directed and i != j:
+                rows.append(j)
+                cols.append(i)
+                edge_ids.append(k)
+        return rows, cols, edge_ids
+
+    def __rows(self):
+        """The entries sorted by row, keeping their order within a row: arrays (offsets, entry numbers)."""
+        return self.__cached('rows', self.__make_rows)
+
+    def __make_rows(self):
+        rows = self.__entries()[0]
+        n = self.numOfNodes
+        if np is not None and len(rows):
+            r = np.frombuffer(rows, dtype=np.int64)
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(r, minlength=n), out=offsets[1:])
+            return array('q', offsets.tobytes()), array('q', np.argsort(r, kind='stable').astype(np.int64).tobytes())
+
+        # counting sort on the row
+        offsets = array('q', [0]) * (n + 1)
+        for i in rows:
+            offsets[i + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        pos = offsets[:-1]
+        order = array('q', [0]) * len(rows)
+        for (k, i) in enumerate(rows):
+            order[pos[i]] = k
+            pos[i] += 1
+        return offsets, order
+
+    def csr(self):
+        """
+        The adjacency matrix in compressed sparse row (CSR) form: row i holds the entries
+        columns[offsets[i]:offsets[i+1]] and costs[offsets[i]:offsets[i+1]], in the order of coo.
+        The arrays are cached until the graph changes, and must not be modified.
+        :return: A tuple (offsets, columns, costs) of arrays of typecode 'q' ('d' for float costs).
+        """
+        return self.__cached('csr', self.__make_csr)
+
+    def __make_csr(self):
+        rows, cols, costs = self.coo()
+        offsets, order = self.__rows()
+        if np is not None and len(order):
+            order = np.frombuffer(order, dtype=np.int64)
+            dtype = np.int64 if costs.typecode == 'q' else np.float64
+            return (offsets, array('q', np.frombuffer(cols, dtype=np.int64)[order].tobytes()),
+                    array(costs.typecode, np.frombuffer(costs, dtype=dtype)[order].tobytes()))
+        return offsets, array('q', (cols[k] for k in order)), array(costs.typecode, (costs[k] for k in order))
+
+    def sparse(self, format='csr'):
+        """
+        The adjacency matrix as a scipy.sparse matrix, cached until the graph changes.
+        Parallel edges are added up, as scipy does with duplicate entries.
+        :param format: 'csr' or 'coo'.
+        :return: A scipy.sparse.csr_matrix or coo_matrix of shape (numOfNodes, numOfNodes).
+        """
+        if scipy_sparse is None:
+            raise ImportError('scipy is needed for scipy.sparse matrices; use coo or csr instead.')
+        if format not in ('csr', 'coo'):
+            raise ValueError('Unknown sparse format: ' + str(format))
+        return self.__cached(('sparse', format), lambda: self.__make_sparse(format))
+
+    def __make_sparse(self, format):
+        shape = (self.numOfNodes, self.numOfNodes)
+        if format == 'coo':
+            rows, cols, costs = (np.asarray(a) for a in self.coo())
+            return scipy_sparse.coo_matrix((costs, (rows, cols)), shape=shape)
+        offsets, cols, costs = (np.asarray(a) for a in self.csr())
+        return scipy_sparse.csr_matrix((costs, cols, offsets), shape=shape)
+
+    def dense(self, fill=0):
+        """
+        The dense adjacency matrix, cached until the graph changes (for each fill value).
+        Where there are parallel edges, the last one counts, as in adjacency.
+        Entry (i, j) is the cost of the edge from the i-th to the j-th node, or fill if there is none.
+        :param fill: The value of the missing edges, e.g. 0 or math.inf.
+        :return: A NumPy array if NumPy is available (which must not be modified), a list of lists otherwise.
+        """
+        # NaN is not equal to itself, so it would never find its cached matrix; 0 and 0.0 give different ones
+        key = ('dense', type(fill), 'nan' if fill != fill else fill)
+        return self.__cached(key, lambda: self.__make_dense(fill))
+
+    def __make_dense(self, fill):
+        if np is None:
+            return self.__make_lists(fill)
+        n = self.numOfNodes
+        rows, cols, costs = self.coo()
+        dtype = np.int64 if costs.typecode == 'q' and isinstance(fill, int) else np.float64
+        mat = np.full((n, n), fill, dtype=dtype)
+        if len(rows):
+            mat[np.frombuffer(rows, dtype=np.int64), np.frombuffer(cols, dtype=np.int64)] = np.asarray(costs)
+        return mat
+
+    def __make_lists(self, fill):
+        n = self.numOfNodes
+        index = self.__index
+        adj = [[fill] * n for i in range(n)]
         for ((u, v), c) in self.edges:
-            adj[u.id-b][v.id-b] = c
+            adj[index[u]][index[v]] = c
             if not self.directed:
-                adj[v.id-b][u.id-b] = c
+                adj[index[v]][index[u]] = c
         return adj
 
+    @property
+    def adjacency(self):
+        """
+        The adjacency matrix as a list of lists, indexed by node position, with 0 for the
+        missing edges. Cached until the graph changes: it must not be modified.
+        """
+        return self.__cached('adjacency', lambda: self.__make_lists(0))
+
+    def matrix_lines(self, fill=0, width=3):
+        """
+        Iterate through the lines of the adjacency matrix as text, one row at a time,
+        without building the matrix. The entries are those of adjacency, with the costs
+        printed as they are held in the edges.
+        :param fill: The value of the missing edges.
+        :param width: The minimum width of every entry.
+        :return: A generator of strings, each a row ending with a newline.
+        """
+        rows, cols, edge_ids = self.__entries()
+        offsets, order = self.__rows()
+        edges = self.edges
+        entry = '{:' + str(width) + '}'
+        blank = entry.format(str(fill))
+        for i in range(self.numOfNodes):
+            row = [blank] * self.numOfNodes
+            for k in order[offsets[i]:offsets[i + 1]]:
+                row[cols[k]] = entry.format(str(edges[edge_ids[k]][1]))
+            row.append('\n')
+            yield ''.join(row)
+
+    def write_matrix(self, file, fill=0, width=3):
+        """
+        Write the adjacency matrix as text, one row at a time (see matrix_lines).
+        :param file: A file object open for writing text.
+        """
+        file.writelines(self.matrix_lines(fill, width))
+
     def __copy__(self):
         """
         Creates a new graph with new node and edge objects
@@ -159,11 +464,4 @@ class Graph:
         return copy
 
     def __str__(self):
-        adj = self.adjacency
-        s = ""
-        for row in adj:
-            for c in row:
-                s += "{:3}".format(str(c))
-            s += "\n"
-
-        return s
+        return ''.join(self.matrix_lines())
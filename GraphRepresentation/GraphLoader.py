@@ -0,0 +1,263 @@
+import gzip
+import mmap
+import warnings
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class CorruptedInputException(Exception):
+    """This exception is raised when the input for the graph is incorrect."""
+
+
+# The extensions understood by EdgeReader, and the text format each one holds
+FORMATS = {'txt': 'txt', 'in': 'txt', 'csv': 'csv', 'tsv': 'tsv'}
+
+# How many bytes of the file are parsed at once
+CHUNK_SIZE = 1 << 24
+
+
+def detect_format(filename):
+    """
+    :return: A tuple (format, compressed) for a file name, e.g. ('csv', True) for 'edges.csv.gz'.
+    """
+    parts = filename.split('.')
+    compressed = parts[-1] == 'gz'
+    if compressed:
+        parts = parts[:-1]
+    if len(parts) < 2 or parts[-1] not in FORMATS:
+        raise CorruptedInputException('Unrecognised file format!')
+    return FORMATS[parts[-1]], compressed
+
+
+class EdgeReader:
+    """Reads the edges of a graph from a text file in large chunks.
+        Plain files are memory-mapped, gzip files are decompressed as a stream.
+        Each chunk is split into tokens in one go and converted into three
+        parallel arrays (sources, destinations, costs), so no per-edge Python
+        objects are created. Costs are integers unless some cost in the file
+        is not, in which case they are all floats.
+        Supported formats:
+            - txt/in: the number of nodes on the first line, the number of edges on
+              the second, then one 'source, destination(, cost)' line per edge
+            - csv/tsv: one comma/tab separated edge per line, with an optional header
+              line; the number of nodes is the largest id plus one
+    """
+
+    def __init__(self, filename, weighted=True, fmt=None, header=None, chunk_size=CHUNK_SIZE):
+        """
+        :param filename: The file to read, optionally ending in .gz.
+        :param weighted: Whether each line holds a cost. If not, every cost is 1.
+        :param fmt: 'txt', 'csv' or 'tsv'; detected from the extension by default.
+        :param header: Whether a csv/tsv file starts with a header line; detected from the
+                       first line by default, which is a header if it names every column.
+        :param chunk_size: The approximate number of bytes parsed at once (at least a whole line).
+        """
+        detected, self.compressed = detect_format(filename)
+        self.filename = filename
+        self.weighted = weighted
+        self.fmt = fmt or detected
+        self.header = header
+        self.chunk_size = chunk_size
+        self.linelength = 3 if weighted else 2
+        self.delimiter = b'\t' if self.fmt == 'tsv' else b','
+        self.declared_nodes = None
+        self.declared_edges = None
+
+    def read(self):
+        """
+        Read the whole file.
+        :return: A tuple (number of nodes, sources, destinations, costs), the last three being arrays.
+        """
+        src, dst, w = array('q'), array('q'), array('q')
+        for (s, d, c) in self.chunks():
+            src.extend(s)
+            dst.extend(d)
+            if c.typecode == 'd' and w.typecode == 'q':
+                w = array('d', w)
+            w.extend(c if c.typecode == w.typecode else array('d', c))
+
+        if self.declared_edges is not None and len(src) != self.declared_edges:
+            raise CorruptedInputException("Declared and true number of edges differ: "
+                                          + str(self.declared_edges)
+                                          + " "
+                                          + str(len(src)))
+        if src:
+            if np is not None:
+                lo = int(min(np.frombuffer(src, dtype=np.int64).min(), np.frombuffer(dst, dtype=np.int64).min()))
+                hi = int(max(np.frombuffer(src, dtype=np.int64).max(), np.frombuffer(dst, dtype=np.int64).max()))
+            else:
+                lo, hi = min(min(src), min(dst)), max(max(src), max(dst))
+        else:
+            lo, hi = 0, -1
+        n = self.declared_nodes
+        if n is None:
+            n = hi + 1
+        elif lo < 0 or hi >= n:
+            raise CorruptedInputException('Node id out of range for a graph with ' + str(n) + ' nodes.')
+        return n, src, dst, w
+
+    def chunks(self):
+        """
+        Iterate through the edges of the file, chunk by chunk.
+        For txt files, declared_nodes and declared_edges are set once the first chunk is read.
+        :return: A generator of (sources, destinations, costs) array triples.
+        """
+        first = True
+        pending = b''
+        for block in self.__blocks():
+            if first:
+                block = pending + block
+                if self.fmt == 'txt' and block.count(b'\n') < 2:
+                    # the header is not complete yet (chunk_size is smaller than it)
+                    pending = block
+                    continue
+                block = self.__skip_header(block)
+                first = False
+            if block.strip():
+                yield self.__parse(block)
+        if first:
+            # the file ended within its header, or is empty
+            block = self.__skip_header(pending)
+            if block.strip():
+                yield self.__parse(block)
+
+    def __blocks(self):
+        """Yield the file in blocks of whole lines."""
+        if self.compressed:
+            with gzip.open(self.filename, 'rb') as file:
+                rest = b''
+                while True:
+                    data = file.read(self.chunk_size)
+                    if not data:
+                        break
+                    data = rest + data
+                    cut = data.rfind(b'\n') + 1
+                    rest = data[cut:]
+                    if cut:
+                        yield data[:cut]
+                if rest:
+                    yield rest
+            return
+
+        with open(self.filename, 'rb') as file:
+            try:
+                mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # an empty file cannot be mapped
+                return
+            with mm:
+                pos, size = 0, len(mm)
+                while pos < size:
+                    end = min(pos + self.chunk_size, size)
+                    if end < size:
+                        cut = mm.rfind(b'\n', pos, end)
+                        end = cut + 1 if cut >= 0 else (mm.find(b'\n', end) + 1 or size)
+                    yield mm[pos:end]
+                    pos = end
+
+    def __skip_header(self, block):
+        """Consume the header lines at the start of the first block."""
+        if self.fmt == 'txt':
+            lines = block.split(b'\n', 2)
+            if len(lines) < 2:
+                raise CorruptedInputException('The number of nodes and edges must be on the first two lines.')
+            try:
+                self.declared_nodes = int(lines[0].strip())
+                self.declared_edges = int(lines[1].strip())
+            except ValueError:
+                raise CorruptedInputException('The number of nodes and edges must be on the first two lines.')
+            return lines[2] if len(lines) > 2 else b''
+
+        first, nl, rest = block.partition(b'\n')
+        header = self.header
+        if header is None:
+            header = self.__is_header(first)
+        return rest if header else block
+
+    def __is_header(self, line):
+        """Whether a first line is a header: a name for every column, none of them a number.
+            Any other line is taken for data, and checked as such.
+        """
+        names = [name.strip() for name in line.split(self.delimiter)]
+        if len(names) != self.linelength:
+            return False
+        for name in names:
+            if not name:
+                return False
+            try:
+                float(name)
+                return False
+            except ValueError:
+                pass
+        return True
+
+    def __parse(self, block):
+        k = self.linelength
+        if np is not None:
+            parsed = self.__parse_numpy(block)
+            if parsed is not None:
+                return parsed
+
+        tokens = block.replace(self.delimiter, b' ').split()
+        lines = block.count(b'\n') + (not block.endswith(b'\n'))
+        if len(tokens) != lines * k or (self.fmt != 'tsv' and block.count(self.delimiter) != lines * (k - 1)):
+            self.__check_lines(block)
+
+        try:
+            src = array('q', map(int, tokens[0::k]))
+            dst = array('q', map(int, tokens[1::k]))
+        except ValueError:
+            raise CorruptedInputException('Node ids must be integers.')
+        if not self.weighted:
+            return src, dst, array('q', [1]) * len(src)
+        try:
+            return src, dst, array('q', map(int, tokens[2::k]))
+        except ValueError:
+            try:
+                return src, dst, array('d', map(float, tokens[2::k]))
+            except ValueError:
+                raise CorruptedInputException('Costs must be numbers.')
+
+    def __parse_numpy(self, block):
+        """The vectorized parser. Returns None if the block is not a clean table of numbers,
+            leaving the error reporting (or the blank lines) to the pure-Python parser.
+        """
+        k = self.linelength
+        lines = block.count(b'\n') + (not block.endswith(b'\n'))
+        if self.fmt != 'tsv' and block.count(self.delimiter) != lines * (k - 1):
+            return None
+        text = block.replace(self.delimiter, b' ')
+        floats = self.weighted and (b'.' in text or b'e' in text or b'E' in text)
+        with warnings.catch_warnings():
+            # older numpy versions only warn about text they cannot parse; we check the count
+            warnings.simplefilter('ignore', DeprecationWarning)
+            try:
+                values = np.fromstring(text, dtype=np.float64 if floats else np.int64, sep=' ')
+            except ValueError:
+                return None
+        if len(values) != lines * k:
+            return None
+        rows = values.reshape(-1, k)
+        if floats and np.any(rows[:, :2] != np.floor(rows[:, :2])):
+            return None
+        src = array('q', rows[:, 0].astype(np.int64).tobytes())
+        dst = array('q', rows[:, 1].astype(np.int64).tobytes())
+        if not self.weighted:
+            return src, dst, array('q', [1]) * len(src)
+        return src, dst, array('d' if floats else 'q', rows[:, 2].tobytes())
+
+    def __check_lines(self, block):
+        """The slow path: find the line with the wrong number of items, ignoring blank lines."""
+        for line in block.split(b'\n'):
+            att = line.replace(self.delimiter, b' ').split()
+            if self.fmt != 'tsv' and len(att) == self.linelength:
+                att = line.split(self.delimiter)
+            if line.strip() and len(att) != self.linelength:
+                raise CorruptedInputException("Number of items on a line must be "
+                                              + str(self.linelength)
+                                              + " not "
+                                              + str(len(att)))
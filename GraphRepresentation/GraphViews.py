@@ -0,0 +1,174 @@
+import itertools
+
+
+class GraphView:
+    """A read-only view of a graph (a Graph, a CSRGraph or another view), which the
+        algorithms of GraphAlgorithms can traverse like a graph. Nothing is copied:
+        the nodes are those of the underlying graph, and the edges are worked out
+        from its own as they are visited, so the view follows its changes.
+        Subclasses change what neighbours, in_neighbours and edges give.
+    """
+
+    def __init__(self, g):
+        self.graph = g
+        self.weighted = g.weighted
+        self.directed = g.directed
+
+    @property
+    def version(self):
+        return self.graph.version
+
+    @property
+    def nodes(self):
+        return self.graph.nodes
+
+    @property
+    def numOfNodes(self):
+        return self.graph.numOfNodes
+
+    @property
+    def numOfEdges(self):
+        return self.graph.numOfEdges
+
+    @property
+    def edges(self):
+        """Iterate through the edges as ((source, destination), cost) tuples."""
+        return iter(self.graph.edges)
+
+    def index(self, node):
+        """The position of a node in the nodes list."""
+        if isinstance(self.graph.nodes, range):
+            return node
+        return self.graph.index(node)
+
+    def neighbours(self, u):
+        return self.graph.neighbours(u)
+
+    def in_neighbours(self, v):
+        return self.graph.in_neighbours(v)
+
+    def __str__(self):
+        return ('<' + type(self).__name__ + ': ' + str(self.numOfNodes) + ' nodes, '
+                + str(self.numOfEdges) + ' edges/>')
+
+
+class ReversedView(GraphView):
+    """A graph with the direction of every edge flipped."""
+
+    @property
+    def edges(self):
+        if not self.directed:
+            return iter(self.graph.edges)
+        return (((v, u), c) for ((u, v), c) in self.graph.edges)
+
+    def neighbours(self, u):
+        return self.graph.in_neighbours(u)
+
+    def in_neighbours(self, v):
+        return self.graph.neighbours(v)
+
+
+class UndirectedView(GraphView):
+    """A directed graph as an undirected one: every edge can be followed both ways.
+        The edges are listed once, as in an undirected Graph.
+    """
+
+    def __init__(self, g):
+        super().__init__(g)
+        self.directed = False
+
+    def neighbours(self, u):
+        if not self.graph.directed:
+            return self.graph.neighbours(u)
+        return itertools.chain(self.graph.neighbours(u), self.graph.in_neighbours(u))
+
+    def in_neighbours(self, v):
+        return self.neighbours(v)
+
+
+class SubgraphView(GraphView):
+    """The subgraph induced by a set of nodes: those nodes, and the edges between them.
+        The set of nodes is fixed when the view is made; the edges follow the graph.
+    """
+
+    def __init__(self, g, nodes=None, predicate=None):
+        """
+        :param g: The graph.
+        :param nodes: The nodes to keep.
+        :param predicate: Or a function telling whether to keep a node.
+        """
+        super().__init__(g)
+        if nodes is None:
+            nodes = [v for v in g.nodes if predicate(v)]
+        else:
+            member = set(nodes)
+            nodes = [v for v in g.nodes if v in member]
+        self.__nodes = nodes
+        self.__index = {v: i for (i, v) in enumerate(nodes)}
+        self.__numOfEdges = None
+        self.__version = None
+
+    @property
+    def nodes(self):
+        return self.__nodes
+
+    @property
+    def numOfNodes(self):
+        return len(self.__nodes)
+
+    @property
+    def numOfEdges(self):
+        """Counted on the first access, and again after the graph changes."""
+        if self.__version != self.graph.version:
+            self.__numOfEdges = sum(1 for e in self.edges)
+            self.__version = self.graph.version
+        return self.__numOfEdges
+
+    @property
+    def edges(self):
+        member = self.__index
+        return (((u, v), c) for ((u, v), c) in self.graph.edges if u in member and v in member)
+
+    def index(self, node):
+        return self.__index[node]
+
+    def __contains__(self, node):
+        return node in self.__index
+
+    def neighbours(self, u):
+        member = self.__index
+        return ((v, c) for (v, c) in self.graph.neighbours(u) if v in member)
+
+    def in_neighbours(self, v):
+        member = self.__index
+        return ((u, c) for (u, c) in self.graph.in_neighbours(v) if u in member)
+
+
+class ReweightedView(GraphView):
+    """A graph in which the cost of every edge (u, v) becomes cost + p(u) - p(v),
+        for a potential p, as in Johnson's algorithm. The shortest paths stay the same,
+        their lengths change by p(source) - p(destination).
+    """
+
+    def __init__(self, g, potential):
+        """
+        :param g: The graph.
+        :param potential: A function of the nodes, or a mapping/sequence indexed by them.
+        """
+        super().__init__(g)
+        self.potential = potential if callable(potential) else potential.__getitem__
+
+    @property
+    def edges(self):
+        p = self.potential
+        return (((u, v), c + p(u) - p(v)) for ((u, v), c) in self.graph.edges)
+
+    def neighbours(self, u):
+        p = self.potential
+        pu = p(u)
+        return ((v, c + pu - p(v)) for (v, c) in self.graph.neighbours(u))
+
+    def in_neighbours(self, v):
+        p = self.potential
+        pv = p(v)
+        return ((u, c + p(u) - pv) for (u, c) in self.graph.in_neighbours(v))
@@ -1 +1,4 @@
 from GraphRepresentation.Graph import Graph
+from GraphRepresentation.CSRGraph import CSRGraph
+from GraphRepresentation.GraphLoader import EdgeReader, CorruptedInputException
+from GraphRepresentation.GraphViews import GraphView, ReversedView, UndirectedView, SubgraphView, ReweightedView
@@ -0,0 +1,122 @@
+"""
+Benchmark the priority queue backends of DataStructures.QUEUES on dijkstra and prim.
+Every backend runs on the same graphs; for each run the script reports the wall time,
+the number of queue operations per second and the peak memory allocated during the run.
+
+    python QueueBenchmark.py [scale]
+
+scale (default 1) multiplies the size of the generated graphs.
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+import DataStructures
+import GraphAlgorithms
+from GraphRepresentation import Graph
+
+
+class CountingQueue:
+    """Wraps a queue and counts the push, pop and updated_key calls made on it."""
+    ops = 0
+
+    def __init__(self, factory, arr, key):
+        self.q = factory(arr, key=key)
+
+    def push(self, x):
+        CountingQueue.ops += 1
+        self.q.push(x)
+
+    def pop(self):
+        CountingQueue.ops += 1
+        return self.q.pop()
+
+    def updated_key(self, x):
+        CountingQueue.ops += 1
+        self.q.updated_key(x)
+
+    def __contains__(self, x):
+        return x in self.q
+
+    def __bool__(self):
+        return bool(self.q)
+
+
+def random_graph(n, m, directed=True, maxcost=100, seed=0):
+    r = random.Random(seed)
+    g = Graph(weighted=True, directed=directed)
+    for i in range(n):
+        g.add_node()
+    for i in range(m):
+        g.add_edge(g.nodes[r.randrange(n)], g.nodes[r.randrange(n)], r.randint(1, maxcost))
+    return g
+
+
+def grid_graph(side, directed=True, maxcost=10, seed=0):
+    r = random.Random(seed)
+    g = Graph(weighted=True, directed=directed)
+    for i in range(side * side):
+        g.add_node()
+    for i in range(side):
+        for j in range(side):
+            u = g.nodes[i * side + j]
+            if j + 1 < side:
+                g.add_edge(u, g.nodes[i * side + j + 1], r.randint(1, maxcost))
+            if i + 1 < side:
+                g.add_edge(u, g.nodes[(i + 1) * side + j], r.randint(1, maxcost))
+    return g
+
+
+def undirected(g):
+    u = Graph(weighted=g.weighted, directed=False)
+    nodemap = {v: u.add_node() for v in g.nodes}
+    for ((a, b), c) in g.edges:
+        u.add_edge(nodemap[a], nodemap[b], c)
+    return u
+
+
+def run(algorithm, g, name):
+    factory = DataStructures.queue_factory(name)
+
+    def counting(arr, key):
+        return CountingQueue(factory, arr, key)
+
+    if algorithm == 'dijkstra':
+        call = lambda: GraphAlgorithms.dijkstra(g, g.nodes[0], queue=counting)
+    else:
+        call = lambda: GraphAlgorithms.prim(g, queue=counting)
+
+    CountingQueue.ops = 0
+    start = time.perf_counter()
+    call()
+    elapsed = time.perf_counter() - start
+    ops = CountingQueue.ops
+
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, ops, peak
+
+
+def main(scale=1):
+    shapes = [
+        ('sparse', random_graph(2000 * scale, 10000 * scale, seed=1)),
+        ('dense', random_graph(200 * scale, 20000 * scale, seed=2)),
+        ('grid', grid_graph(45 * scale, seed=3)),
+    ]
+    print('{:10} {:8} {:10} {:>10} {:>12} {:>12}'.format('algorithm', 'graph', 'queue', 'time [s]', 'ops/sec', 'peak [KiB]'))
+    for algorithm in ('dijkstra', 'prim'):
+        for (shape, g) in shapes:
+            gg = g if algorithm == 'dijkstra' else undirected(g)
+            for name in DataStructures.QUEUES:
+                if algorithm == 'prim' and DataStructures.is_monotone(name):
+                    continue
+                elapsed, ops, peak = run(algorithm, gg, name)
+                print('{:10} {:8} {:10} {:10.4f} {:12.0f} {:12.1f}'.format(
+                    algorithm, shape, name, elapsed, ops / elapsed, peak / 1024))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
@@ -1,7 +1,5 @@
-import copy
-
 import GraphAlgorithms
-from GraphRepresentation import Graph
+from GraphRepresentation import Graph, CSRGraph, UndirectedView
 
 g = Graph(source="GraphRepresentation/wgraph.txt", weighted=True, directed=True)
 
@@ -17,6 +15,23 @@ print(GraphAlgorithms.dijkstra(g, g.nodes[0]))
 print('\nBellman-Ford:')
 print(GraphAlgorithms.bellman_ford(g, g.nodes[0]))
 
+print('\nBellman-Ford, queue-driven (SPFA):')
+print(GraphAlgorithms.spfa(g, g.nodes[0]))
+
+print(section)
+print('\nPoint to point, from 0 to 7:')
+for method in ('dijkstra', 'bidirectional'):
+    print(method + ': ' + str(GraphAlgorithms.shortest_path(g, g.nodes[0], g.nodes[7], method=method)))
+ch = GraphAlgorithms.contraction_hierarchy(g)
+print('contraction hierarchy ' + str(ch) + ': ' + str(ch.shortest_path(g.nodes[0], g.nodes[7])))
+alt = GraphAlgorithms.landmark_index(g, k=2, seed=0)
+print('landmarks ' + str(alt.landmarks) + ': ' + str(alt.shortest_path(g.nodes[0], g.nodes[7])))
+
+print(section)
+c = CSRGraph.from_graph(g)
+print('\nDijkstra on the CSR representation of ' + str(c) + ':')
+print(GraphAlgorithms.dijkstra(c, 0))
+
 print(section)
 print('\nAll Pairs Shortest Paths, by Johnson:')
 john = GraphAlgorithms.johnson(g)
@@ -24,13 +39,21 @@ for s in john:
     print(str(s) + ': ' + str(john[s]))
 
 print(section)
-print('\nTransitive closure by Floyd-Warshall:')
-fw = GraphAlgorithms.floyd_warshall(g)
-for (i, l) in enumerate(fw):
-    print('From ' + str(i) + ': ' + str(l))
+print('\nAll Pairs Shortest Paths, by Floyd-Warshall:')
+dist, nxt = GraphAlgorithms.floyd_warshall(g)
+for (i, l) in enumerate(dist):
+    print('From ' + str(i) + ': ' + str([float(d) for d in l]))
+print('Path from 0 to 7: ' + str(GraphAlgorithms.floyd_warshall_path(nxt, 0, 7)))
+
+print(section)
+print('\nTransitive closure:')
+closure = GraphAlgorithms.transitive_closure(g)
+print('Strongly connected components: ' + str(GraphAlgorithms.strongly_connected_components(g)))
+for u in g.nodes:
+    print('From ' + str(u) + ': ' + str(sorted(v.id for v in closure.reachable_from(u))))
 
 print(section)
-gg = copy.copy(g).make_undirected()
+gg = UndirectedView(g)
 print('\nMST by Kruskal:')
 print(GraphAlgorithms.kruskal(gg))
 
@@ -0,0 +1,75 @@
+import math
+import os
+import random
+import tempfile
+import unittest
+
+import GraphAlgorithms
+from GraphAlgorithms import ContractionHierarchy
+from GraphRepresentation import Graph
+
+
+def random_graph(n, m, rand, directed=True, costs=lambda rand: rand.randint(0, 20)):
+    src = [rand.randrange(n) for i in range(m)]
+    dst = [rand.randrange(n) for i in range(m)]
+    return Graph.from_arrays(n, src, dst, [costs(rand) for i in range(m)], directed=directed)
+
+
+def path_cost(g, path):
+    """The cost of a path along the cheapest edges between its consecutive nodes."""
+    cost = 0
+    for (u, v) in zip(path, path[1:]):
+        cost += min(c for (w, c) in g.neighbours(u) if w is v)
+    return cost
+
+
+class ContractionHierarchyTest(unittest.TestCase):
+    """The queries of a hierarchy must give the distances of a plain Dijkstra."""
+
+    def check_hierarchy(self, g, ch, rand, pairs=60):
+        nodes = g.nodes
+        queries = [(rand.choice(nodes), rand.choice(nodes)) for i in range(pairs)]
+        queries += [(s, s) for s in nodes[:5]]
+        unreachable = 0
+        for (s, t) in queries:
+            dist = GraphAlgorithms.dijkstra(g, s)
+            expected = dist[t][0] if t in dist else math.inf
+            unreachable += expected == math.inf
+            self.assertAlmostEqual(ch.distance(s, t), expected)
+            d, path = ch.shortest_path(s, t)
+            self.assertAlmostEqual(d, expected)
+            if expected == math.inf:
+                self.assertIsNone(path)
+            else:
+                self.assertIs(path[0], s)
+                self.assertIs(path[-1], t)
+                self.assertAlmostEqual(path_cost(g, path), expected)
+        return unreachable
+
+    def test_random_graphs(self):
+        rand = random.Random(5)
+        unreachable = 0
+        for trial in range(12):
+            n = rand.randint(1, 50)
+            # sparse graphs, so that some pairs cannot reach each other
+            g = random_graph(n, rand.randint(0, 2 * n), rand, directed=trial % 3 != 0)
+            unreachable += self.check_hierarchy(g, GraphAlgorithms.contraction_hierarchy(g), rand)
+        self.assertGreater(unreachable, 0)
+
+    def test_float_costs_and_witness_limit(self):
+        rand = random.Random(6)
+        g = random_graph(40, 150, rand, costs=lambda rand: rand.uniform(0, 5))
+        self.check_hierarchy(g, GraphAlgorithms.contraction_hierarchy(g, settle_limit=2), rand)
+
+    def test_save_load(self):
+        rand = random.Random(7)
+        g = random_graph(30, 90, rand)
+        ch = GraphAlgorithms.contraction_hierarchy(g)
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'g.ch')
+            ch.save(filename)
+            self.check_hierarchy(g, ContractionHierarchy.load(filename, g), rand)
+
+
+if __name__ == '__main__':
+    unittest.main()
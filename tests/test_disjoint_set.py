@@ -0,0 +1,29 @@
+import random
+import unittest
+from array import array
+
+from DataStructures import IntDisjointSet
+
+
+class IntDisjointSetTest(unittest.TestCase):
+
+    def test_find_many(self):
+        rand = random.Random(3)
+        n = 500
+        part = IntDisjointSet(n)
+        for i in range(400):
+            part.union(rand.randrange(n), rand.randrange(n))
+            if i % 50 == 0:
+                xs = [rand.randrange(n) for j in range(20)]
+                before = array('q', part.parent)
+                roots = [int(r) for r in part.find_many(xs)]
+                # only the queried elements are moved
+                for v in set(range(n)) - set(xs):
+                    self.assertEqual(part.parent[v], before[v])
+                self.assertEqual(roots, [part.find(x) for x in xs])
+                self.assertTrue(all(part.parent[x] == r for (x, r) in zip(xs, roots)))
+        self.assertEqual(len(part.find_many([])), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
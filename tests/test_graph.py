@@ -0,0 +1,29 @@
+import unittest
+
+from GraphRepresentation import Graph
+
+
+class GraphTest(unittest.TestCase):
+
+    def test_update_edge_keeps_orientation(self):
+        g = Graph.from_arrays(3, [0, 1], [1, 2], [4, 5], directed=False)
+        a, b, c = g.nodes
+        self.assertEqual(g.update_edge(b, a, 7), 4)
+        self.assertEqual(g.edges[0], ((a, b), 7))
+        self.assertIn((b, 7), a.neighbours)
+        self.assertIn((a, 7), b.neighbours)
+        self.assertEqual(g.update_edge(c, b, 1), 5)
+        self.assertEqual(g.edges[1], ((b, c), 1))
+        self.assertEqual(g.dense().tolist(), [[0, 7, 0], [7, 0, 1], [0, 1, 0]])
+
+    def test_update_directed_edge(self):
+        g = Graph.from_arrays(2, [0], [1], [3])
+        a, b = g.nodes
+        with self.assertRaises(KeyError):
+            g.update_edge(b, a, 1)
+        g.update_edge(a, b, 2)
+        self.assertEqual(g.edges, [((a, b), 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
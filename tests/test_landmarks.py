@@ -0,0 +1,52 @@
+import math
+import random
+import unittest
+
+import GraphAlgorithms
+from GraphRepresentation import Graph
+
+
+def random_graph(n, m, rand, costs=lambda rand: rand.randint(1, 20)):
+    src = [rand.randrange(n) for i in range(m)]
+    dst = [rand.randrange(n) for i in range(m)]
+    return Graph.from_arrays(n, src, dst, [costs(rand) for i in range(m)])
+
+
+class LandmarkIndexTest(unittest.TestCase):
+
+    def check_queries(self, g, alt, rand, pairs=30):
+        for i in range(pairs):
+            s, t = rand.choice(g.nodes), rand.choice(g.nodes)
+            dist = GraphAlgorithms.dijkstra(g, s)
+            expected = dist[t][0] if t in dist else math.inf
+            self.assertAlmostEqual(alt.shortest_path(s, t)[0], expected)
+            self.assertLessEqual(alt.lower_bound(s, t), expected)
+
+    def test_follows_graph_changes(self):
+        rand = random.Random(1)
+        g = random_graph(40, 120, rand)
+        alt = GraphAlgorithms.landmark_index(g, k=4, seed=1)
+        self.assertEqual(alt.typecode, 'i')
+        self.check_queries(g, alt, rand)
+        # cheaper edges make the old bounds too high: the stale landmarks must be rebuilt
+        for ((u, v), c) in list(g.edges)[:30]:
+            g.update_edge(u, v, 1)
+        self.check_queries(g, alt, rand)
+        self.assertEqual(alt.versions, [g.version] * 4)
+
+    def test_float_edge_in_integer_graph(self):
+        rand = random.Random(2)
+        g = random_graph(30, 90, rand)
+        alt = GraphAlgorithms.landmark_index(g, k=3, seed=2)
+        self.assertEqual(alt.typecode, 'i')
+        g.add_edge(g.nodes[0], g.nodes[1], 0.5)
+        alt.rebuild(0)
+        self.assertEqual(alt.typecode, 'd')
+        self.assertTrue(all(a.typecode == 'd' for a in alt.forward + alt.backward))
+        alt.add_landmark(g.nodes[2])
+        alt.refresh()
+        self.check_queries(g, alt, rand)
+
+
+if __name__ == '__main__':
+    unittest.main()
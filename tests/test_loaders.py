@@ -0,0 +1,109 @@
+import gzip
+import os
+import random
+import tempfile
+import unittest
+
+from GraphRepresentation import Graph, CSRGraph, EdgeReader, CorruptedInputException
+
+
+def reference(filename, weighted=True):
+    """
+    The edges of a file as the original line-by-line reader understood them: a txt file
+    starts with the number of nodes and of edges, a csv/tsv file may start with a header.
+    :return: A tuple (number of nodes, sorted list of (source, destination, cost)).
+    """
+    opener = gzip.open if filename.endswith('.gz') else open
+    with opener(filename, 'rt') as file:
+        lines = [line for line in file.read().splitlines() if line.strip()]
+    sep = '\t' if '.tsv' in filename else ','
+    n = None
+    if '.txt' in filename:
+        n, lines = int(lines[0]), lines[2:]
+    elif not lines[0].split(sep)[0].strip().lstrip('-').isdigit():
+        lines = lines[1:]
+    edges = []
+    for line in lines:
+        att = [a.strip() for a in line.split(sep)]
+        cost = 1
+        if weighted:
+            cost = float(att[2]) if any(ch in att[2] for ch in '.eE') else int(att[2])
+        edges.append((int(att[0]), int(att[1]), cost))
+    if n is None:
+        n = 1 + max((max(u, v) for (u, v, c) in edges), default=-1)
+    return n, sorted(edges)
+
+
+def write_edges(filename, n, edges, rand, weighted=True, header=False):
+    """Write edges in the format of filename, with some random spacing."""
+    sep = '\t' if '.tsv' in filename else ','
+    out = []
+    if '.txt' in filename:
+        out += [str(n), str(len(edges))]
+    elif header:
+        out.append(sep.join(['source', 'destination', 'cost'][:3 if weighted else 2]))
+    for (u, v, c) in edges:
+        fields = [str(u), str(v)] + ([repr(c)] if weighted else [])
+        out.append((sep + rand.choice(['', ' '])).join(fields))
+    text = '\n'.join(out) + rand.choice(['', '\n'])
+    opener = gzip.open if filename.endswith('.gz') else open
+    with opener(filename, 'wt') as file:
+        file.write(text)
+
+
+def edge_ids(g):
+    """The edges of a Graph or a CSRGraph, as a sorted list of (source, destination, cost) ids."""
+    index = g.index if isinstance(g, Graph) else int
+    return sorted((index(u), index(v), c) for ((u, v), c) in g.edges)
+
+
+class LoaderTest(unittest.TestCase):
+    """The loaders, on random edge files, against the original line-by-line reader."""
+
+    def test_random_files(self):
+        rand = random.Random(22)
+        with tempfile.TemporaryDirectory() as tmp:
+            for trial in range(40):
+                n = rand.randint(1, 50)
+                m = rand.randint(1, 150)
+                floats = trial % 3 == 0
+                edges = [(rand.randrange(n), rand.randrange(n),
+                          rand.uniform(-5, 5) if floats else rand.randint(-10, 100)) for i in range(m)]
+                weighted = trial % 5 != 0
+                ext = rand.choice(['txt', 'csv', 'tsv']) + rand.choice(['', '.gz'])
+                filename = os.path.join(tmp, str(trial) + '.' + ext)
+                write_edges(filename, n, edges, rand, weighted=weighted, header=trial % 2 == 0)
+                n, expected = reference(filename, weighted)
+
+                for chunk_size in (1 << 20, 16):
+                    k, src, dst, w = EdgeReader(filename, weighted=weighted, chunk_size=chunk_size).read()
+                    self.assertEqual(k, n)
+                    self.assertEqual(sorted(zip(src, dst, w)), expected)
+
+                g = Graph(source=filename, weighted=weighted)
+                csr = CSRGraph.from_file(filename, weighted=weighted)
+                self.assertEqual((g.numOfNodes, csr.numOfNodes), (n, n))
+                self.assertEqual(edge_ids(g), expected)
+                self.assertEqual(edge_ids(csr), expected)
+
+                binary = os.path.join(tmp, str(trial) + '.gbin')
+                g.save(binary)
+                self.assertEqual(edge_ids(Graph(source=binary)), expected)
+                csr.save(binary)
+                self.assertEqual(edge_ids(CSRGraph.open(binary)), expected)
+
+    def test_corrupted_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'g.txt')
+            with open(filename, 'w') as file:
+                file.write('3\n2\n0, 1, 5\n')
+            with self.assertRaises(CorruptedInputException):
+                Graph(source=filename)
+            with open(filename, 'w') as file:
+                file.write('3\n1\n0, 7, 5\n')
+            with self.assertRaises(CorruptedInputException):
+                CSRGraph.from_file(filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
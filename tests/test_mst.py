@@ -0,0 +1,113 @@
+import os
+import random
+import tempfile
+import unittest
+
+import GraphAlgorithms
+from DataStructures import QUEUES, is_monotone
+from GraphRepresentation import Graph, CSRGraph
+
+
+def random_graph(n, m, rand, costs=lambda rand: rand.randint(1, 50), connected=False):
+    src = [rand.randrange(n) for i in range(m)]
+    dst = [rand.randrange(n) for i in range(m)]
+    if connected:
+        # a random spanning tree first
+        src += [rand.randrange(v) for v in range(1, n)]
+        dst += list(range(1, n))
+    return Graph.from_arrays(n, src, dst, [costs(rand) for i in range(len(src))], directed=False)
+
+
+def random_graphs(rand, trials, connected=False):
+    """Random graphs and their CSR forms, with integer and float costs."""
+    for trial in range(trials):
+        n = rand.randint(1, 60)
+        costs = (lambda rand: rand.randint(1, 50)) if trial % 2 else (lambda rand: rand.uniform(0, 10))
+        g = random_graph(n, rand.randint(0, 4 * n), rand, costs, connected)
+        yield g
+        yield CSRGraph.from_graph(g)
+
+
+def reference(g):
+    """The cost and size of a minimum spanning forest, by the textbook Kruskal."""
+    parent = {v: v for v in g.nodes}
+
+    def find(v):
+        while parent[v] is not v:
+            v = parent[v]
+        return v
+
+    cost, size = 0, 0
+    for ((u, v), c) in sorted(g.edges, key=lambda e: e[1]):
+        ru, rv = find(u), find(v)
+        if ru is not rv:
+            parent[ru] = rv
+            cost += c
+            size += 1
+    return cost, size
+
+
+class MinimumSpanningTreeTest(unittest.TestCase):
+    """Every MST engine must find a forest as cheap as the one of the textbook Kruskal."""
+
+    def assertForest(self, g, result, expected):
+        cost, sol = result
+        self.assertAlmostEqual(cost, expected[0])
+        self.assertEqual(len(sol), expected[1])
+        self.assertAlmostEqual(sum(c for (e, c) in sol), cost)
+
+    def check_engine(self, mst, connected=False, **kwargs):
+        rand = random.Random(4)
+        for g in random_graphs(rand, 20, connected):
+            self.assertForest(g, mst(g, **kwargs), reference(g))
+
+    def test_kruskal(self):
+        self.check_engine(GraphAlgorithms.kruskal)
+
+    def test_prim(self):
+        for queue in QUEUES:
+            if not is_monotone(queue):
+                with self.subTest(queue=queue):
+                    self.check_engine(GraphAlgorithms.prim, connected=True, queue=queue)
+
+    def test_filter_kruskal(self):
+        self.check_engine(GraphAlgorithms.filter_kruskal)
+        self.check_engine(GraphAlgorithms.filter_kruskal, threshold=4)
+
+    def test_boruvka(self):
+        self.check_engine(GraphAlgorithms.boruvka)
+
+    def test_external_kruskal(self):
+        rand = random.Random(20)
+        with tempfile.TemporaryDirectory() as tmp:
+            for (trial, g) in enumerate(random_graphs(rand, 10)):
+                if isinstance(g, CSRGraph):
+                    continue
+                filename = os.path.join(tmp, str(trial) + ('.csv' if trial % 4 else '.txt'))
+                with open(filename, 'w') as file:
+                    if filename.endswith('.txt'):
+                        file.write(str(g.numOfNodes) + '\n' + str(g.numOfEdges) + '\n')
+                    for ((u, v), c) in g.edges:
+                        file.write(str(g.index(u)) + ', ' + str(g.index(v)) + ', ' + repr(c) + '\n')
+                for run_size in (1 << 20, 7):
+                    cost, sol = GraphAlgorithms.external_kruskal(filename, run_size=run_size)
+                    expected = reference(g)
+                    self.assertAlmostEqual(cost, expected[0])
+                    self.assertEqual(len(sol), expected[1])
+
+    def test_incremental(self):
+        rand = random.Random(21)
+        for trial in range(10):
+            n = rand.randint(1, 40)
+            g = Graph(directed=False)
+            for i in range(n):
+                g.add_node()
+            forest = GraphAlgorithms.IncrementalMST(g)
+            for step in range(4 * n):
+                g.add_edge(rand.choice(g.nodes), rand.choice(g.nodes), rand.randint(1, 50))
+                self.assertForest(g, forest.mst(), reference(g))
+            forest.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import random
+import unittest
+
+from DataStructures import FibonacciHeap, BinomialHeap, PairingHeap, LazyHeapQueue, QUEUES, queue_factory, \
+    is_monotone, heapsort
+
+
+def remove(q, item):
+    """Take an item out of a queue, by remove or, on the handle heaps, by delete."""
+    if hasattr(q, 'remove'):
+        q.remove(item)
+    else:
+        q.delete(q.handle(item))
+
+
+class DuplicateItemsTest(unittest.TestCase):
+    """Pushing an item already in a queue is refused, and leaves the queue usable."""
+
+    def check_duplicates(self, make):
+        q = make([5, 1])
+        with self.assertRaises(ValueError):
+            q.push(5)
+        self.assertEqual(len(q), 2)
+        self.assertEqual(q.pop(), 1)
+        q.push(1)
+        with self.assertRaises(ValueError):
+            q.push(1)
+        self.assertEqual(q.pop(), 1)
+        self.assertEqual(q.pop(), 5)
+        self.assertFalse(q)
+        q.push(5)
+        self.assertIn(5, q)
+        self.assertEqual(q.pop(), 5)
+        with self.assertRaises(ValueError):
+            make([5, 5, 1])
+
+    def test_fibonacci(self):
+        self.check_duplicates(FibonacciHeap)
+        f, g = FibonacciHeap([1, 2]), FibonacciHeap([2, 3])
+        with self.assertRaises(ValueError):
+            f.merge(g)
+        self.assertEqual((len(f), len(g)), (2, 2))
+
+    def test_binomial(self):
+        self.check_duplicates(BinomialHeap)
+        h = BinomialHeap([3, 1])
+        with self.assertRaises(ValueError):
+            h.meld(BinomialHeap([2]), BinomialHeap([3]))
+        self.assertEqual((len(h), h.pop(), h.pop()), (2, 1, 3))
+        # distinct items with equal keys are fine
+        h = BinomialHeap([(5, 'a'), (5, 'b'), (1, 'c')], key=lambda x: x[0])
+        self.assertEqual(h.pop(), (1, 'c'))
+        self.assertEqual({h.pop(), h.pop()}, {(5, 'a'), (5, 'b')})
+
+    def test_pairing(self):
+        self.check_duplicates(PairingHeap)
+        h = PairingHeap([1, 2])
+        with self.assertRaises(ValueError):
+            h.merge(PairingHeap([2]))
+        self.assertEqual(len(h), 2)
+
+    def test_lazy_heapq(self):
+        self.check_duplicates(LazyHeapQueue)
+
+    def test_registry(self):
+        for name in QUEUES:
+            with self.subTest(queue=name):
+                self.check_duplicates(queue_factory(name))
+
+
+class RandomOperationsTest(unittest.TestCase):
+    """Every registry queue, driven by random operations, against a plain dict of keys."""
+
+    def check_queue(self, name, rand, steps=3000):
+        # a monotone queue never takes a key below the smallest one it has shown
+        floor = 0
+        keys = dict()
+        q = queue_factory(name)([], key=keys.__getitem__)
+        monotone = is_monotone(name)
+        for step in range(steps):
+            op = rand.random()
+            if op < 0.4 or not keys:
+                item = step
+                keys[item] = rand.randint(floor, floor + 100)
+                q.push(item)
+            elif op < 0.65:
+                item = q.pop()
+                self.assertEqual(keys[item], min(keys.values()))
+                del keys[item]
+            elif op < 0.85:
+                item = rand.choice(list(keys))
+                keys[item] = rand.randint(floor if monotone else 0, floor + 100)
+                q.updated_key(item)
+            else:
+                item = rand.choice(list(keys))
+                remove(q, item)
+                del keys[item]
+            self.assertEqual(len(q), len(keys))
+            self.assertEqual(bool(q), bool(keys))
+            if keys:
+                self.assertEqual(keys[q.get_min()], min(keys.values()))
+                if monotone:
+                    floor = max(floor, min(keys.values()))
+        for item in keys:
+            self.assertIn(item, q)
+        popped = [q.pop() for i in range(len(keys))]
+        self.assertEqual([keys[x] for x in popped], sorted(keys.values()))
+        self.assertFalse(q)
+
+    def test_registry(self):
+        rand = random.Random(8)
+        for name in QUEUES:
+            with self.subTest(queue=name):
+                self.check_queue(name, rand)
+
+    def test_sorting(self):
+        """Every queue sorts like the original heapsort, including items with equal keys."""
+        rand = random.Random(9)
+        for name in QUEUES:
+            with self.subTest(queue=name):
+                items = [(rand.randint(0, 30), i) for i in range(rand.randint(0, 300))]
+                q = queue_factory(name)(items, key=lambda x: x[0])
+                popped = [q.pop()[0] for i in range(len(items))]
+                self.assertEqual(popped, [x[0] for x in heapsort(items, key=lambda x: x[0])])
+
+
+if __name__ == '__main__':
+    unittest.main()
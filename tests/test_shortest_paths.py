@@ -0,0 +1,245 @@
+import math
+import random
+import unittest
+from unittest import mock
+
+import GraphAlgorithms
+import GraphAlgorithms.GraphAlgorithms as core
+from DataStructures import QUEUES, is_monotone
+from GraphAlgorithms.GraphAlgorithms import NegativeCycleException
+from GraphRepresentation import Graph, CSRGraph, ReversedView
+
+
+def random_graph(n, m, rand, directed=True, costs=lambda rand: rand.randint(0, 20)):
+    src = [rand.randrange(n) for i in range(m)]
+    dst = [rand.randrange(n) for i in range(m)]
+    return Graph.from_arrays(n, src, dst, [costs(rand) for i in range(m)], directed=directed)
+
+
+def reference(g, s):
+    """The distances from s by the textbook Bellman-Ford: n - 1 passes over every edge."""
+    d = {v: math.inf for v in g.nodes}
+    d[s] = 0
+    arcs = [(u, v, c) for ((u, v), c) in g.edges]
+    if not g.directed:
+        arcs += [(v, u, c) for (u, v, c) in arcs]
+    for i in range(g.numOfNodes):
+        changed = False
+        for (u, v, c) in arcs:
+            if d[u] + c < d[v]:
+                d[v] = d[u] + c
+                changed = True
+        if not changed:
+            break
+    return d
+
+
+def as_graph(g, flip=False, unit=False):
+    """A Graph with the edges of g between the same positions, flipped or of cost 1 if asked for."""
+    index = g.index if isinstance(g, Graph) else int
+    edges = [(index(u), index(v), 1 if unit else c) for ((u, v), c) in g.edges]
+    if flip:
+        edges = [(v, u, c) for (u, v, c) in edges]
+    return Graph.from_arrays(g.numOfNodes, [u for (u, v, c) in edges], [v for (u, v, c) in edges],
+                             [c for (u, v, c) in edges], directed=g.directed)
+
+
+def reference_at(g, h, i):
+    """The reference distances in h from its i-th node, given to the nodes of g in the same positions."""
+    d = reference(h, h.nodes[i])
+    return {v: d[h.nodes[j]] for (j, v) in enumerate(g.nodes)}
+
+
+def distances(g, res):
+    """The distance of every node in a {node: (distance, predecessor)} result, inf if it is missing."""
+    return {v: res[v][0] if v in res else math.inf for v in g.nodes}
+
+
+def random_graphs(rand, trials, negative=False):
+    """Random graphs and their CSR forms, with integer and float costs, negative ones if asked for."""
+    for trial in range(trials):
+        n = rand.randint(1, 40)
+        directed = negative or trial % 3 != 0
+        if trial % 2:
+            costs = lambda rand: rand.randint(0, 20)
+        else:
+            costs = lambda rand: rand.uniform(0, 10)
+        g = random_graph(n, rand.randint(0, 4 * n), rand, directed=directed, costs=costs)
+        if negative:
+            # shifting the costs by a potential makes some of them negative but adds no negative cycle
+            p = [rand.randint(0, 15) for v in range(n)]
+            src, dst = [g.index(u) for ((u, v), c) in g.edges], [g.index(v) for ((u, v), c) in g.edges]
+            w = [c + p[u] - p[v] for (u, v, (e, c)) in zip(src, dst, g.edges)]
+            g = Graph.from_arrays(n, src, dst, w)
+        yield g
+        yield CSRGraph.from_graph(g)
+
+
+def reached(dist):
+    """The distances of the nodes reached in a {node: (distance, predecessor)} result."""
+    return {v: d for (v, (d, p)) in dist.items() if d != math.inf}
+
+
+def cycle_cost(g, cycle):
+    """The cost of a cycle along the cheapest edges between its consecutive nodes."""
+    cost = 0
+    for (u, v) in zip(cycle, cycle[1:] + cycle[:1]):
+        cost += min(c for (w, c) in g.neighbours(u) if w == v)
+    return cost
+
+
+class ShortestPathsTest(unittest.TestCase):
+    """Every shortest path engine, on random graphs, against the textbook Bellman-Ford."""
+
+    def assertDistances(self, got, expected):
+        self.assertEqual(got.keys(), expected.keys())
+        for v in expected:
+            self.assertAlmostEqual(got[v], expected[v])
+
+    def test_single_source(self):
+        rand = random.Random(13)
+        cache = GraphAlgorithms.PathCache()
+        for g in random_graphs(rand, 30):
+            integer = all(isinstance(c, int) for ((u, v), c) in g.edges)
+            workspace = GraphAlgorithms.SearchWorkspace(g)
+            for s in rand.sample(list(g.nodes), min(3, g.numOfNodes)):
+                expected = reference(g, s)
+                for queue in [None] + [q for q in QUEUES if integer or not is_monotone(q)]:
+                    with self.subTest(queue=queue):
+                        self.assertDistances(distances(g, GraphAlgorithms.dijkstra(g, s, queue=queue)), expected)
+                self.assertDistances(distances(g, GraphAlgorithms.dijkstra(g, s, workspace=workspace)), expected)
+                self.assertDistances(distances(g, GraphAlgorithms.bellman_ford(g, s)), expected)
+                self.assertDistances(distances(g, GraphAlgorithms.spfa(g, s)), expected)
+                self.assertDistances(distances(g, GraphAlgorithms.bellman_ford_vectorized(g, s)), expected)
+                # the second time, from the cache
+                self.assertDistances(distances(g, cache.get(g, 'dijkstra', s)), expected)
+                self.assertDistances(distances(g, cache.get(g, 'dijkstra', s)), expected)
+        self.assertGreater(cache.hits, 0)
+
+    def test_negative_costs(self):
+        rand = random.Random(14)
+        for g in random_graphs(rand, 20, negative=True):
+            for s in rand.sample(list(g.nodes), min(3, g.numOfNodes)):
+                expected = reference(g, s)
+                self.assertDistances(distances(g, GraphAlgorithms.bellman_ford(g, s)), expected)
+                self.assertDistances(distances(g, GraphAlgorithms.spfa(g, s)), expected)
+                self.assertDistances(distances(g, GraphAlgorithms.bellman_ford_vectorized(g, s)), expected)
+
+    def test_all_pairs(self):
+        rand = random.Random(15)
+        for negative in (False, True):
+            for g in random_graphs(rand, 8, negative=negative):
+                expected = {s: reference(g, s) for s in g.nodes}
+                john = GraphAlgorithms.johnson(g)
+                dist, nxt = GraphAlgorithms.floyd_warshall(g, block_size=rand.choice([0, 1, 7]))
+                for (i, s) in enumerate(g.nodes):
+                    self.assertDistances(distances(g, john[s]), expected[s])
+                    self.assertDistances({v: dist[i][j] for (j, v) in enumerate(g.nodes)}, expected[s])
+                for (s, res) in GraphAlgorithms.iter_johnson(g, processes=2):
+                    self.assertDistances(distances(g, res), expected[s])
+
+    def test_point_to_point(self):
+        rand = random.Random(16)
+        for g in random_graphs(rand, 16):
+            nodes = list(g.nodes)
+            alt = GraphAlgorithms.landmark_index(g, k=3, seed=16)
+            for i in range(10):
+                s, t = rand.choice(nodes), rand.choice(nodes)
+                expected = reference(g, s)[t]
+                for method in ('dijkstra', 'bidirectional'):
+                    self.assertAlmostEqual(GraphAlgorithms.shortest_path(g, s, t, method=method)[0], expected)
+                self.assertAlmostEqual(GraphAlgorithms.shortest_path(g, s, t, method='astar',
+                                                                     heuristic=lambda v, t: 0)[0], expected)
+                self.assertAlmostEqual(alt.shortest_path(s, t)[0], expected)
+
+    def test_breadth_first(self):
+        rand = random.Random(17)
+        for g in random_graphs(rand, 16):
+            unit = as_graph(g, unit=True)
+            search = GraphAlgorithms.FrontierBFS(g)
+            for i in rand.sample(range(g.numOfNodes), min(3, g.numOfNodes)):
+                s = g.nodes[i]
+                expected = reference_at(g, unit, i)
+                self.assertDistances(distances(g, GraphAlgorithms.bfs(g, s)), expected)
+                dist, parent = search.search(s)
+                self.assertDistances({v: math.inf if dist[j] < 0 else dist[j] for (j, v) in enumerate(g.nodes)},
+                                     expected)
+
+    def test_dynamic(self):
+        rand = random.Random(18)
+        for trial in range(10):
+            n = rand.randint(2, 30)
+            g = random_graph(n, 3 * n, rand, directed=trial % 2 == 0)
+            s = rand.choice(g.nodes)
+            sssp = GraphAlgorithms.DynamicSSSP(g, s)
+            for step in range(30):
+                op = rand.random()
+                if op < 0.4 or not g.edges:
+                    g.add_edge(rand.choice(g.nodes), rand.choice(g.nodes), rand.randint(0, 20))
+                elif op < 0.8:
+                    ((u, v), c) = rand.choice(g.edges)
+                    g.update_edge(u, v, rand.randint(0, 20))
+                else:
+                    ((u, v), c) = rand.choice(g.edges)
+                    g.remove_edge(u, v)
+                self.assertDistances(distances(g, sssp.results()), reference(g, s))
+            sssp.close()
+
+    def test_reversed_view(self):
+        rand = random.Random(19)
+        for g in random_graphs(rand, 10):
+            flipped = as_graph(g, flip=True)
+            for (i, s) in enumerate(g.nodes):
+                res = GraphAlgorithms.dijkstra(ReversedView(g), s)
+                self.assertDistances(distances(g, res), reference_at(g, flipped, i))
+
+
+class FloydWarshallTest(unittest.TestCase):
+
+    def test_negative_cycles(self):
+        rand = random.Random(10)
+        found = 0
+        for trial in range(300):
+            n = rand.randint(1, 12)
+            g = random_graph(n, rand.randint(0, 3 * n), rand, directed=trial % 5 != 0,
+                             costs=lambda rand: rand.randint(-5, 20))
+            for graph in (g, CSRGraph.from_graph(g)):
+                for numpy in (core.np, None):
+                    with mock.patch.object(core, 'np', numpy):
+                        try:
+                            GraphAlgorithms.floyd_warshall(graph, block_size=rand.choice([0, 1, 3]))
+                        except NegativeCycleException as e:
+                            found += 1
+                            self.assertLess(cycle_cost(graph, e.cycle), 0)
+                        else:
+                            self.assertIsNone(GraphAlgorithms.negative_cycle(graph))
+        self.assertGreater(found, 0)
+
+
+class BatchTest(unittest.TestCase):
+
+    def test_matches_dijkstra(self):
+        rand = random.Random(11)
+        g = random_graph(40, 160, rand)
+        for graph in (g, CSRGraph.from_graph(g)):
+            sources = [rand.choice(graph.nodes) for i in range(10)]
+            for pool in ('thread', 'process'):
+                res = list(GraphAlgorithms.batch(graph, sources, pool=pool, workers=2))
+                self.assertEqual([s for (s, d) in res], sources)
+                for (s, d) in res:
+                    expected = GraphAlgorithms.dijkstra(graph, s)
+                    self.assertEqual(reached(d), reached(expected))
+
+    def test_checks_arguments_at_the_call(self):
+        g = random_graph(5, 10, random.Random(12))
+        for kwargs in ({'algorithm': 'astar'}, {'pool': 'fiber'}, {'workers': -1}, {'workers': 0}):
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                GraphAlgorithms.batch(g, g.nodes, **kwargs)
+        with self.assertRaises(ValueError):
+            GraphAlgorithms.batch(g, [g.nodes[0], 'nowhere'])
+        with self.assertRaises(ValueError):
+            GraphAlgorithms.batch(CSRGraph.from_graph(g), [0, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()